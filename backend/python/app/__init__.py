@@ -9,10 +9,50 @@ from flask_sqlalchemy import SQLAlchemy
 from logging.config import dictConfig
 
 from .config import app_config
+from .utilities.startup_profile import StartupTimer, startup_profile_command
 
 
 def create_app(config_name):
+    # time each phase, reported by `flask startup-profile`
+    timer = StartupTimer()
+
     # configure Flask logger
+    with timer.phase("configure_logging"):
+        _configure_logging()
+
+    with timer.phase("create_flask_app"):
+        app = Flask(__name__, template_folder="templates", static_folder="static")
+    app.extensions["startup_timer"] = timer
+    app.cli.add_command(startup_profile_command)
+    # do not read config object if creating app from Flask CLI (e.g. flask db migrate)
+    if type(config_name) is not ScriptInfo:
+        app.config.from_object(app_config[config_name])
+
+    with timer.phase("configure_cors"):
+        _configure_cors(app)
+
+    _configure_database_uri(app)
+
+    with timer.phase("firebase_admin.initialize_app"):
+        _initialize_firebase()
+
+    with timer.phase("import models and rest"):
+        from . import models, rest
+        from .middlewares import instrumentation, query_detector
+
+    with timer.phase("instrumentation.init_app"):
+        instrumentation.init_app(app)
+        query_detector.init_app(app)
+    with timer.phase("models.init_app"):
+        models.init_app(app)
+    with timer.phase("rest.init_app"):
+        rest.init_app(app)
+
+    timer.finish()
+    return app
+
+
+def _configure_logging():
     dictConfig(
         {
             "version": 1,
@@ -33,11 +73,8 @@ def create_app(config_name):
         }
     )
 
-    app = Flask(__name__, template_folder="templates", static_folder="static")
-    # do not read config object if creating app from Flask CLI (e.g. flask db migrate)
-    if type(config_name) is not ScriptInfo:
-        app.config.from_object(app_config[config_name])
 
+def _configure_cors(app):
     app.config["CORS_ORIGINS"] = [
         "http://localhost:8081",
         "http://localhost:3000",
@@ -49,6 +86,8 @@ def create_app(config_name):
     app.config["CORS_SUPPORTS_CREDENTIALS"] = True
     CORS(app)
 
+
+def _configure_database_uri(app):
     if os.getenv("FLASK_CONFIG") != "production":
         app.config[
             "SQLALCHEMY_DATABASE_URI"
@@ -66,6 +105,8 @@ def create_app(config_name):
         app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL")
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+
+def _initialize_firebase():
     firebase_admin.initialize_app(
         firebase_admin.credentials.Certificate(
             {
@@ -89,10 +130,3 @@ def create_app(config_name):
         ),
         {"storageBucket": os.getenv("FIREBASE_STORAGE_DEFAULT_BUCKET")},
     )
-
-    from . import models, rest
-
-    models.init_app(app)
-    rest.init_app(app)
-
-    return app
@@ -1,5 +1,7 @@
 import os
 
+from .utilities.database import TimedQueuePool
+
 
 class Config(object):
     """
@@ -10,6 +12,33 @@ class Config(object):
     # list of available configs: https://flask.palletsprojects.com/en/1.1.x/config/
     MONGODB_URL = os.getenv("MG_DATABASE_URL")
 
+    # set SQLALCHEMY_ECHO=true to log every SQL statement
+    SQLALCHEMY_ECHO = os.getenv("SQLALCHEMY_ECHO", "false").lower() == "true"
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "poolclass": TimedQueuePool,
+        # connections kept open per process, gunicorn.conf.py matches it to the thread count
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        # extra connections opened under bursts, closed again when returned
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        # seconds to wait for a free connection before failing the request
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        # replace connections older than this many seconds, before the server or a proxy drops them
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        # test connections on checkout so a dropped one is replaced instead of failing a query
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+    }
+    # server-side statement_timeout in milliseconds, 0 disables it
+    DB_READ_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_READ_STATEMENT_TIMEOUT_MS", 5000))
+    DB_WRITE_STATEMENT_TIMEOUT_MS = int(
+        os.getenv("DB_WRITE_STATEMENT_TIMEOUT_MS", 15000)
+    )
+    # report SQL and external service time per request in a Server-Timing header
+    SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() == "true"
+    # N+1 query detection: off, log or raise (see middlewares/query_detector.py)
+    QUERY_DETECTOR = os.getenv("QUERY_DETECTOR", "off")
+    # a statement shape may run this many times per request before it is reported
+    QUERY_DETECTOR_THRESHOLD = int(os.getenv("QUERY_DETECTOR_THRESHOLD", 5))
+
 
 class DevelopmentConfig(Config):
     """
@@ -17,7 +46,6 @@ class DevelopmentConfig(Config):
     """
 
     DEBUG = True
-    SQLALCHEMY_ECHO = True
 
 
 class ProductionConfig(Config):
@@ -36,6 +64,7 @@ class TestingConfig(Config):
     DEBUG = False
     TESTING = True
     MONGODB_URL = "mongomock://localhost"
+    QUERY_DETECTOR = os.getenv("QUERY_DETECTOR", "raise")
 
 
 app_config = {
@@ -0,0 +1,67 @@
+import hashlib
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+
+def _etag_for(version):
+    # the query string is part of the tag since it selects fields, pages, users, ...
+    digest = hashlib.sha1(
+        "{path}|{version!r}".format(path=request.full_path, version=version).encode()
+    )
+    return digest.hexdigest()
+
+
+def _mark_cacheable(response, etag):
+    response.set_etag(etag)
+    # clients may store the body but must revalidate it on every use
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def conditional_get(version_function):
+    """
+    Answer a GET with 304 Not Modified when the client's copy is still current
+
+    version_function is called with the route's arguments before the route
+    itself runs. It should return a cheap token that changes whenever the
+    response body would, e.g. (count, max(updated_at)) of a collection, or
+    None when no tag can be computed (e.g. the row does not exist). The ETag
+    is a hash of that token and the request path, including its query string.
+
+    Must be applied below require_authorization_by_role so that unauthorized
+    clients never learn whether a resource changed.
+
+    :param version_function: returns a version token for the requested resource
+    :type version_function: callable
+    """
+
+    def conditional(api_func):
+        @wraps(api_func)
+        def wrapper(*args, **kwargs):
+            try:
+                version = version_function(*args, **kwargs)
+            except Exception as e:
+                reason = getattr(e, "message", None)
+                current_app.logger.warning(
+                    "Failed to compute version of {path}. Reason = {reason}".format(
+                        path=request.path, reason=(reason if reason else str(e))
+                    )
+                )
+                version = None
+
+            if version is None:
+                return api_func(*args, **kwargs)
+
+            etag = _etag_for(version)
+            if request.if_none_match.contains(etag):
+                return _mark_cacheable(current_app.response_class(status=304), etag)
+
+            response = make_response(api_func(*args, **kwargs))
+            if response.status_code == 200:
+                _mark_cacheable(response, etag)
+            return response
+
+        return wrapper
+
+    return conditional
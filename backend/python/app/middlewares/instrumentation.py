@@ -0,0 +1,119 @@
+"""
+Request-level performance instrumentation
+
+init_app hooks every request to record, per route:
+* http_request_duration_seconds and http_requests_total by status
+* http_request_sql_queries and http_request_sql_seconds, from SQLAlchemy's
+  before_cursor_execute and after_cursor_execute events
+* http_response_size_bytes, for responses that are not streamed
+
+and, unless SERVER_TIMING is disabled, adds a Server-Timing header with the
+SQL time, the time spent calling Firebase, Cohere and Gmail (see
+utilities/request_timing.py) and the total. The metrics are served at
+/metrics by rest/metrics_routes.py.
+
+Streamed responses are measured up to the point their headers are sent.
+"""
+
+import time
+
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..utilities.metrics import registry
+from ..utilities.request_timing import RequestTiming, current_timing
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Time to handle a request, by route",
+    ["method", "route"],
+)
+requests_total = registry.counter(
+    "http_requests_total",
+    "Requests handled, by route and status",
+    ["method", "route", "status"],
+)
+request_sql_queries = registry.histogram(
+    "http_request_sql_queries",
+    "SQL statements executed per request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+request_sql_seconds = registry.histogram(
+    "http_request_sql_seconds", "Time spent in SQL statements per request", ["route"]
+)
+response_size = registry.histogram(
+    "http_response_size_bytes",
+    "Size of response bodies, by route",
+    ["route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+_sql_listeners_registered = False
+
+
+def init_app(app):
+    global _sql_listeners_registered
+    if not _sql_listeners_registered:
+        # listening on the Engine class covers every engine, including ones
+        # Flask-SQLAlchemy creates after this point
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        _sql_listeners_registered = True
+
+    app.before_request(_start_timing)
+    app.after_request(_record_request)
+
+
+def _start_timing():
+    g.request_timing = RequestTiming()
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+def _record_request(response):
+    timing = g.pop("request_timing", None)
+    if timing is None:
+        return response
+
+    elapsed = timing.elapsed()
+    route = _route()
+    request_duration.labels(method=request.method, route=route).observe(elapsed)
+    requests_total.labels(
+        method=request.method, route=route, status=response.status_code
+    ).inc()
+    request_sql_queries.labels(route=route).observe(timing.sql_count)
+    request_sql_seconds.labels(route=route).observe(timing.sql_seconds)
+    if not response.is_streamed:
+        size = response.calculate_content_length()
+        if size is not None:
+            response_size.labels(route=route).observe(size)
+
+    if current_app.config.get("SERVER_TIMING", True):
+        response.headers["Server-Timing"] = timing.server_timing(elapsed)
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    timing = current_timing()
+    if timing is not None:
+        timing.add_sql(elapsed)
+
+
+def _handle_error(exception_context):
+    # a failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        elapsed = time.perf_counter() - connection.info["query_start_time"].pop()
+        timing = current_timing()
+        if timing is not None:
+            timing.add_sql(elapsed)
@@ -0,0 +1,79 @@
+"""
+Opt-in N+1 query detection per request
+
+Enabled by the QUERY_DETECTOR setting:
+* "off" (default) does nothing
+* "log" logs every statement shape executed more than
+  QUERY_DETECTOR_THRESHOLD times in one request, for staging
+* "raise" also fails the request with RepeatedQueryError, for tests
+
+Detections are counted in repeated_queries_total by route.
+"""
+
+from flask import current_app, g, request
+
+from ..utilities.metrics import registry
+from ..utilities.query_tracker import RepeatedQueryError, start_tracking, stop_tracking
+
+DETECTOR_MODES = ("off", "log", "raise")
+
+repeated_queries = registry.counter(
+    "repeated_queries_total",
+    "Requests in which a statement shape repeated more than QUERY_DETECTOR_THRESHOLD times",
+    ["route"],
+)
+
+
+def init_app(app):
+    mode = app.config.get("QUERY_DETECTOR", "off")
+    if mode not in DETECTOR_MODES:
+        raise ValueError(
+            "QUERY_DETECTOR must be one of {modes}, got {mode}".format(
+                modes=", ".join(DETECTOR_MODES), mode=mode
+            )
+        )
+    if mode == "off":
+        return
+
+    app.before_request(_start_tracking)
+    app.after_request(_check_queries)
+    # also stop tracking requests that fail before after_request runs
+    app.teardown_request(_stop_tracking)
+
+
+def _start_tracking():
+    g.query_tracker = start_tracking()
+
+
+def _stop_tracking(exception=None):
+    tracker = g.pop("query_tracker", None)
+    if tracker is not None:
+        stop_tracking(tracker)
+    return tracker
+
+
+def _check_queries(response):
+    tracker = _stop_tracking()
+    if tracker is None:
+        return response
+
+    repeated = tracker.repeated(current_app.config.get("QUERY_DETECTOR_THRESHOLD", 5))
+    if not repeated:
+        return response
+
+    route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    repeated_queries.labels(route=route).inc()
+    message = "{method} {route} repeated {shapes} statement(s):\n{statements}".format(
+        method=request.method,
+        route=route,
+        shapes=len(repeated),
+        statements="\n".join(
+            "  {count} x {shape}".format(count=count, shape=shape)
+            for shape, count in repeated
+        ),
+    )
+    # the app logs at ERROR level only, see create_app
+    current_app.logger.error("Possible N+1 queries in " + message)
+    if current_app.config.get("QUERY_DETECTOR") == "raise":
+        raise RepeatedQueryError(message)
+    return response
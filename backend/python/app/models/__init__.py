@@ -1,27 +1,44 @@
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
+from ..utilities.database import register_statement_timeouts
+
 db = SQLAlchemy()
 migrate = Migrate()
 
+# the session listener is registered once per process, even if create_app runs again
+_statement_timeouts = None
+
 
 def init_app(app):
     from .entity import Entity
     from .simple_entity import SimpleEntity
     from .user import User
     from .feed import Feed
+    from .feed_like import FeedLike
     from .user_comment import UserComment
     from .article import Article
     from .content import Content
     from .progress import Progress
+    from .progress_daily import ProgressDaily
     from .quiz import Quiz
     from .quiz_completions import QuizCompletion
     from .reflection import Reflection
+    from .email_job import EmailJob, EmailJobRecipient
+    from .ai_response_cache import AIResponseCacheEntry
     
     app.app_context().push()
     db.init_app(app)
     migrate.init_app(app, db)
 
+    global _statement_timeouts
+    if _statement_timeouts is None:
+        _statement_timeouts = register_statement_timeouts(
+            db.session,
+            app.config.get("DB_READ_STATEMENT_TIMEOUT_MS", 0),
+            app.config.get("DB_WRITE_STATEMENT_TIMEOUT_MS", 0),
+        )
+
     erase_db_and_sync = app.config["TESTING"]
 
     if erase_db_and_sync:
@@ -0,0 +1,14 @@
+from . import db
+
+
+class AIResponseCacheEntry(db.Model):
+    """
+    Persistent tier of the AI response cache, keyed by a SHA-256 request hash
+    """
+
+    __tablename__ = "ai_response_cache"
+
+    key = db.Column(db.String(64), primary_key=True, nullable=False)
+    response = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
@@ -1,9 +1,8 @@
-from sqlalchemy import inspect
-from sqlalchemy.orm.properties import ColumnProperty
 from . import db
+from .mixins import SerializerMixin
 
 
-class Article(db.Model):
+class Article(SerializerMixin, db.Model):
     __tablename__ = "article"
 
     id = db.Column(db.Integer, primary_key=True, nullable=False)
@@ -19,21 +18,20 @@ class Article(db.Model):
     number_of_ratings = db.Column(db.Integer, default=200)
     time_to_read = db.Column(db.Integer, default=25)
     cover_image = db.Column(db.Text, nullable=True)
-    contents = db.relationship("Content", backref="article", lazy="dynamic")
-
-    def to_dict(self, include_relationships=False):
-        """Converts the Article object to a dictionary format."""
-        cls = type(self)
-        mapper = inspect(cls)
-        formatted = {}
-
-        for column in mapper.attrs:
-            field = column.key
-            attr = getattr(self, field)
-
-            if isinstance(column, ColumnProperty):
-                formatted[field] = attr
-            elif include_relationships:
-                formatted[field] = [obj.to_dict() for obj in attr]
+    contents = db.relationship(
+        "Content", backref="article", lazy="dynamic", order_by="Content.position"
+    )
 
-        return formatted
+    sparse_fields = (
+        "id",
+        "title",
+        "subtitle",
+        "author_id",
+        "centre",
+        "created_at",
+        "updated_at",
+        "rating",
+        "number_of_ratings",
+        "time_to_read",
+        "cover_image",
+    )
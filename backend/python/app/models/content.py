@@ -9,6 +9,10 @@ class Content(db.Model):
     content_data = db.Column(db.Text, nullable=True)
     position = db.Column(db.Integer, nullable=False)
 
+    __table_args__ = (
+        db.Index("ix_content_article_id_position", "article_id", "position"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
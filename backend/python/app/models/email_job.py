@@ -0,0 +1,62 @@
+from . import db
+
+
+class EmailJob(db.Model):
+    __tablename__ = "email_jobs"
+
+    id = db.Column(db.Integer, primary_key=True, nullable=False)
+    subject = db.Column(db.Text, nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    # queued, running, completed
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    total_count = db.Column(db.Integer, nullable=False, default=0)
+    sent_count = db.Column(db.Integer, nullable=False, default=0)
+    failed_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    updated_at = db.Column(
+        db.DateTime,
+        default=db.func.current_timestamp(),
+        onupdate=db.func.current_timestamp(),
+    )
+    recipients = db.relationship(
+        "EmailJobRecipient", backref="job", lazy="dynamic", cascade="all, delete-orphan"
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "total_count": self.total_count,
+            "sent_count": self.sent_count,
+            "failed_count": self.failed_count,
+            "pending_count": self.total_count - self.sent_count - self.failed_count,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class EmailJobRecipient(db.Model):
+    __tablename__ = "email_job_recipients"
+    __table_args__ = (
+        db.Index(
+            "ix_email_job_recipients_status_next_attempt_at",
+            "status",
+            "next_attempt_at",
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, nullable=False)
+    job_id = db.Column(
+        db.Integer,
+        db.ForeignKey("email_jobs.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    email = db.Column(db.String, nullable=False)
+    # pending, sending (leased to a worker until next_attempt_at), sent, failed
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(
+        db.DateTime, nullable=False, default=db.func.current_timestamp()
+    )
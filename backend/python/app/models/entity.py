@@ -1,7 +1,5 @@
-from sqlalchemy import inspect
-from sqlalchemy.orm.properties import ColumnProperty
-
 from . import db
+from .mixins import SerializerMixin
 from .enum import enum
 
 # common columns and methods across multiple data models can be added via a Mixin class:
@@ -12,32 +10,10 @@ from .enum import enum
 # https://github.com/uwblueprint/plasta/blob/master/backend/app/models/mixins.py#L10-L95
 
 
-class Entity(db.Model):
+class Entity(SerializerMixin, db.Model):
     # define the entities table
 
     __tablename__ = "entities"
 
     id = db.Column(db.Integer, primary_key=True, nullable=False)
     file_name = db.Column(db.String)
-
-    # must define how to convert to a dict so that Entity can eventually be serialized into JSON
-    # this would be a good method to include in a base Mixin
-    def to_dict(self, include_relationships=False):
-        cls = type(self)
-        # mapper allows us to grab the columns of a Model
-        mapper = inspect(cls)
-        formatted = {}
-        for column in mapper.attrs:
-            field = column.key
-            attr = getattr(self, field)
-            # if it's a regular column, extract the value
-            if isinstance(column, ColumnProperty):
-                formatted[field] = attr
-            # otherwise, it's a relationship field
-            # (currently not applicable, but may be useful for entity groups)
-            elif include_relationships:
-                # recursively format the relationship
-                # don't format the relationship's relationships
-                formatted[field] = [obj.to_dict() for obj in attr]
-        return formatted
-
@@ -1,8 +1,7 @@
-from sqlalchemy import inspect
-from sqlalchemy.orm.properties import ColumnProperty
 from . import db
+from .mixins import SerializerMixin
 
-class Feed(db.Model):
+class Feed(SerializerMixin, db.Model):
     __tablename__ = "feed"
 
     id = db.Column(db.Integer, primary_key=True, nullable=False) 
@@ -13,23 +12,27 @@ class Feed(db.Model):
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())  
     updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())  # Last updated timestamp
     likes_count = db.Column(db.Integer, default=0)  
-    users_who_have_liked = db.Column(db.ARRAY(db.Integer), default=[]) 
     comments_count = db.Column(db.Integer, default=0)  
     views_count = db.Column(db.Integer, default=0) 
 
-    def to_dict(self, include_relationships=False):
-        """Converts the Feed object to a dictionary format."""
-        cls = type(self)
-        mapper = inspect(cls)
-        formatted = {}
+    sparse_fields = (
+        "id",
+        "title",
+        "content",
+        "author_id",
+        "centre",
+        "created_at",
+        "updated_at",
+        "likes_count",
+        "comments_count",
+        "views_count",
+    )
 
-        for column in mapper.attrs:
-            field = column.key
-            attr = getattr(self, field)
 
-            if isinstance(column, ColumnProperty):
-                formatted[field] = attr
-            elif include_relationships:
-                formatted[field] = [obj.to_dict() for obj in attr]
-
-        return formatted
+# supports keyset pagination of GET /feeds, optionally filtered by centre
+db.Index(
+    "ix_feed_centre_created_at_id",
+    Feed.centre,
+    Feed.created_at.desc(),
+    Feed.id,
+)
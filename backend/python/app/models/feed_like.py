@@ -0,0 +1,25 @@
+from . import db
+
+
+class FeedLike(db.Model):
+    __tablename__ = "feed_likes"
+    __table_args__ = (
+        db.UniqueConstraint("feed_id", "user_id", name="uq_feed_likes_feed_id_user_id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, nullable=False)
+    feed_id = db.Column(
+        db.Integer, db.ForeignKey("feed.id", ondelete="CASCADE"), nullable=False
+    )
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "feed_id": self.feed_id,
+            "user_id": self.user_id,
+            "created_at": self.created_at,
+        }
@@ -0,0 +1,148 @@
+from operator import attrgetter
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import RelationshipProperty, mapper as orm_mapper
+from sqlalchemy.orm.properties import ColumnProperty
+
+# common columns and methods across multiple data models can be added via a Mixin class:
+# https://docs.sqlalchemy.org/en/13/orm/extensions/declarative/mixins.html
+
+
+class _Serializer:
+    """
+    Precompiled dict conversion for one model class
+
+    The mapper is inspected once, when the serializer is built, instead of on
+    every to_dict call. Column values are then read with a single attrgetter.
+    """
+
+    def __init__(self, cls):
+        mapper = inspect(cls)
+        self.column_keys = tuple(
+            attr.key for attr in mapper.attrs if isinstance(attr, ColumnProperty)
+        )
+        self.relationships = tuple(
+            (attr.key, attr.uselist)
+            for attr in mapper.attrs
+            if isinstance(attr, RelationshipProperty)
+        )
+
+        getter = attrgetter(*self.column_keys)
+        if len(self.column_keys) == 1:
+            self.get_columns = lambda obj: (getter(obj),)
+        else:
+            self.get_columns = getter
+
+    def serialize(self, obj, include_relationships=False):
+        formatted = dict(zip(self.column_keys, self.get_columns(obj)))
+
+        if include_relationships:
+            # don't format the relationship's relationships
+            for key, uselist in self.relationships:
+                attr = getattr(obj, key)
+                if uselist:
+                    formatted[key] = [item.to_dict() for item in attr]
+                else:
+                    formatted[key] = attr.to_dict() if attr is not None else None
+
+        return formatted
+
+
+_serializers = {}
+
+
+def _serializer_for(cls):
+    serializer = _serializers.get(cls)
+    if serializer is None:
+        serializer = _serializers[cls] = _Serializer(cls)
+    return serializer
+
+
+class SerializerMixin:
+    """
+    Adds to_dict and serialize_many to a model so that it can be serialized into JSON
+    """
+
+    # columns that list endpoints may project with a sparse fieldset (?fields=...)
+    sparse_fields = ()
+
+    def to_dict(self, include_relationships=False):
+        return _serializer_for(type(self)).serialize(self, include_relationships)
+
+    @classmethod
+    def parse_fields(cls, fields):
+        """
+        Parse a comma separated sparse fieldset, e.g. "id,title,likes_count"
+
+        id is always included, first, so that clients can key the rows.
+
+        :param fields: the fields query param, may be None or empty
+        :type fields: str
+        :return: the requested column names, None if no fieldset was given
+        :rtype: tuple[str] | None
+        :raises ValueError: if a field is not in the model's sparse_fields
+        """
+        if not fields:
+            return None
+
+        requested = ["id"]
+        for field in fields.split(","):
+            field = field.strip()
+            if field and field not in requested:
+                requested.append(field)
+
+        unknown = [field for field in requested if field not in cls.sparse_fields]
+        if unknown:
+            raise ValueError(
+                "Unknown fields: {unknown}. Allowed fields: {allowed}".format(
+                    unknown=", ".join(unknown), allowed=", ".join(cls.sparse_fields)
+                )
+            )
+        return tuple(requested)
+
+    @classmethod
+    def project(cls, query, fields):
+        """
+        Restrict query to the given columns so that it returns row tuples
+
+        :param query: a query of this model
+        :param fields: column names as returned by parse_fields
+        :type fields: tuple[str]
+        """
+        return query.with_entities(*(getattr(cls, field) for field in fields))
+
+    @staticmethod
+    def serialize_rows(rows, fields):
+        """
+        Convert row tuples returned by a projected query to dicts
+
+        :rtype: list[dict]
+        """
+        return [dict(zip(fields, row)) for row in rows]
+
+    @classmethod
+    def serialize_many(cls, rows, include_relationships=False):
+        """
+        Convert many rows of this model to dicts
+
+        :param rows: instances of this model
+        :type rows: iterable
+        :rtype: list[dict]
+        """
+        serialize = _serializer_for(cls).serialize
+        return [serialize(row, include_relationships) for row in rows]
+
+
+def _all_subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _all_subclasses(subclass)
+
+
+@event.listens_for(orm_mapper, "after_configured")
+def _build_serializers():
+    # backrefs are only added once every mapper is configured, so (re)build here
+    _serializers.clear()
+    for cls in _all_subclasses(SerializerMixin):
+        if hasattr(cls, "__mapper__"):
+            _serializer_for(cls)
@@ -8,6 +8,17 @@ class Progress(db.Model):
     content_type = db.Column(db.String(50), nullable=False)
     points_collected = db.Column(db.Integer, nullable=False, default=0)
     date = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+    # set by clients uploading batches, see UserService.create_progress_batch
+    idempotency_key = db.Column(db.String(64), nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_progress_user_id_date", "user_id", "date"),
+        db.UniqueConstraint(
+            "user_id",
+            "idempotency_key",
+            name="uq_progress_user_id_idempotency_key",
+        ),
+    )
 
     def to_dict(self):
         return {
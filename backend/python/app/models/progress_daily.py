@@ -0,0 +1,20 @@
+from . import db
+
+
+class ProgressDaily(db.Model):
+    """
+    Points collected per user, day and content type
+
+    Maintained by UserService.update_progress in the same transaction as the
+    progress rows it summarizes, so point totals over any date range are read
+    from at most one row per day instead of every progress row.
+    """
+
+    __tablename__ = "progress_daily"
+
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id"), primary_key=True, nullable=False
+    )
+    day = db.Column(db.Date, primary_key=True, nullable=False)
+    content_type = db.Column(db.String(50), primary_key=True, nullable=False)
+    points = db.Column(db.Integer, nullable=False, default=0)
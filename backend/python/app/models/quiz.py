@@ -1,8 +1,7 @@
-from sqlalchemy import inspect
-from sqlalchemy.orm.properties import ColumnProperty
 from . import db
+from .mixins import SerializerMixin
 
-class Quiz(db.Model):
+class Quiz(SerializerMixin, db.Model):
     __tablename__ = "quiz"
 
     id = db.Column(db.Integer, primary_key=True, nullable=False)
@@ -14,17 +13,11 @@ class Quiz(db.Model):
         db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp()
     )
 
-    def to_dict(self):
-        """Converts the Quiz object to a dictionary format."""
-        cls = type(self)
-        mapper = inspect(cls)
-        formatted = {}
-
-        for column in mapper.attrs:
-            field = column.key
-            attr = getattr(self, field)
-
-            if isinstance(column, ColumnProperty):
-                formatted[field] = attr
-
-        return formatted
+    sparse_fields = (
+        "id",
+        "article_id",
+        "title",
+        "questions",
+        "created_at",
+        "updated_at",
+    )
@@ -1,7 +1,6 @@
-from sqlalchemy import inspect
-from sqlalchemy.orm.properties import ColumnProperty
 from . import db
-class QuizCompletion(db.Model):
+from .mixins import SerializerMixin
+class QuizCompletion(SerializerMixin, db.Model):
     __tablename__ = "quiz_completions"
 
     id = db.Column(db.Integer, primary_key=True, nullable=False)
@@ -15,14 +14,3 @@ class QuizCompletion(db.Model):
     user = db.relationship("User", backref="quiz_completions")
     quiz = db.relationship("Quiz", backref="completions")
     article = db.relationship("Article", backref="quiz_completions")
-
-    def to_dict(self):
-        cls = type(self)
-        mapper = inspect(cls)
-        formatted = {}
-        for column in mapper.attrs:
-            field = column.key
-            attr = getattr(self, field)
-            if isinstance(column, ColumnProperty):
-                formatted[field] = attr
-        return formatted
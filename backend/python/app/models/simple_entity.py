@@ -1,7 +1,5 @@
-from sqlalchemy import inspect
-from sqlalchemy.orm.properties import ColumnProperty
-
 from . import db
+from .mixins import SerializerMixin
 from .enum import simple_entity_enum
 
 # common columns and methods across multiple data models can be added via a Mixin class:
@@ -12,7 +10,7 @@ from .enum import simple_entity_enum
 # https://github.com/uwblueprint/plasta/blob/master/backend/app/models/mixins.py#L10-L95
 
 
-class SimpleEntity(db.Model):
+class SimpleEntity(SerializerMixin, db.Model):
     # define the simple entities table
 
     __tablename__ = "simple_entities"
@@ -23,25 +21,3 @@ class SimpleEntity(db.Model):
     enum_field = db.Column(simple_entity_enum, nullable=False)
     string_array_field = db.Column(db.ARRAY(db.String), nullable=False)
     bool_field = db.Column(db.Boolean, nullable=False)
-
-    # must define how to convert to a dict so that SimpleEntity can eventually be serialized into JSON
-    # this would be a good method to include in a base Mixin
-    def to_dict(self, include_relationships=False):
-        cls = type(self)
-        # mapper allows us to grab the columns of a Model
-        mapper = inspect(cls)
-        formatted = {}
-        for column in mapper.attrs:
-            field = column.key
-            attr = getattr(self, field)
-            # if it's a regular column, extract the value
-            if isinstance(column, ColumnProperty):
-                formatted[field] = attr
-            # otherwise, it's a relationship field
-            # (currently not applicable, but may be useful for entity groups)
-            elif include_relationships:
-                # recursively format the relationship
-                # don't format the relationship's relationships
-                formatted[field] = [obj.to_dict() for obj in attr]
-        return formatted
-
@@ -1,12 +1,10 @@
-from sqlalchemy import inspect
-from sqlalchemy.orm.properties import ColumnProperty
-
 from . import db
+from .mixins import SerializerMixin
 
 roles_enum = db.Enum("User", "Admin", name="roles")
 
 
-class User(db.Model):
+class User(SerializerMixin, db.Model):
     __tablename__ = "users"
 
     id = db.Column(db.Integer, primary_key=True, nullable=False)
@@ -19,23 +17,3 @@ class User(db.Model):
     location = db.Column(db.String, nullable=True)
     interests = db.Column(db.ARRAY(db.String), nullable=True)
     allow_notifs = db.Column(db.Boolean, nullable=False, default=False)
-
-    def to_dict(self, include_relationships=False):
-        # define the entities table
-        cls = type(self)
-
-        mapper = inspect(cls)
-        formatted = {}
-        for column in mapper.attrs:
-            field = column.key
-            attr = getattr(self, field)
-            # if it's a regular column, extract the value
-            if isinstance(column, ColumnProperty):
-                formatted[field] = attr
-            # otherwise, it's a relationship field
-            # (currently not applicable, but may be useful for entity groups)
-            elif include_relationships:
-                # recursively format the relationship
-                # don't format the relationship's relationships
-                formatted[field] = [obj.to_dict() for obj in attr]
-        return formatted
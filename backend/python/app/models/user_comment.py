@@ -1,9 +1,8 @@
-from sqlalchemy import inspect
-from sqlalchemy.orm.properties import ColumnProperty
 from . import db
+from .mixins import SerializerMixin
 from datetime import datetime
 
-class UserComment(db.Model):  
+class UserComment(SerializerMixin, db.Model):  
     __tablename__ = "user_comments" 
 
     id = db.Column(db.Integer, primary_key=True, nullable=False)  
@@ -12,22 +11,14 @@ class UserComment(db.Model):
     content = db.Column(db.Text, nullable=False) 
     created_at = db.Column(db.DateTime, default=datetime.utcnow) 
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow) 
-    parent_id = db.Column(db.Integer, db.ForeignKey("user_comments.id"), nullable=True) 
+    parent_id = db.Column(db.Integer, db.ForeignKey("user_comments.id"), nullable=True)
 
-    def to_dict(self, include_relationships=False):
-        """Converts the UserComment object to a dictionary format."""
-        cls = type(self)
-        mapper = inspect(cls)
-        formatted = {}
 
-        for column in mapper.attrs:
-            field = column.key
-            attr = getattr(self, field)
-
-            if isinstance(column, ColumnProperty):
-                formatted[field] = attr
-
-            elif include_relationships:
-                formatted[field] = [obj.to_dict() for obj in attr]
-
-        return formatted
+# supports reading a post's comments thread by thread, see FeedService.get_comment_tree
+db.Index(
+    "ix_user_comments_feed_id_parent_id_created_at",
+    UserComment.feed_id,
+    UserComment.parent_id,
+    UserComment.created_at,
+    UserComment.id,
+)
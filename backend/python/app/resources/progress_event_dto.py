@@ -0,0 +1,57 @@
+from datetime import datetime
+
+PROGRESS_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class ProgressEventDTO:
+    """
+    One progress event of a batch upload
+
+    idempotency_key is chosen by the client and is unique per user, so an
+    event uploaded again after a failed or interrupted sync is not counted
+    twice. date is when the event happened on the device, defaulting to the
+    time it is received.
+    """
+
+    def __init__(self, **kwargs):
+        self.idempotency_key = kwargs.get("idempotency_key")
+        self.content_type = kwargs.get("content_type")
+        self.points_collected = kwargs.get("points_collected")
+        self.date = kwargs.get("date")
+
+    def validate(self):
+        error_list = []
+        if type(self.idempotency_key) is not str or not (
+            0 < len(self.idempotency_key) <= 64
+        ):
+            error_list.append(
+                "The idempotency_key supplied is not a string of 1 to 64 characters."
+            )
+        if type(self.content_type) is not str or not (0 < len(self.content_type) <= 50):
+            error_list.append(
+                "The content_type supplied is not a string of 1 to 50 characters."
+            )
+        if type(self.points_collected) is not int or self.points_collected < 0:
+            error_list.append(
+                "The points_collected supplied is not a non-negative integer."
+            )
+        if self.date is not None:
+            try:
+                datetime.strptime(self.date, PROGRESS_DATE_FORMAT)
+            except (TypeError, ValueError):
+                error_list.append(
+                    "The date supplied is not formatted as YYYY-MM-DD HH:MM:SS."
+                )
+        return error_list
+
+    def to_progress_item(self):
+        return {
+            "idempotency_key": self.idempotency_key,
+            "content_type": self.content_type,
+            "points_collected": self.points_collected,
+            "date": (
+                datetime.strptime(self.date, PROGRESS_DATE_FORMAT)
+                if self.date is not None
+                else None
+            ),
+        }
@@ -1,6 +1,7 @@
 from flask import Blueprint, current_app, request, jsonify
 
 from ..middlewares.auth import require_authorization_by_role
+from ..middlewares.conditional import conditional_get
 from ..middlewares.validate import validate_request
 from ..services.implementations.article_service import ArticleService
 from ..resources.article_dto import ArticleDTO
@@ -12,10 +13,13 @@ blueprint = Blueprint("article", __name__, url_prefix="/articles")
 
 @blueprint.route("/", methods=["GET"], strict_slashes=False)
 @require_authorization_by_role({"User", "Admin"})
+@conditional_get(lambda: article_service.get_articles_version())
 def get_articles():
     try:
-        result = article_service.get_all_articles()
+        result = article_service.get_all_articles(fields=request.args.get("fields"))
         return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error retrieving articles: {str(e)}")
         return jsonify({"error": "Failed to retrieve articles"}), 500
@@ -23,6 +27,7 @@ def get_articles():
 
 @blueprint.route("/<int:id>", methods=["GET"], strict_slashes=False)
 @require_authorization_by_role({"User", "Admin"})
+@conditional_get(lambda id: article_service.get_article_version(id))
 def get_article(id):
     try:
         result = article_service.get_article_by_id(id, include_relationships=True)
@@ -8,25 +8,11 @@ from ..middlewares.auth import (
 )
 from ..middlewares.validate import validate_request
 from ..resources.create_user_dto import CreateUserDTO
-from ..services.implementations.auth_service import AuthService
-from ..services.implementations.email_service import EmailService
-from ..services.implementations.user_service import UserService
-
-
-email_service = EmailService(
-    current_app.logger,
-    {
-        "token": os.getenv("MAILER_TOKEN"),
-        "refresh_token": os.getenv("MAILER_REFRESH_TOKEN"),
-        "token_uri": "https://oauth2.googleapis.com/token",
-        "client_id": os.getenv("MAILER_CLIENT_ID"),
-        "client_secret": os.getenv("MAILER_CLIENT_SECRET"),
-    },
-    os.getenv("MAILER_USER"),
-    "SMVS Youth App",  # must replace
-)
-user_service = UserService(current_app.logger, email_service)
-auth_service = AuthService(current_app.logger, user_service, email_service)
+from ..services.container import services
+
+
+user_service = services.lazy("user")
+auth_service = services.lazy("auth")
 
 cookie_options = {
     "httponly": True,
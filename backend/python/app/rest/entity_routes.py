@@ -7,8 +7,7 @@ from ..resources.entity_dto import EntityDTO
 from ..middlewares.auth import require_authorization_by_role
 from ..middlewares.validate import validate_request
 
-from ..services.implementations.entity_service import EntityService
-from ..services.implementations.file_storage_service import FileStorageService
+from ..services.container import services
 from ..utilities.csv_utils import generate_csv_from_list
 
 DEFAULT_CSV_OPTIONS = {
@@ -17,11 +16,9 @@ DEFAULT_CSV_OPTIONS = {
     "flatten_objects": False,
 }
 
-# define instance of FileStorageService
-file_storage_service = FileStorageService(current_app.logger)
-
-# define instance of EntityService
-entity_service = EntityService(current_app.logger, file_storage_service)
+# shared FileStorageService and EntityService, constructed on first use
+file_storage_service = services.lazy("file_storage")
+entity_service = services.lazy("entity")
 
 # defines a shared URL prefix for all routes
 blueprint = Blueprint("entity", __name__, url_prefix="/entities")
@@ -1,33 +1,83 @@
 import os
 
+import click
 from flask import Blueprint, current_app, jsonify, request
 
 from ..middlewares.auth import require_authorization_by_role
+from ..middlewares.conditional import conditional_get
 from ..middlewares.validate import validate_request
 from ..resources.feed_dto import FeedDTO
-from ..services.implementations.feed_service import FeedService
-from ..services.implementations.user_service import UserService
-from ..services.implementations.email_service import EmailService
+from ..services.implementations.feed_service import (
+    DEFAULT_COMMENT_DEPTH,
+    DEFAULT_REPLIES_PER_COMMENT,
+    FeedService,
+)
+from ..services.container import services
+from ..utilities.pagination import parse_page_size
+from ..utilities.periodic import PeriodicTask
+from ..utilities.view_counter import (
+    InMemoryCounterStore,
+    RedisCounterStore,
+    ViewCounterBuffer,
+)
 
 # Initialize the feed service
 feed_service = FeedService(current_app.logger)
 
+
+def _view_counter_store():
+    """
+    Share buffered views across worker processes through Redis when
+    VIEW_COUNTER_REDIS_URL is set, otherwise buffer them in this process.
+    """
+    redis_url = os.getenv("VIEW_COUNTER_REDIS_URL")
+    if not redis_url:
+        return InMemoryCounterStore()
+
+    import redis
+
+    return RedisCounterStore(redis.Redis.from_url(redis_url))
+
+
+view_counter = ViewCounterBuffer(
+    current_app._get_current_object(),
+    current_app.logger,
+    feed_service.flush_view_counts,
+    store=_view_counter_store(),
+    flush_interval=float(os.getenv("VIEW_COUNTER_FLUSH_INTERVAL", 5)),
+)
+
 # Define the Blueprint for feeds
 blueprint = Blueprint("feeds", __name__, url_prefix="/feeds")
 
+# Likes and comments keep likes_count and comments_count current; this
+# periodically repairs counters that drifted anyway (e.g. rows changed by
+# hand or before counts were updated atomically). 0 disables it.
+COUNTER_RECONCILE_INTERVAL = float(os.getenv("FEED_COUNTER_RECONCILE_INTERVAL", 900))
 
-email_service = EmailService(
+counter_reconciler = PeriodicTask(
+    current_app._get_current_object(),
     current_app.logger,
-    {
-        "refresh_token": os.getenv("MAILER_REFRESH_TOKEN"),
-        "token_uri": "https://oauth2.googleapis.com/token",
-        "client_id": os.getenv("MAILER_CLIENT_ID"),
-        "client_secret": os.getenv("MAILER_CLIENT_SECRET"),
-    },
-    os.getenv("MAILER_USER"),
-    "SMVS Youth App",  # must replace
+    "feed-counter-reconcile",
+    COUNTER_RECONCILE_INTERVAL,
+    feed_service.reconcile_counters,
+    run_on_stop=False,
 )
-user_service = UserService(current_app.logger, email_service)
+if COUNTER_RECONCILE_INTERVAL > 0:
+    blueprint.before_app_first_request(counter_reconciler.start)
+
+
+@blueprint.cli.command("reconcile-counters")
+def reconcile_counters_command():
+    """
+    Recompute drifted likes_count and comments_count of every feed post.
+    """
+    click.echo(
+        "Corrected {count} feed posts".format(count=feed_service.reconcile_counters())
+    )
+
+
+user_service = services.lazy("user")
 
 # @blueprint.route("/", methods=["GET"], strict_slashes=False)
 # @require_authorization_by_role({"User", "Admin"})
@@ -45,19 +95,40 @@ user_service = UserService(current_app.logger, email_service)
 
 @blueprint.route("/", methods=["GET"], strict_slashes=False)
 @require_authorization_by_role({"User", "Admin"})
+@conditional_get(lambda: feed_service.get_feeds_version(request.args.get("location")))
 def get_feeds():
     """
     Get all feed posts or filter by location if provided.
+
+    Passing a limit and/or cursor query param returns a single page instead:
+    {"feeds": [...], "next_cursor": "..."}, where next_cursor is null on the last page.
+
+    Passing fields, e.g. ?fields=id,title,likes_count, returns only those
+    columns of each post (without users_who_have_liked).
     """
     try:
         location = request.args.get("location")  # Get the location from query params
+        fields = request.args.get("fields")  # e.g. id,title,likes_count
+
+        if "limit" in request.args or "cursor" in request.args:
+            try:
+                limit = parse_page_size(request.args.get("limit"))
+                page = feed_service.get_feeds_page(
+                    location, limit, request.args.get("cursor"), fields
+                )
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            return jsonify(page), 200
 
-        if location:
-            # If a location is provided, filter feeds by location
-            feeds = feed_service.get_feeds_by_location(location)
-        else:
-            # Otherwise, return all feeds
-            feeds = feed_service.get_entities()
+        try:
+            if location:
+                # If a location is provided, filter feeds by location
+                feeds = feed_service.get_feeds_by_location(location, fields)
+            else:
+                # Otherwise, return all feeds
+                feeds = feed_service.get_entities(fields)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         return jsonify([feed for feed in feeds]), 200
     except Exception as e:
@@ -68,6 +139,7 @@ def get_feeds():
 
 @blueprint.route("/<int:feed_id>", methods=["GET"], strict_slashes=False)
 @require_authorization_by_role({"User", "Admin"})
+@conditional_get(lambda feed_id: feed_service.get_feed_version(feed_id))
 def get_feed(feed_id):
     """
     Get a single feed post by ID
@@ -155,11 +227,35 @@ def add_comment(feed_id):
 
 @blueprint.route("/<int:feed_id>/comments", methods=["GET"], strict_slashes=False)
 @require_authorization_by_role({"User", "Admin"})
+@conditional_get(feed_service.get_comments_version)
 def get_feed_comments(feed_id):
     """
     Get all comments for a specific feed post.
+
+    Passing mode=tree returns a page of threads instead, nested and oldest
+    first: {"comments": [...], "next_cursor": "..."}. limit and cursor page
+    through the top-level comments, depth (default 3) limits the levels of
+    replies and replies (default 3) the replies included per comment. The
+    rest of a comment's replies are fetched with parent_id=<comment id> and
+    cursor=<its replies_cursor>.
     """
     try:
+        if request.args.get("mode") == "tree":
+            try:
+                tree = feed_service.get_comment_tree(
+                    feed_id,
+                    parent_id=request.args.get("parent_id", type=int),
+                    limit=parse_page_size(request.args.get("limit")),
+                    cursor=request.args.get("cursor"),
+                    depth=request.args.get("depth", DEFAULT_COMMENT_DEPTH, type=int),
+                    replies=request.args.get(
+                        "replies", DEFAULT_REPLIES_PER_COMMENT, type=int
+                    ),
+                )
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            return jsonify(tree), 200
+
         comments = feed_service.get_comments_for_feed(feed_id)
         return jsonify(comments), 200
     except Exception as e:
@@ -175,6 +271,8 @@ def add_like(feed_id):
     """
     try:
         user_id = request.json.get("user_id")
+        if not user_id:
+            return jsonify({"error": "User ID is required"}), 400
         updated_feed = feed_service.add_like(feed_id, user_id)
         return jsonify(updated_feed), 200
     except Exception as e:
@@ -186,11 +284,17 @@ def add_like(feed_id):
 @require_authorization_by_role({"User", "Admin"})
 def increment_view(feed_id):
     """
-    Increment the view count of a feed post.
+    Record a view of a feed post.
+
+    Views are buffered and written to views_count in batches every
+    VIEW_COUNTER_FLUSH_INTERVAL seconds, so the response only acknowledges the view.
     """
     try:
-        updated_feed = feed_service.increment_view_count(feed_id)
-        return jsonify(updated_feed), 200
+        # the batched flush silently skips unknown ids, so reject them here
+        if not feed_service.feed_exists(feed_id):
+            return jsonify({"error": "Invalid feed ID"}), 404
+        view_counter.record(feed_id)
+        return jsonify({"id": feed_id, "pending_views": view_counter.pending_for(feed_id)}), 202
     except Exception as e:
         error_message = getattr(e, "message", None)
         return jsonify({"error": error_message if error_message else str(e)}), 500
@@ -203,6 +307,8 @@ def remove_like(feed_id):
     """
     try:
         user_id = request.json.get("user_id")
+        if not user_id:
+            return jsonify({"error": "User ID is required"}), 400
         updated_feed = feed_service.remove_like(feed_id, user_id)
         return jsonify(updated_feed), 200
     except Exception as e:
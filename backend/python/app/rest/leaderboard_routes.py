@@ -0,0 +1,62 @@
+from flask import Blueprint, jsonify, request
+
+from ..middlewares.auth import require_authorization_by_role
+from ..services.container import services
+from ..utilities.pagination import parse_page_size
+
+leaderboard_service = services.lazy("leaderboard")
+
+blueprint = Blueprint("leaderboard", __name__, url_prefix="/leaderboard")
+
+
+def _board_key():
+    return leaderboard_service.board_key(
+        board=request.args.get("board", "global"),
+        location=request.args.get("location"),
+        week=request.args.get("week"),
+    )
+
+
+@blueprint.route("/", methods=["GET"], strict_slashes=False)
+@require_authorization_by_role({"User", "Admin"})
+def get_leaderboard():
+    """
+    Top users of a leaderboard by points
+
+    board is global (default), centre (with location) or week (with week,
+    an ISO week such as 2024-W05, defaulting to the current week)
+    """
+    try:
+        limit = parse_page_size(request.args.get("limit"))
+        offset = request.args.get("offset", 0, type=int)
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+        return jsonify(leaderboard_service.get_top(_board_key(), limit, offset)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_message = getattr(e, "message", None)
+        return jsonify({"error": (error_message if error_message else str(e))}), 500
+
+
+@blueprint.route("/users/<int:user_id>", methods=["GET"], strict_slashes=False)
+@require_authorization_by_role({"User", "Admin"})
+def get_user_rank(user_id):
+    """
+    Rank and points of one user on a leaderboard, same board parameters as above
+    """
+    try:
+        rank = leaderboard_service.get_rank(_board_key(), user_id)
+        if rank is None:
+            return (
+                jsonify(
+                    {"error": "user_id {} has no points on this board".format(user_id)}
+                ),
+                404,
+            )
+        return jsonify(rank), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_message = getattr(e, "message", None)
+        return jsonify({"error": (error_message if error_message else str(e))}), 500
@@ -0,0 +1,24 @@
+import hmac
+import os
+
+from flask import Blueprint, Response, jsonify, request
+
+from ..middlewares.auth import get_access_token
+from ..utilities.metrics import registry
+
+# when set, scrapers must send "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+blueprint = Blueprint("metrics", __name__, url_prefix="/metrics")
+
+
+@blueprint.route("/", methods=["GET"], strict_slashes=False)
+def get_metrics():
+    """
+    Metrics of this process in the Prometheus text exposition format
+    """
+    if METRICS_TOKEN and not hmac.compare_digest(
+        get_access_token(request) or "", METRICS_TOKEN
+    ):
+        return jsonify({"error": "You are not authorized to make this request."}), 401
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
@@ -1,6 +1,7 @@
 from flask import Blueprint, current_app, request, jsonify
 
 from ..middlewares.auth import require_authorization_by_role
+from ..middlewares.conditional import conditional_get
 from ..middlewares.validate import validate_request
 from ..services.implementations.quiz_service import QuizService
 from ..resources.quiz_dto import QuizDTO
@@ -12,10 +13,13 @@ blueprint = Blueprint("quiz", __name__, url_prefix="/quizzes")
 
 @blueprint.route("/", methods=["GET"], strict_slashes=False)
 @require_authorization_by_role({"User", "Admin"})
+@conditional_get(lambda: quiz_service.get_quizzes_version())
 def get_quizzes():
     try:
-        result = quiz_service.get_all_quizzes()
+        result = quiz_service.get_all_quizzes(fields=request.args.get("fields"))
         return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error retrieving quizzes: {str(e)}")
         return jsonify({"error": "Failed to retrieve quizzes"}), 500
@@ -23,6 +27,7 @@ def get_quizzes():
 
 @blueprint.route("/<int:id>", methods=["GET"], strict_slashes=False)
 @require_authorization_by_role({"User", "Admin"})
+@conditional_get(lambda id: quiz_service.get_quiz_version(quiz_id=id))
 def get_quiz(id):
     try:
         result = quiz_service.get_quiz_by_id(id)
@@ -36,6 +41,9 @@ def get_quiz(id):
 
 @blueprint.route("/article/<int:article_id>", methods=["GET"], strict_slashes=False)
 @require_authorization_by_role({"User", "Admin"})
+@conditional_get(
+    lambda article_id: quiz_service.get_quiz_version(article_id=article_id)
+)
 def get_quiz_by_article(article_id):
     try:
         result = quiz_service.get_quiz_by_article_id(article_id)
@@ -1,44 +1,105 @@
-from flask import Blueprint, current_app, request, jsonify
+import json
+import os
 
-from ..services.implementations.reflection_service import ReflectionService
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+
+from ..middlewares.conditional import conditional_get
+from ..services.implementations.reflection_service import (
+    AI_RESPONSE_COMPLETED,
+    ReflectionService,
+)
 from ..resources.reflection_dto import ReflectionDTO, ReflectionPromptDTO, AiResponseDTO
+from ..utilities.worker_pool import WorkerPool, WorkerPoolFullError
 
 reflection_service = ReflectionService(current_app.logger)
 
+# generate AI responses in the background instead of during POST /reflections,
+# either for every request (REFLECTION_AI_ASYNC=true) or when a request passes ?async=true
+REFLECTION_AI_ASYNC = os.getenv("REFLECTION_AI_ASYNC", "false").lower() == "true"
+# upper bound of the ?wait= long-poll of GET /reflections/<id>
+REFLECTION_MAX_WAIT_SECONDS = float(os.getenv("REFLECTION_MAX_WAIT_SECONDS", 25))
+
+ai_response_pool = WorkerPool(
+    current_app._get_current_object(),
+    current_app.logger,
+    "reflection-ai",
+    max_workers=int(os.getenv("REFLECTION_AI_WORKERS", 4)),
+    max_queue=int(os.getenv("REFLECTION_AI_MAX_QUEUE", 100)),
+)
+
 blueprint = Blueprint("reflection", __name__, url_prefix="/reflections")
 
 
+def _requested_user_id():
+    return request.args.get("user_id", 1, type=int)
+
+
+def _async_requested(body):
+    requested = request.args.get("async", body.get("async"))
+    if requested is None:
+        return REFLECTION_AI_ASYNC
+    return str(requested).lower() in ("1", "true")
+
+
 @blueprint.route("/", methods=["GET"], strict_slashes=False)
+@conditional_get(
+    lambda: reflection_service.get_reflections_version(_requested_user_id())
+)
 def get_reflections():
     try:
         # Get user_id from query parameters
         user_id = request.args.get("user_id", 1, type=int)
-        result = reflection_service.get_all_reflections(user_id)
+        result = reflection_service.get_all_reflections(
+            user_id, fields=request.args.get("fields")
+        )
         return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error retrieving reflections: {str(e)}")
         return jsonify({"error": "Failed to retrieve reflections"}), 500
 
 
 @blueprint.route("/recent", methods=["GET"], strict_slashes=False)
+@conditional_get(
+    lambda: reflection_service.get_reflections_version(_requested_user_id())
+)
 def get_recent_reflections():
     try:
         # Get user_id from query parameters
         user_id = request.args.get("user_id", 1, type=int)
         limit = request.args.get("limit", 5, type=int)
-        result = reflection_service.get_recent_reflections(user_id, limit)
+        result = reflection_service.get_recent_reflections(
+            user_id, limit, fields=request.args.get("fields")
+        )
         return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error retrieving recent reflections: {str(e)}")
         return jsonify({"error": "Failed to retrieve reflections"}), 500
 
 
 @blueprint.route("/<int:id>", methods=["GET"], strict_slashes=False)
+@conditional_get(
+    # a long-poll waits for a newer version, so it must not be answered with 304
+    lambda id: None
+    if "wait" in request.args
+    else reflection_service.get_reflection_version(id, _requested_user_id())
+)
 def get_reflection(id):
+    """
+    Get a reflection. Passing ?wait=<seconds> waits up to that long (capped at
+    REFLECTION_MAX_WAIT_SECONDS) for a pending ai_response to be filled in.
+    """
     try:
         # Get user_id from query parameters
         user_id = request.args.get("user_id", 1, type=int)
-        result = reflection_service.get_reflection_by_id(id, user_id)
+        wait = min(request.args.get("wait", 0, type=float), REFLECTION_MAX_WAIT_SECONDS)
+        if wait > 0:
+            result = reflection_service.wait_for_ai_response(id, user_id, wait)
+        else:
+            result = reflection_service.get_reflection_by_id(id, user_id)
         if not result:
             return jsonify({"error": "Reflection not found"}), 404
         return jsonify(result), 200
@@ -49,6 +110,13 @@ def get_reflection(id):
 
 @blueprint.route("/", methods=["POST"], strict_slashes=False)
 def create_reflection():
+    """
+    Create a reflection, generating its AI response if none is given.
+
+    In async mode the reflection is stored right away with a pending
+    ai_response_status and 202 is returned; poll or long-poll
+    GET /reflections/<id> until the status is completed.
+    """
     try:
         body = request.json
         
@@ -63,6 +131,17 @@ def create_reflection():
         # Create the reflection first
         reflection_data = reflection_dto.to_dict()
         
+        if not reflection_data.get("ai_response") and _async_requested(body):
+            result = reflection_service.create_pending_reflection(reflection_data)
+            try:
+                ai_response_pool.submit(reflection_service.fill_ai_response, result["id"])
+            except WorkerPoolFullError as e:
+                # don't block this worker on the AI API when the pool is saturated
+                current_app.logger.warning(f"Using fallback AI response: {str(e)}")
+                reflection_service.fill_ai_response(result["id"], use_fallback=True)
+                result = reflection_service.get_reflection_by_id(result["id"])
+            return jsonify(result), 202
+
         # Generate AI response if not provided
         if not reflection_data.get("ai_response"):
             ai_response = reflection_service.generate_ai_response(
@@ -160,16 +239,18 @@ def generate_ai_response():
         if not reflection_type:
             return jsonify({"error": "reflection_type is required"}), 400
 
+        # bypass_cache asks for a fresh response instead of a cached one
         ai_response = reflection_service.generate_ai_response(
             user_reflection, 
-            reflection_type
+            reflection_type,
+            bypass_cache=bool(body.get("bypass_cache", False)),
         )
         
         # If there's a reflection_id, update the existing reflection
         if reflection_id:
             reflection_service.update_reflection(
                 reflection_id,
-                {"ai_response": ai_response},
+                {"ai_response": ai_response, "ai_response_status": AI_RESPONSE_COMPLETED},
                 user_id
             )
         
@@ -178,3 +259,60 @@ def generate_ai_response():
     except Exception as e:
         current_app.logger.error(f"Error generating AI response: {str(e)}")
         return jsonify({"error": "Failed to generate AI response"}), 500
+
+
+def _sse(event, data):
+    return "event: {event}\ndata: {data}\n\n".format(event=event, data=json.dumps(data))
+
+
+@blueprint.route("/ai-response/stream", methods=["POST"], strict_slashes=False)
+def stream_ai_response():
+    """
+    Stream an AI response as Server-Sent Events while it is generated.
+
+    Sends a "token" event ({"text": ...}) per chunk, then a "done" event with
+    the full ai_response once it has been saved to reflection_id (if given),
+    or an "error" event if saving fails.
+    """
+    body = request.json or {}
+
+    user_reflection = body.get("user_reflection")
+    reflection_type = body.get("reflection_type")
+    reflection_id = body.get("reflection_id")
+    user_id = body.get("user_id", 1)
+    bypass_cache = bool(body.get("bypass_cache", False))
+
+    if not user_reflection:
+        return jsonify({"error": "user_reflection is required"}), 400
+    if not reflection_type:
+        return jsonify({"error": "reflection_type is required"}), 400
+
+    def generate():
+        chunks = []
+        for chunk in reflection_service.stream_ai_response(
+            user_reflection, reflection_type, bypass_cache=bypass_cache
+        ):
+            chunks.append(chunk)
+            yield _sse("token", {"text": chunk})
+
+        ai_response = "".join(chunks)
+        if reflection_id:
+            try:
+                reflection_service.update_reflection(
+                    reflection_id,
+                    {"ai_response": ai_response, "ai_response_status": AI_RESPONSE_COMPLETED},
+                    user_id,
+                )
+            except Exception as e:
+                current_app.logger.error(f"Error saving streamed AI response: {str(e)}")
+                yield _sse("error", {"error": "Failed to save AI response"})
+                return
+
+        yield _sse("done", {"ai_response": ai_response, "reflection_id": reflection_id})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        # keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
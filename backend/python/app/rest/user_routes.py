@@ -9,26 +9,20 @@ from ..resources.create_user_dto import CreateUserDTO
 from ..resources.update_user_dto import UpdateUserDTO
 from ..resources.email_users_dto import EmailUsersDTO
 from ..resources.create_progress_dto import CreateProgressDTO
-from ..services.implementations.auth_service import AuthService
-from ..services.implementations.email_service import EmailService
-from ..services.implementations.user_service import UserService
+from ..resources.progress_event_dto import ProgressEventDTO
+from ..services.container import services
 from ..utilities.csv_utils import generate_csv_from_list
 
 
-email_service = EmailService(
-    current_app.logger,
-    {
-        "refresh_token": os.getenv("MAILER_REFRESH_TOKEN"),
-        "token_uri": "https://oauth2.googleapis.com/token",
-        "client_id": os.getenv("MAILER_CLIENT_ID"),
-        "client_secret": os.getenv("MAILER_CLIENT_SECRET"),
-    },
-    os.getenv("MAILER_USER"),
-    "SMVS Youth App",  # must replace
-)
-user_service = UserService(current_app.logger, email_service)
-auth_service = AuthService(current_app.logger, user_service, email_service)
+user_service = services.lazy("user")
+auth_service = services.lazy("auth")
+email_dispatch_service = services.lazy("email_dispatch")
 blueprint = Blueprint("users", __name__, url_prefix="/users")
+# resume any bulk email jobs left pending by a restart
+blueprint.before_app_first_request(lambda: email_dispatch_service.start())
+
+# most progress events accepted by one POST /users/update_progress/batch
+MAX_PROGRESS_BATCH_SIZE = int(os.getenv("MAX_PROGRESS_BATCH_SIZE", 500))
 
 DEFAULT_CSV_OPTIONS = {
     "header": True,
@@ -181,7 +175,9 @@ def delete_user():
 @require_authorization_by_role("Admin")
 def send_email_notifs():
     """
-    Email users with notifs_enabled=True, optionally filtered by location.
+    Queue an email to users with notifs_enabled=True, optionally filtered by location.
+    Returns the id of the background job, whose progress is reported by
+    GET /users/send_email_notifs/<job_id>.
     """
     try:
         email_info = EmailUsersDTO(**request.json)
@@ -189,18 +185,39 @@ def send_email_notifs():
 
         if location:
             # Get users filtered by location
-            users_in_location = user_service.get_users_by_location(location)
+            users = user_service.get_users_by_location(location)
 
-            if not users_in_location:
-                return jsonify({"error": f"No users found in location: {location}"}), 404
-            
-            # Send emails only to users in the specified location
-            user_service.email_users_in_location(users_in_location, email_info.subject, email_info.body)
+            if not users:
+                return (
+                    jsonify({"error": f"No users found in location: {location}"}),
+                    404,
+                )
         else:
             # Default behavior: email all users if no location is provided
-            user_service.email_all_users(email_info.subject, email_info.body)
+            users = user_service.get_users_with_notifs()
 
-        return "", 204
+        job = email_dispatch_service.enqueue(
+            [user.email_address for user in users], email_info.subject, email_info.body
+        )
+        return jsonify({"job_id": job["id"], **job}), 202
+    except Exception as e:
+        error_message = getattr(e, "message", None)
+        return jsonify({"error": (error_message if error_message else str(e))}), 500
+
+
+@blueprint.route(
+    "/send_email_notifs/<int:job_id>", methods=["GET"], strict_slashes=False
+)
+@require_authorization_by_role("Admin")
+def get_email_notifs_job(job_id):
+    """
+    Get the status and sent/failed/pending counts of a bulk email job
+    """
+    try:
+        job = email_dispatch_service.get_job(job_id)
+        if not job:
+            return jsonify({"error": f"Email job {job_id} not found"}), 404
+        return jsonify(job), 200
     except Exception as e:
         error_message = getattr(e, "message", None)
         return jsonify({"error": (error_message if error_message else str(e))}), 500
@@ -219,14 +236,75 @@ def upgrade_progress():
         progress_dict = {
             "user_id": progress.user_id,
             "content_type": progress.content_type,
-            "points_collected": progress.points_collected
+            "points_collected": progress.points_collected,
         }
         created_progress = user_service.update_progress(progress_dict)
         return jsonify(created_progress.__dict__), 201
     except Exception as e:
         error_message = getattr(e, "message", None)
         return jsonify({"error": (error_message if error_message else str(e))}), 500
-    
+
+
+@blueprint.route("/update_progress/batch", methods=["POST"], strict_slashes=False)
+@require_authorization_by_role({"User", "Admin"})
+def update_progress_batch():
+    """
+    Add several progress events for a user, e.g. when an offline client syncs
+
+    Body: {"user_id": 1, "events": [{"idempotency_key", "content_type",
+    "points_collected", "date" (optional, YYYY-MM-DD HH:MM:SS)}, ...]}
+
+    Responds with one result per event, in order, whose status is "created",
+    "duplicate" (the key was already stored, progress is the stored row) or
+    "invalid" (with errors, nothing stored). Valid events are stored even
+    when others are invalid.
+    """
+    body = request.get_json(silent=True) or {}
+    user_id = body.get("user_id")
+    events = body.get("events")
+    if type(user_id) is not int:
+        return jsonify({"error": "user_id is required and must be an integer"}), 400
+    if type(events) is not list or not 0 < len(events) <= MAX_PROGRESS_BATCH_SIZE:
+        return (
+            jsonify(
+                {
+                    "error": "events must be a list of 1 to {maximum} events".format(
+                        maximum=MAX_PROGRESS_BATCH_SIZE
+                    )
+                }
+            ),
+            400,
+        )
+
+    results = [None] * len(events)
+    valid = []
+    for index, event in enumerate(events):
+        dto = ProgressEventDTO(**event) if type(event) is dict else ProgressEventDTO()
+        errors = dto.validate()
+        if errors:
+            results[index] = {
+                "idempotency_key": dto.idempotency_key,
+                "status": "invalid",
+                "errors": errors,
+            }
+        else:
+            valid.append((index, dto.to_progress_item()))
+
+    try:
+        if valid:
+            stored = user_service.create_progress_batch(
+                user_id, [item for _, item in valid]
+            )
+            for (index, _), result in zip(valid, stored):
+                results[index] = result
+        return jsonify({"results": results}), 200
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        error_message = getattr(e, "message", None)
+        return jsonify({"error": (error_message if error_message else str(e))}), 500
+
+
 @blueprint.route("/get_points_by_date", methods=["GET"], strict_slashes=False)
 @require_authorization_by_role({"User", "Admin"})
 def get_points_by_date():
@@ -238,37 +316,81 @@ def get_points_by_date():
         user_id = request.args.get("user_id")
         start_date = request.args.get("start_date")
         end_date = request.args.get("end_date")
-        
+
         # Validate required parameters
         if not user_id:
             return jsonify({"error": "user_id is required"}), 400
-            
+
         # Convert dates if provided
         date_params = {}
         if start_date:
             try:
                 date_params["start_date"] = datetime.strptime(start_date, "%Y-%m-%d")
             except ValueError:
-                return jsonify({"error": "Invalid start_date format. Use YYYY-MM-DD"}), 400
-                
+                return (
+                    jsonify({"error": "Invalid start_date format. Use YYYY-MM-DD"}),
+                    400,
+                )
+
         if end_date:
             try:
                 date_params["end_date"] = datetime.strptime(end_date, "%Y-%m-%d")
             except ValueError:
-                return jsonify({"error": "Invalid end_date format. Use YYYY-MM-DD"}), 400
-        
+                return (
+                    jsonify({"error": "Invalid end_date format. Use YYYY-MM-DD"}),
+                    400,
+                )
+
         # Call service method with parameters
         progress_points = user_service.get_points_by_date(user_id, **date_params)
-             # Use to_dict() method on each Progress object to make it serializable
+        # Use to_dict() method on each Progress object to make it serializable
         serialized_points = [p.to_dict() for p in progress_points]
-        points_sum = sum(p["points_collected"] for p in serialized_points)
 
         # Return results
         return jsonify(serialized_points), 200
     except Exception as e:
         error_message = getattr(e, "message", None)
         return jsonify({"error": (error_message if error_message else str(e))}), 500
-    
+
+
+@blueprint.route("/get_points_summary", methods=["GET"], strict_slashes=False)
+@require_authorization_by_role({"User", "Admin"})
+def get_points_summary():
+    """
+    Sum a user's progress points per day, week or month, optionally by content type
+    """
+    user_id = request.args.get("user_id", type=int)
+    if not user_id:
+        return jsonify({"error": "user_id is required"}), 400
+
+    dates = {}
+    for param in ("start_date", "end_date"):
+        value = request.args.get(param)
+        if value:
+            try:
+                dates[param] = datetime.strptime(value, "%Y-%m-%d").date()
+            except ValueError:
+                return (
+                    jsonify({"error": f"Invalid {param} format. Use YYYY-MM-DD"}),
+                    400,
+                )
+
+    try:
+        summary = user_service.get_points_summary(
+            user_id,
+            granularity=request.args.get("granularity", "day"),
+            by_content_type=request.args.get("by_content_type", "false").lower()
+            == "true",
+            **dates,
+        )
+        return jsonify(summary), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        error_message = getattr(e, "message", None)
+        return jsonify({"error": (error_message if error_message else str(e))}), 500
+
+
 @blueprint.route("/delete_progress", methods=["DELETE"], strict_slashes=False)
 @require_authorization_by_role({"Admin", "User"})  # Restrict to admins for safety
 def delete_user_progress():
@@ -278,16 +400,21 @@ def delete_user_progress():
     try:
         # Get user_id from query parameters
         user_id = request.args.get("user_id")
-        
+
         # Validate required parameters
         if not user_id:
             return jsonify({"error": "user_id is required"}), 400
-            
+
         # Call service method
         deleted_count = user_service.delete_progress(user_id)
-        
+
         # Return success response with count of deleted records
-        return jsonify({"message": f"Successfully deleted {deleted_count} progress records"}), 200
+        return (
+            jsonify(
+                {"message": f"Successfully deleted {deleted_count} progress records"}
+            ),
+            200,
+        )
     except Exception as e:
         error_message = getattr(e, "message", None)
         return jsonify({"error": (error_message if error_message else str(e))}), 500
@@ -0,0 +1,219 @@
+"""
+Process-wide registry of shared service instances
+
+Blueprints and middlewares used to construct their own EmailService,
+UserService and AuthService at import time, so every worker built several
+copies of each (and loaded the Gmail discovery document once per copy)
+before serving its first request. Services are now registered here by name
+and built once, on first use, then shared by every caller:
+
+    from ..services.container import services
+
+    user_service = services.lazy("user")  # nothing is constructed yet
+    user_service.get_users()              # builds email and user services
+
+The time spent constructing each service (excluding the services it depends
+on) is kept in services.timings and exported as the service_init_seconds
+gauge.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+from ..utilities.metrics import registry
+
+service_init_seconds = registry.gauge(
+    "service_init_seconds",
+    "Time spent constructing each shared service, excluding its dependencies",
+    ["service"],
+)
+
+
+class ServiceContainer:
+    def __init__(self):
+        self._factories = OrderedDict()
+        self._instances = {}
+        # reentrant so that a factory can get() the services it depends on
+        self._lock = threading.RLock()
+        self._building = []
+        self.timings = OrderedDict()
+
+    def register(self, name, factory):
+        """
+        Register factory as the constructor of the service called name
+
+        :param name: name the service is looked up by
+        :type name: str
+        :param factory: called with the container, returns the service instance
+        :type factory: callable
+        """
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def get(self, name):
+        """
+        Return the shared instance of a service, constructing it if needed
+
+        :raises KeyError: if no service is registered under name
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is not None:
+                return instance
+            if name in self._building:
+                raise RuntimeError(
+                    "Circular service dependency: {chain}".format(
+                        chain=" -> ".join(self._building + [name])
+                    )
+                )
+            factory = self._factories[name]
+
+            self._building.append(name)
+            start = time.perf_counter()
+            dependencies_before = sum(self.timings.values())
+            try:
+                instance = factory(self)
+            finally:
+                self._building.pop()
+            elapsed = time.perf_counter() - start
+            # dependencies built by the factory recorded their own timings
+            elapsed -= sum(self.timings.values()) - dependencies_before
+
+            self.timings[name] = elapsed
+            service_init_seconds.labels(service=name).set(elapsed)
+            self._instances[name] = instance
+            return instance
+
+    def lazy(self, name):
+        """
+        Return a proxy that constructs the service on first attribute access
+
+        :rtype: LazyService
+        """
+        return LazyService(self, name)
+
+    def is_built(self, name):
+        return name in self._instances
+
+    def names(self):
+        return list(self._factories)
+
+    def reset(self):
+        """
+        Drop every constructed instance, they are rebuilt on next use
+        """
+        with self._lock:
+            self._instances.clear()
+            self.timings.clear()
+
+
+class LazyService:
+    """
+    Stand-in for a shared service that resolves it from the container on use
+    """
+
+    __slots__ = ("_container", "_name")
+
+    def __init__(self, container, name):
+        self._container = container
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._container.get(self._name), attr)
+
+    def __repr__(self):
+        return "<LazyService {name}>".format(name=self._name)
+
+
+def _mailer_credentials():
+    return {
+        "token": os.getenv("MAILER_TOKEN"),
+        "refresh_token": os.getenv("MAILER_REFRESH_TOKEN"),
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "client_id": os.getenv("MAILER_CLIENT_ID"),
+        "client_secret": os.getenv("MAILER_CLIENT_SECRET"),
+    }
+
+
+def _email_service(container):
+    from .implementations.email_service import EmailService
+
+    return EmailService(
+        current_app.logger,
+        _mailer_credentials(),
+        os.getenv("MAILER_USER"),
+        "SMVS Youth App",  # must replace
+    )
+
+
+def _user_service(container):
+    from .implementations.user_service import UserService
+
+    return UserService(
+        current_app.logger,
+        container.get("email"),
+        leaderboard_service=container.get("leaderboard"),
+    )
+
+
+def _auth_service(container):
+    from .implementations.auth_service import AuthService
+
+    return AuthService(
+        current_app.logger, container.get("user"), container.get("email")
+    )
+
+
+def _email_dispatch_service(container):
+    from .implementations.email_dispatch_service import EmailDispatchService
+
+    return EmailDispatchService(
+        current_app.logger,
+        container.get("email"),
+        current_app._get_current_object(),
+        num_workers=int(os.getenv("EMAIL_DISPATCH_WORKERS", 2)),
+        batch_size=int(os.getenv("EMAIL_DISPATCH_BATCH_SIZE", 50)),
+        max_attempts=int(os.getenv("EMAIL_DISPATCH_MAX_ATTEMPTS", 5)),
+    )
+
+
+def _file_storage_service(container):
+    from .implementations.file_storage_service import FileStorageService
+
+    return FileStorageService(current_app.logger)
+
+
+def _leaderboard_service(container):
+    from .implementations.leaderboard_service import LeaderboardService
+
+    return LeaderboardService(
+        current_app.logger,
+        current_app._get_current_object(),
+        reconcile_interval=float(os.getenv("LEADERBOARD_RECONCILE_SECONDS", 60)),
+        weeks_kept=int(os.getenv("LEADERBOARD_WEEKS_KEPT", 4)),
+    )
+
+
+def _entity_service(container):
+    from .implementations.entity_service import EntityService
+
+    return EntityService(current_app.logger, container.get("file_storage"))
+
+
+services = ServiceContainer()
+services.register("email", _email_service)
+services.register("user", _user_service)
+services.register("auth", _auth_service)
+services.register("email_dispatch", _email_dispatch_service)
+services.register("file_storage", _file_storage_service)
+services.register("entity", _entity_service)
+services.register("leaderboard", _leaderboard_service)
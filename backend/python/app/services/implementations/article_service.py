@@ -78,6 +78,48 @@ class ArticleService(IArticleService):
             raise
 
 
+    def get_articles_version(self):
+        """
+        Returns a token that changes whenever the article listing would.
+
+        :rtype: tuple
+        """
+        return tuple(
+            db.session.query(
+                db.func.count(Article.id), db.func.max(Article.updated_at)
+            ).one()
+        )
+
+    def get_article_version(self, article_id):
+        """
+        Returns a token that changes whenever the article would.
+
+        The article is returned with its relationships, so besides
+        updated_at (which update_article bumps when contents change) the
+        token covers the article's quiz_completions, which are only ever
+        inserted or deleted.
+
+        :param article_id: ID of the article
+        :type article_id: int
+        :return: the article's last update time and the count and max id of
+            its quiz completions, None if it does not exist
+        :rtype: tuple | None
+        """
+        row = (
+            db.session.query(
+                Article.updated_at,
+                db.session.query(db.func.count(QuizCompletion.id))
+                .filter(QuizCompletion.article_id == Article.id)
+                .label("completions_count"),
+                db.session.query(db.func.max(QuizCompletion.id))
+                .filter(QuizCompletion.article_id == Article.id)
+                .label("last_completion_id"),
+            )
+            .filter(Article.id == article_id)
+            .first()
+        )
+        return tuple(row) if row is not None else None
+
     def get_article_by_id(self, article_id, include_relationships=False):
         """
         Retrieves an article by ID.
@@ -98,21 +140,49 @@ class ArticleService(IArticleService):
             self.logger.error(f"Failed to retrieve article: {str(e)}")
             raise
 
-    def get_all_articles(self):
+    def get_all_articles(self, fields=None):
         """
-        Retrieves all articles.
+        Retrieves all articles with their contents in two queries.
 
+        :param fields: "summary" to omit contents, or a comma separated list of
+            Article.sparse_fields to return only those columns
+        :type fields: str, optional
         :return: A list of dictionaries representing Article objects.
         :rtype: list[dict]
+        :raises ValueError: if fields names a column outside the whitelist
         """
+        sparse_fields = None
+        if fields != "summary":
+            sparse_fields = Article.parse_fields(fields)
+
         try:
-            articles = Article.query.all()
-            return [article.to_dict(True) for article in articles]
+            query = Article.query.order_by(Article.id)
+            if sparse_fields:
+                return Article.serialize_rows(
+                    Article.project(query, sparse_fields).all(), sparse_fields
+                )
+
+            serialized = Article.serialize_many(query.all())
+            if fields == "summary" or not serialized:
+                return serialized
+
+            # one query for every article's contents instead of one per article
+            contents_by_article = {article["id"]: [] for article in serialized}
+            contents = (
+                Content.query.filter(Content.article_id.in_(contents_by_article))
+                .order_by(Content.article_id, Content.position, Content.id)
+                .all()
+            )
+            for content in contents:
+                contents_by_article[content.article_id].append(content.to_dict())
+
+            for article in serialized:
+                article["contents"] = contents_by_article[article["id"]]
+            return serialized
         except Exception as e:
             self.logger.error(f"Failed to retrieve articles: {str(e)}")
             raise
 
-
     def update_article(self, article_id, **updates):
         """
         Updates an article and its associated content.
@@ -135,6 +205,8 @@ class ArticleService(IArticleService):
                     setattr(article, key, value)
 
             if "contents" in updates:
+                # contents are embedded in the article, bump its version too
+                article.updated_at = db.func.current_timestamp()
                 new_content_list = updates["contents"]
                 existing_content = {c.id: c for c in article.contents}
                 updated_content_ids = set()
@@ -5,6 +5,8 @@ from ...resources.auth_dto import AuthDTO
 from ...resources.create_user_dto import CreateUserDTO
 from ...resources.token import Token
 from ...utilities.firebase_rest_client import FirebaseRestClient
+from ...utilities.request_timing import outbound
+from ...utilities.token_cache import verified_token_cache
 
 
 class AuthService(IAuthService):
@@ -12,7 +14,7 @@ class AuthService(IAuthService):
     AuthService implementation with user authentication methods
     """
 
-    def __init__(self, logger, user_service, email_service=None):
+    def __init__(self, logger, user_service, email_service=None, token_cache=None):
         """
         Create an instance of AuthService
 
@@ -22,10 +24,15 @@ class AuthService(IAuthService):
         :type user_service: IUserService
         :param email_service: an email_service instance
         :type email_service: IEmailService
+        :param token_cache: cache of verified ID tokens, defaults to the shared cache
+        :type token_cache: VerifiedTokenCache
         """
         self.logger = logger
         self.user_service = user_service
         self.email_service = email_service
+        self.token_cache = (
+            token_cache if token_cache is not None else verified_token_cache
+        )
         self.firebase_rest_client = FirebaseRestClient(logger)
 
     def generate_token(self, email, password):
@@ -80,6 +87,7 @@ class AuthService(IAuthService):
         try:
             auth_id = self.user_service.get_auth_id_by_user_id(user_id)
             firebase_admin.auth.revoke_refresh_tokens(auth_id)
+            self.token_cache.invalidate_user(auth_id)
         except Exception as e:
             reason = getattr(e, "message", None)
             error_message = [
@@ -179,31 +187,51 @@ class AuthService(IAuthService):
 
     def is_authorized_by_user_id(self, access_token, requested_user_id):
         try:
-            decoded_id_token = firebase_admin.auth.verify_id_token(
-                access_token, check_revoked=True
-            )
-            token_user_id = self.user_service.get_user_id_by_auth_id(
-                decoded_id_token["uid"]
+            verified_token = self.__verify_token(access_token)
+            return (
+                verified_token["email_verified"]
+                and verified_token["user_id"] == requested_user_id
             )
-            firebase_user = firebase_admin.auth.get_user(decoded_id_token["uid"])
-            return firebase_user.email_verified and token_user_id == requested_user_id
         except:
             return False
 
     def is_authorized_by_email(self, access_token, requested_email):
         try:
-            decoded_id_token = firebase_admin.auth.verify_id_token(
-                access_token, check_revoked=True
-            )
-            firebase_user = firebase_admin.auth.get_user(decoded_id_token["uid"])
-            print("EMAIL VERIFIED", firebase_user.email_verified)
-            print("SAME ", decoded_id_token["email"] == requested_email)
-            print("A ", decoded_id_token["email"])
-            print("B ", requested_email)
-
+            verified_token = self.__verify_token(access_token)
             return (
-                firebase_user.email_verified
-                and decoded_id_token["email"] == requested_email
+                verified_token["email_verified"]
+                and verified_token["claims"]["email"] == requested_email
             )
         except:
             return False
+
+    def __verify_token(self, access_token):
+        """
+        Verify access_token and resolve the user it was issued to, using the
+        verified token cache to skip Firebase and Postgres on repeat requests
+
+        :param access_token: Firebase ID token from the Authorization header
+        :type access_token: str
+        :return: dict with the decoded claims, auth_id, user_id, role and email_verified
+        :rtype: dict
+        :raises Exception: if the token is invalid, revoked or has no matching user
+        """
+        verified_token = self.token_cache.get(access_token)
+        if verified_token is not None:
+            return verified_token
+
+        with outbound("firebase"):
+            decoded_id_token = firebase_admin.auth.verify_id_token(
+                access_token, check_revoked=True
+            )
+            auth_id = decoded_id_token["uid"]
+            firebase_user = firebase_admin.auth.get_user(auth_id)
+        verified_token = {
+            "claims": decoded_id_token,
+            "auth_id": auth_id,
+            "user_id": self.user_service.get_user_id_by_auth_id(auth_id),
+            "role": self.user_service.get_user_role_by_auth_id(auth_id),
+            "email_verified": firebase_user.email_verified,
+        }
+        self.token_cache.put(access_token, verified_token)
+        return verified_token
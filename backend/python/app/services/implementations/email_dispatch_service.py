@@ -0,0 +1,382 @@
+import atexit
+import random
+import threading
+from datetime import timedelta
+
+from ..interfaces.email_dispatch_service import IEmailDispatchService
+from ...models import db
+from ...models.email_job import EmailJob, EmailJobRecipient
+from ...utilities.metrics import registry
+
+emails_dispatched = registry.counter(
+    "email_dispatch_emails_total",
+    "Bulk email deliveries by outcome (sent, retried, failed)",
+    ["outcome"],
+)
+
+MAX_RETRY_DELAY_SECONDS = 60 * 60
+
+
+class EmailDispatchService(IEmailDispatchService):
+    """
+    Sends bulk email on background worker threads
+
+    Jobs and their recipients are stored in the email_jobs and
+    email_job_recipients tables, so work left pending when the process stops is
+    picked up again when the workers next start.
+
+    Workers claim recipients with SELECT ... FOR UPDATE SKIP LOCKED, so several
+    processes can share the queue, lease them for lease_seconds and commit
+    before calling Gmail. The outcome is recorded in a second transaction, so
+    no connection or row lock is held while a batch is being sent.
+    """
+
+    def __init__(
+        self,
+        logger,
+        email_service,
+        app,
+        num_workers=2,
+        batch_size=50,
+        max_attempts=5,
+        retry_base_seconds=30,
+        poll_interval=5.0,
+        lease_seconds=600,
+    ):
+        """
+        Create an instance of EmailDispatchService
+
+        :param logger: application's logger instance
+        :type logger: logger
+        :param email_service: an email_service instance
+        :type email_service: IEmailService
+        :param app: the Flask application, workers run in its app context
+        :type app: Flask
+        :param num_workers: number of worker threads
+        :type num_workers: int
+        :param batch_size: recipients sent per Gmail batch request, at most 100
+        :type batch_size: int
+        :param max_attempts: attempts per recipient before it is marked failed
+        :type max_attempts: int
+        :param retry_base_seconds: delay before the first retry, doubled on each retry
+        :type retry_base_seconds: float
+        :param poll_interval: seconds an idle worker waits before polling again
+        :type poll_interval: float
+        :param lease_seconds: seconds a claimed recipient is reserved for the
+            worker sending it, after which another worker may claim it again
+        :type lease_seconds: float
+        """
+        self.logger = logger
+        self.email_service = email_service
+        self.app = app
+        self.num_workers = num_workers
+        self.batch_size = min(batch_size, 100)
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def enqueue(self, recipients, subject, body):
+        try:
+            job = EmailJob(
+                subject=subject,
+                body=body,
+                status="queued" if recipients else "completed",
+                total_count=len(recipients),
+                sent_count=0,
+                failed_count=0,
+            )
+            db.session.add(job)
+            db.session.flush()
+            db.session.bulk_insert_mappings(
+                EmailJobRecipient,
+                [
+                    {
+                        "job_id": job.id,
+                        "email": email,
+                        "status": "pending",
+                        "attempts": 0,
+                    }
+                    for email in recipients
+                ],
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            reason = getattr(e, "message", None)
+            self.logger.error(
+                "Failed to queue bulk email. Reason = {reason}".format(
+                    reason=(reason if reason else str(e))
+                )
+            )
+            raise e
+
+        self.start()
+        self._wakeup.set()
+        return job.to_dict()
+
+    def get_job(self, job_id):
+        job = EmailJob.query.get(job_id)
+        return job.to_dict() if job else None
+
+    def start(self):
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            if self._threads:
+                return
+            self._stopped.clear()
+            for i in range(self.num_workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    name="email-dispatch-{i}".format(i=i),
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+            atexit.register(self.stop)
+
+    def stop(self):
+        with self._lock:
+            threads = self._threads
+            self._threads = []
+        self._stopped.set()
+        self._wakeup.set()
+        for thread in threads:
+            thread.join(timeout=30)
+
+    def _work(self):
+        while not self._stopped.is_set():
+            try:
+                with self.app.app_context():
+                    processed = self._process_batch()
+            except Exception as e:
+                processed = 0
+                reason = getattr(e, "message", None)
+                self.logger.error(
+                    "Email dispatch worker failed. Reason = {reason}".format(
+                        reason=(reason if reason else str(e))
+                    )
+                )
+
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _process_batch(self):
+        """
+        Claim up to batch_size due recipients, send them and record the outcome
+
+        :return: number of recipients processed
+        :rtype: int
+        """
+        claimed, jobs = self._claim()
+        if not claimed:
+            return 0
+
+        recipients_by_job = {}
+        for recipient in claimed:
+            recipients_by_job.setdefault(recipient["job_id"], []).append(recipient)
+
+        # no transaction is open while Gmail is called
+        outcomes = []
+        for job_id, recipients in recipients_by_job.items():
+            subject, body = jobs[job_id]
+            try:
+                errors = self.email_service.send_emails_batch(
+                    [recipient["email"] for recipient in recipients], subject, body
+                )
+            except Exception as e:
+                errors = [e] * len(recipients)
+            outcomes.extend(zip(recipients, errors))
+
+        self._record_outcomes(outcomes)
+        return len(claimed)
+
+    def _claim(self):
+        """
+        Lease up to batch_size due recipients to this worker and commit
+
+        A claimed recipient is "sending" and its next_attempt_at is the end of
+        the lease. If the worker dies before recording the outcome, the
+        recipient is claimed again once the lease expires. attempts is counted
+        at claim time, so an attempt interrupted by a crash still counts
+        towards max_attempts: an expired lease that has used up its attempts is
+        marked failed in the same transaction instead of being claimed.
+
+        :return: the claimed recipients as dicts, and (subject, body) by job id
+        :rtype: tuple(list[dict], dict)
+        """
+        recipients = EmailJobRecipient.__table__
+        due = (
+            db.select([recipients.c.id])
+            .where(
+                db.and_(
+                    recipients.c.status.in_(["pending", "sending"]),
+                    recipients.c.next_attempt_at <= db.func.now(),
+                    recipients.c.attempts < self.max_attempts,
+                )
+            )
+            .order_by(recipients.c.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        try:
+            self._fail_exhausted_leases()
+            claimed = [
+                dict(row)
+                for row in db.session.execute(
+                    recipients.update()
+                    .where(recipients.c.id.in_(due))
+                    .values(
+                        status="sending",
+                        attempts=recipients.c.attempts + 1,
+                        next_attempt_at=db.func.now()
+                        + timedelta(seconds=self.lease_seconds),
+                    )
+                    .returning(
+                        recipients.c.id,
+                        recipients.c.job_id,
+                        recipients.c.email,
+                        recipients.c.attempts,
+                    )
+                )
+            ]
+            jobs = {}
+            if claimed:
+                jobs = {
+                    job_id: (subject, body)
+                    for job_id, subject, body in db.session.query(
+                        EmailJob.id, EmailJob.subject, EmailJob.body
+                    ).filter(
+                        EmailJob.id.in_({recipient["job_id"] for recipient in claimed})
+                    )
+                }
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return sorted(claimed, key=lambda recipient: recipient["id"]), jobs
+
+    def _fail_exhausted_leases(self):
+        """
+        Mark failed the expired leases whose attempts are used up, and roll
+        them up into their jobs' failed counts
+        """
+        recipients = EmailJobRecipient.__table__
+        exhausted = (
+            db.select([recipients.c.id])
+            .where(
+                db.and_(
+                    recipients.c.status == "sending",
+                    recipients.c.next_attempt_at <= db.func.now(),
+                    recipients.c.attempts >= self.max_attempts,
+                )
+            )
+            .with_for_update(skip_locked=True)
+        )
+        failed = {}
+        for (job_id,) in db.session.execute(
+            recipients.update()
+            .where(recipients.c.id.in_(exhausted))
+            .values(
+                status="failed",
+                last_error="Lease expired before the outcome was recorded",
+            )
+            .returning(recipients.c.job_id)
+        ):
+            failed[job_id] = failed.get(job_id, 0) + 1
+            emails_dispatched.labels(outcome="failed").inc()
+
+        for job_id, count in failed.items():
+            self._update_job_counts(job_id, 0, count)
+
+    def _record_outcomes(self, outcomes):
+        """
+        Record the outcome of each (recipient, error) pair and roll the counts
+        up into the jobs, in one transaction
+
+        Only recipients still leased by this claim are updated, so nothing is
+        counted twice if the lease expired and another worker took over.
+        """
+        recipients = EmailJobRecipient.__table__
+        sent = {}
+        failed = {}
+        try:
+            sent_ids = [
+                recipient["id"] for recipient, error in outcomes if error is None
+            ]
+            if sent_ids:
+                for (job_id,) in db.session.execute(
+                    self._leased_update(sent_ids)
+                    .values(status="sent", last_error=None)
+                    .returning(recipients.c.job_id)
+                ):
+                    sent[job_id] = sent.get(job_id, 0) + 1
+                    emails_dispatched.labels(outcome="sent").inc()
+
+            for recipient, error in outcomes:
+                if error is None:
+                    continue
+                attempts = recipient["attempts"]
+                update = self._leased_update([recipient["id"]], attempts)
+                if attempts >= self.max_attempts:
+                    update = update.values(status="failed", last_error=str(error))
+                    outcome = "failed"
+                else:
+                    update = update.values(
+                        status="pending",
+                        last_error=str(error),
+                        next_attempt_at=db.func.now()
+                        + timedelta(seconds=self._retry_delay(attempts)),
+                    )
+                    outcome = "retried"
+                row = db.session.execute(update.returning(recipients.c.job_id)).first()
+                if row is None:
+                    continue
+                if outcome == "failed":
+                    failed[row.job_id] = failed.get(row.job_id, 0) + 1
+                emails_dispatched.labels(outcome=outcome).inc()
+
+            for job_id in set(sent) | set(failed):
+                self._update_job_counts(
+                    job_id, sent.get(job_id, 0), failed.get(job_id, 0)
+                )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _leased_update(self, recipient_ids, attempts=None):
+        recipients = EmailJobRecipient.__table__
+        condition = db.and_(
+            recipients.c.id.in_(recipient_ids), recipients.c.status == "sending"
+        )
+        if attempts is not None:
+            condition = db.and_(condition, recipients.c.attempts == attempts)
+        return recipients.update().where(condition)
+
+    def _update_job_counts(self, job_id, sent, failed):
+        done = EmailJob.sent_count + EmailJob.failed_count + sent + failed
+        EmailJob.query.filter_by(id=job_id).update(
+            {
+                EmailJob.sent_count: EmailJob.sent_count + sent,
+                EmailJob.failed_count: EmailJob.failed_count + failed,
+                EmailJob.status: db.case(
+                    [(done >= EmailJob.total_count, "completed")], else_="running"
+                ),
+            },
+            synchronize_session=False,
+        )
+
+    def _retry_delay(self, attempts):
+        """
+        Exponential backoff with jitter, capped at MAX_RETRY_DELAY_SECONDS
+        """
+        delay = self.retry_base_seconds * (2 ** (attempts - 1))
+        return min(delay, MAX_RETRY_DELAY_SECONDS) + random.uniform(
+            0, self.retry_base_seconds
+        )
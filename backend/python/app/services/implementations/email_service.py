@@ -1,8 +1,9 @@
 import base64
+import threading
 from email.mime.text import MIMEText
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from ..interfaces.email_service import IEmailService
+from ...utilities.request_timing import outbound
 
 
 class EmailService(IEmailService):
@@ -25,14 +26,14 @@ class EmailService(IEmailService):
         :type display_name: str, optional
         """
         self.logger = logger
-        creds = Credentials(
+        self.credentials = Credentials(
             token=credentials.get("token"),
             refresh_token=credentials.get("refresh_token"),
             client_id=credentials.get("client_id"),
             client_secret=credentials.get("client_secret"),
             token_uri=credentials.get("token_uri")
         )
-        self.service = build("gmail", "v1", credentials=creds)
+        self._local = threading.local()
         self.sender_email = sender_email
         if display_name:
             self.sender = "{name} <{email}>".format(
@@ -41,19 +42,32 @@ class EmailService(IEmailService):
         else:
             self.sender = sender_email
 
+    @property
+    def service(self):
+        """
+        Gmail API client for the calling thread, built on first use since
+        loading the discovery document is slow and most processes never send
+        email. Each thread gets its own client because the underlying
+        httplib2.Http connection is not thread-safe
+        """
+        service = getattr(self._local, "service", None)
+        if service is None:
+            from googleapiclient.discovery import build
+
+            service = build("gmail", "v1", credentials=self.credentials)
+            self._local.service = service
+        return service
+
     def send_email(self, to, subject, body):
-        message = MIMEText(body, "html")
-        message["from"] = self.sender
-        message["to"] = to
-        message["subject"] = subject
-        email = {"raw": base64.urlsafe_b64encode(message.as_string().encode()).decode()}
+        email = self.__build_message(to, subject, body)
         try:
-            sent_info = (
-                self.service.users()
-                .messages()
-                .send(userId=self.sender_email, body=email)
-                .execute()
-            )
+            with outbound("gmail"):
+                sent_info = (
+                    self.service.users()
+                    .messages()
+                    .send(userId=self.sender_email, body=email)
+                    .execute()
+                )
             return sent_info
         except Exception as e:
             reason = getattr(e, "message", None)
@@ -62,4 +76,48 @@ class EmailService(IEmailService):
                     reason=(reason if reason else str(e))
                 )
             )
-            raise err
+            raise e
+
+    def send_emails_batch(self, recipients, subject, body):
+        """
+        Send the same email to each recipient through one Gmail batch HTTP request
+        """
+        errors = {}
+
+        def callback(request_id, response, exception):
+            if exception is not None:
+                errors[request_id] = exception
+
+        batch = self.service.new_batch_http_request(callback=callback)
+        for i, to in enumerate(recipients):
+            batch.add(
+                self.service.users()
+                .messages()
+                .send(
+                    userId=self.sender_email,
+                    body=self.__build_message(to, subject, body),
+                ),
+                request_id=str(i),
+            )
+        with outbound("gmail"):
+            batch.execute()
+
+        results = []
+        for i, to in enumerate(recipients):
+            exception = errors.get(str(i))
+            if exception is not None:
+                reason = getattr(exception, "message", None)
+                self.logger.error(
+                    "Failed to send email to {to}. Reason = {reason}".format(
+                        to=to, reason=(reason if reason else str(exception))
+                    )
+                )
+            results.append(exception)
+        return results
+
+    def __build_message(self, to, subject, body):
+        message = MIMEText(body, "html")
+        message["from"] = self.sender
+        message["to"] = to
+        message["subject"] = subject
+        return {"raw": base64.urlsafe_b64encode(message.as_string().encode()).decode()}
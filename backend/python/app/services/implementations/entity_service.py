@@ -13,7 +13,7 @@ class EntityService(IEntityService):
     def get_entities(self):
         # Entity is a SQLAlchemy model, we can use convenient methods provided
         # by SQLAlchemy like query.all() to query the data
-        return [result.to_dict() for result in Entity.query.all()]
+        return Entity.serialize_many(Entity.query.all())
 
     def get_entity(self, id):
         # get queries by the primary key, which is id for the Entity table
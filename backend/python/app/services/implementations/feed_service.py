@@ -1,16 +1,167 @@
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+
 from ...models.feed import Feed
+from ...models.feed_like import FeedLike
 from ...models import db
 from ..interfaces.feed_service import IFeedService
 from ...models.user_comment import UserComment
+from ...utilities.metrics import registry
+from ...utilities.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+)
+
+VIEW_FLUSH_BATCH_SIZE = 500
+
+# Postgres' default name for the feed_likes.user_id foreign key
+LIKE_USER_FOREIGN_KEY = "feed_likes_user_id_fkey"
+
+counters_reconciled = registry.counter(
+    "feed_counters_reconciled_total",
+    "Feed posts whose likes_count or comments_count had drifted and was recomputed",
+)
+
+# Finding drifted posts aggregates each table once rather than per post. The
+# rows found are locked before they are rewritten, so an add or remove that
+# bumps a counter either commits before the lock is taken, and is counted by
+# the UPDATE, or waits for it and applies its +1/-1 to the corrected value.
+LOCK_DRIFTED_COUNTERS_SQL = """
+SELECT feed.id
+FROM feed
+LEFT JOIN (
+    SELECT feed_id, count(*) AS count FROM feed_likes GROUP BY feed_id
+) AS likes ON likes.feed_id = feed.id
+LEFT JOIN (
+    SELECT feed_id, count(*) AS count FROM user_comments GROUP BY feed_id
+) AS comments ON comments.feed_id = feed.id
+WHERE feed.likes_count IS DISTINCT FROM COALESCE(likes.count, 0)
+   OR feed.comments_count IS DISTINCT FROM COALESCE(comments.count, 0)
+ORDER BY feed.id
+FOR UPDATE OF feed
+"""
+
+# Runs as a new statement after the lock, so its counts see every change
+# committed before the rows were locked.
+RECONCILE_COUNTERS_SQL = """
+UPDATE feed
+SET likes_count = actual.likes_count, comments_count = actual.comments_count
+FROM (
+    SELECT feed.id,
+           (SELECT count(*) FROM feed_likes
+            WHERE feed_likes.feed_id = feed.id) AS likes_count,
+           (SELECT count(*) FROM user_comments
+            WHERE user_comments.feed_id = feed.id) AS comments_count
+    FROM feed
+    WHERE feed.id IN :ids
+) AS actual
+WHERE feed.id = actual.id
+  AND (feed.likes_count IS DISTINCT FROM actual.likes_count
+       OR feed.comments_count IS DISTINCT FROM actual.comments_count)
+"""
+
+# levels of replies returned by get_comment_tree, and replies per comment
+DEFAULT_COMMENT_DEPTH = 3
+MAX_COMMENT_DEPTH = 10
+DEFAULT_REPLIES_PER_COMMENT = 3
+
+# One round trip for a page of threads: the top-level comments of the page
+# (the replies of parent_id when given) and, recursively, up to :replies
+# replies of each comment, :depth levels deep. {parent} and {after} are
+# fixed SQL fragments, every value is a bind parameter.
+COMMENT_TREE_SQL = """
+WITH RECURSIVE ranked AS (
+    SELECT id, parent_id,
+           row_number() OVER (PARTITION BY parent_id ORDER BY created_at, id) AS position
+    FROM user_comments
+    WHERE feed_id = :feed_id AND parent_id IS NOT NULL
+),
+replies AS (
+    SELECT parent_id, count(*) AS reply_count
+    FROM user_comments
+    WHERE feed_id = :feed_id AND parent_id IS NOT NULL
+    GROUP BY parent_id
+),
+roots AS (
+    SELECT id, created_at
+    FROM user_comments
+    WHERE feed_id = :feed_id AND {parent} {after}
+    ORDER BY created_at, id
+    LIMIT :limit + 1
+),
+tree AS (
+    SELECT id, 1 AS depth
+    FROM (SELECT id FROM roots ORDER BY created_at, id LIMIT :limit) AS page
+    UNION ALL
+    SELECT ranked.id, tree.depth + 1
+    FROM ranked JOIN tree ON ranked.parent_id = tree.id
+    WHERE tree.depth < :depth AND ranked.position <= :replies
+)
+SELECT user_comments.*, tree.depth,
+       COALESCE(replies.reply_count, 0) AS reply_count,
+       (SELECT count(*) FROM roots) > :limit AS has_more
+FROM tree
+JOIN user_comments ON user_comments.id = tree.id
+LEFT JOIN replies ON replies.parent_id = tree.id
+ORDER BY user_comments.created_at, user_comments.id
+"""
 
 
 class FeedService(IFeedService):
     def __init__(self, logger):
         self.logger = logger
 
-    def get_entities(self):
-        """Retrieve all feed posts."""
-        return [result.to_dict() for result in Feed.query.all()]
+    def get_entities(self, fields=None):
+        """Retrieve all feed posts, optionally only the given fields."""
+        return self._serialize_feeds(Feed.query, Feed.parse_fields(fields))
+
+    def get_feeds_version(self, location=None):
+        """
+        Return a token that changes whenever the feed listing would.
+
+        Counter updates (likes, comments, buffered views) do not touch
+        updated_at, so their totals are part of the token as well.
+        """
+        query = db.session.query(
+            db.func.count(Feed.id),
+            db.func.max(Feed.updated_at),
+            db.func.sum(Feed.likes_count),
+            db.func.sum(Feed.comments_count),
+            db.func.sum(Feed.views_count),
+        )
+        if location:
+            query = query.filter(Feed.centre == location)
+        likes = db.session.query(db.func.count(FeedLike.id), db.func.max(FeedLike.id))
+        return tuple(query.one()) + tuple(likes.one())
+
+    def get_feed_version(self, id):
+        """Return a token that changes whenever the feed post would, None if it does not exist."""
+        row = (
+            db.session.query(
+                Feed.updated_at,
+                Feed.likes_count,
+                Feed.comments_count,
+                Feed.views_count,
+                db.session.query(db.func.max(FeedLike.id))
+                .filter(FeedLike.feed_id == Feed.id)
+                .label("last_like_id"),
+            )
+            .filter(Feed.id == id)
+            .first()
+        )
+        return tuple(row) if row is not None else None
+
+    def get_comments_version(self, feed_id):
+        """Return a token that changes whenever the post's comments would."""
+        return tuple(
+            db.session.query(
+                db.func.count(UserComment.id), db.func.max(UserComment.updated_at)
+            )
+            .filter(UserComment.feed_id == feed_id)
+            .one()
+        )
 
     def get_entity(self, id):
         """Retrieve a specific feed post by ID."""
@@ -18,21 +169,86 @@ class FeedService(IFeedService):
         if feed is None:
             self.logger.error("Invalid id")
             raise Exception("Invalid id")
-        return feed.to_dict()
+        return self._with_likers([feed.to_dict()])[0]
 
-    def get_feeds_by_location(self, location):
-        """Return feed posts filtered by location."""
+    def get_feeds_by_location(self, location, fields=None):
+        """Return feed posts filtered by location, optionally only the given fields."""
+        sparse_fields = Feed.parse_fields(fields)
         try:
-            feeds = Feed.query.filter_by(centre=location).all()
-            return [feed.to_dict() for feed in feeds]
+            query = Feed.query.filter_by(centre=location)
+            return self._serialize_feeds(query, sparse_fields)
         except Exception as e:
             self.logger.error(f"Error fetching feeds by location: {str(e)}")
             raise e
 
+    def get_feeds_page(
+        self, location=None, limit=DEFAULT_PAGE_SIZE, cursor=None, fields=None
+    ):
+        """
+        Return one page of feed posts, newest first, using keyset pagination.
+
+        Pages are ordered by (created_at DESC, id) to match the
+        ix_feed_centre_created_at_id index, and the cursor holds the sort key
+        of the last post returned so the next page never needs an OFFSET.
+        """
+        sparse_fields = Feed.parse_fields(fields)
+        if sparse_fields and "created_at" not in sparse_fields:
+            # the cursor is built from the last row's sort key
+            selected_fields = sparse_fields + ("created_at",)
+        else:
+            selected_fields = sparse_fields
+
+        try:
+            query = Feed.query
+            if location:
+                query = query.filter_by(centre=location)
+
+            if cursor:
+                created_at, last_id = decode_cursor(cursor)
+                query = query.filter(
+                    db.or_(
+                        Feed.created_at < created_at,
+                        db.and_(Feed.created_at == created_at, Feed.id > last_id),
+                    )
+                )
+
+            # fetch one extra row to find out whether another page exists
+            query = query.order_by(Feed.created_at.desc(), Feed.id).limit(limit + 1)
+            if selected_fields:
+                feeds = Feed.serialize_rows(
+                    Feed.project(query, selected_fields).all(), selected_fields
+                )
+            else:
+                feeds = Feed.serialize_many(query.all())
+            has_more = len(feeds) > limit
+            feeds = feeds[:limit]
+
+            next_cursor = None
+            if has_more:
+                next_cursor = encode_cursor(feeds[-1]["created_at"], feeds[-1]["id"])
+
+            if selected_fields is not sparse_fields:
+                for feed in feeds:
+                    del feed["created_at"]
+
+            return {
+                "feeds": feeds if sparse_fields else self._with_likers(feeds),
+                "next_cursor": next_cursor,
+            }
+        except Exception as e:
+            self.logger.error(f"Error fetching page of feeds: {str(e)}")
+            raise e
+
     def create_feed_post(self, entity):
         """Create a new feed post."""
         try:
-            new_feed = Feed(**entity.__dict__)  # Map DTO fields to Feed model
+            feed_fields = dict(entity.__dict__)
+            # likes are recorded in feed_likes, not on the post itself
+            feed_fields.pop("users_who_have_liked", None)
+            # let the column default fill created_at, cursors rely on it being set
+            if feed_fields.get("created_at") is None:
+                feed_fields.pop("created_at", None)
+            new_feed = Feed(**feed_fields)  # Map DTO fields to Feed model
         except Exception as error:
             self.logger.error(str(error))
             raise error
@@ -40,18 +256,22 @@ class FeedService(IFeedService):
         db.session.add(new_feed)
         db.session.commit()
 
-        return new_feed.to_dict()
+        return self._with_likers([new_feed.to_dict()])[0]
 
     def update_entity(self, id, entity):
         """Update an existing feed post."""
-        Feed.query.filter_by(id=id).update(entity.__dict__)
+        feed_fields = dict(entity.__dict__)
+        # like state is owned by feed_likes and only changes through add_like/remove_like
+        feed_fields.pop("users_who_have_liked", None)
+        feed_fields.pop("likes_count", None)
+        Feed.query.filter_by(id=id).update(feed_fields)
         updated_feed = Feed.query.get(id)
         db.session.commit()
 
         if updated_feed is None:
             self.logger.error("Invalid id")
             raise Exception("Invalid id")
-        return updated_feed.to_dict()
+        return self._with_likers([updated_feed.to_dict()])[0]
 
     def delete_entity(self, id):
         """Delete a feed post by ID."""
@@ -65,112 +285,344 @@ class FeedService(IFeedService):
         raise Exception("Invalid id")
 
     def add_like(self, feed_id, user_id):
-        feed = Feed.query.get(feed_id)
-        if not feed:
-            raise Exception("Invalid feed ID")
+        """
+        Record that user_id liked feed_id.
 
-        # Ensure users_who_have_liked is initialized
-        if not isinstance(feed.users_who_have_liked, list):
-            feed.users_who_have_liked = []
+        The insert and the likes_count bump run as two statements in one
+        transaction, so concurrent likes never overwrite each other.
+        """
+        try:
+            inserted = db.session.execute(
+                insert(FeedLike.__table__)
+                .values(feed_id=feed_id, user_id=user_id)
+                .on_conflict_do_nothing(constraint="uq_feed_likes_feed_id_user_id")
+                .returning(FeedLike.__table__.c.id)
+            ).first()
+        except IntegrityError as e:
+            # foreign key violation, the post or the user does not exist
+            db.session.rollback()
+            diag = getattr(e.orig, "diag", None)
+            if getattr(diag, "constraint_name", None) == LIKE_USER_FOREIGN_KEY:
+                raise Exception("Invalid user ID")
+            raise Exception("Invalid feed ID")
 
-        # Check if user already liked the post
-        if user_id in feed.users_who_have_liked:
+        if inserted is None:
+            db.session.rollback()
             raise Exception("User has already liked this post")
 
-        # Increment likes_count
-        feed.likes_count += 1
-
-        # Add user_id and ensure it's saved properly
-        feed.users_who_have_liked = list(set(feed.users_who_have_liked + [user_id]))
-
-        # Commit changes to the database
-        
+        updated_feed = self._adjust_count(feed_id, "likes_count", 1)
         db.session.commit()
 
-        return feed.to_dict()
+        return self._with_likers([updated_feed])[0]
 
     def add_comment(self, feed_id, user_id, content, parent_id=None):
-            """Create a comment on a feed post and update comments_count."""
-            feed = Feed.query.get(feed_id)
-            if not feed:
-                raise Exception("Invalid feed ID")
+        """
+        Create a comment on a feed post and update comments_count.
 
-            new_comment = UserComment(
-                feed_id=feed_id,
-                user_id=user_id,
-                content=content,
-                parent_id=parent_id
+        Like add_like, the insert and the comments_count bump run as two
+        statements in one transaction, so concurrent comments are all counted.
+        """
+        try:
+            db.session.execute(
+                UserComment.__table__.insert().values(
+                    feed_id=feed_id,
+                    user_id=user_id,
+                    content=content,
+                    parent_id=parent_id,
+                )
             )
+        except IntegrityError:
+            # foreign key violation, the post (or parent comment, or user) does not exist
+            db.session.rollback()
+            raise Exception("Invalid feed ID or parent comment ID")
 
-            db.session.add(new_comment)
-            feed.comments_count += 1  # Increment comment count in Feed table
-            db.session.commit()
+        updated_feed = self._adjust_count(feed_id, "comments_count", 1)
+        db.session.commit()
 
-            return feed.to_dict()
+        return self._with_likers([updated_feed])[0]
 
     def get_comments_for_feed(self, feed_id):
         """
         Retrieve all comments for a specific feed post.
         """
-        feed = Feed.query.get(feed_id)
-        if not feed:
-            raise Exception("Invalid feed ID")
-
         # Fetch all comments associated with this feed
         comments = UserComment.query.filter_by(feed_id=feed_id).all()
-        return [comment.to_dict() for comment in comments]
+        # only a post without comments needs a second query to tell if it exists
+        if not comments and Feed.query.get(feed_id) is None:
+            raise Exception("Invalid feed ID")
+        return UserComment.serialize_many(comments)
+
+    def get_comment_tree(
+        self,
+        feed_id,
+        parent_id=None,
+        limit=DEFAULT_PAGE_SIZE,
+        cursor=None,
+        depth=DEFAULT_COMMENT_DEPTH,
+        replies=DEFAULT_REPLIES_PER_COMMENT,
+    ):
+        """
+        Return a page of comment threads, nested and oldest first, in one query.
+
+        The page holds up to limit top-level comments (or replies of parent_id),
+        each with up to replies replies per comment, depth levels deep. Every
+        comment has a reply_count; when it has more replies than are included,
+        replies_cursor continues them, with parent_id set to the comment's id.
+        Comments at the depth limit include no replies; fetch them the same way
+        without a cursor.
+
+        :return: {"comments": [...], "next_cursor": "..."}, next_cursor is
+        None on the last page
+        :raises ValueError: if depth or replies is out of range or the cursor
+        is invalid
+        """
+        if not 1 <= depth <= MAX_COMMENT_DEPTH:
+            raise ValueError(
+                "depth must be between 1 and {maximum}".format(
+                    maximum=MAX_COMMENT_DEPTH
+                )
+            )
+        if not 1 <= replies <= MAX_PAGE_SIZE:
+            raise ValueError(
+                "replies must be between 1 and {maximum}".format(maximum=MAX_PAGE_SIZE)
+            )
 
+        params = {
+            "feed_id": feed_id,
+            "limit": limit,
+            "depth": depth,
+            "replies": replies,
+        }
+        parent = "parent_id IS NULL"
+        if parent_id is not None:
+            parent = "parent_id = :parent_id"
+            params["parent_id"] = parent_id
+        after = ""
+        if cursor:
+            params["after_created_at"], params["after_id"] = decode_cursor(cursor)
+            after = "AND (created_at, id) > (:after_created_at, :after_id)"
+
+        rows = db.session.execute(
+            db.text(COMMENT_TREE_SQL.format(parent=parent, after=after)), params
+        ).fetchall()
+        if not rows and Feed.query.get(feed_id) is None:
+            raise Exception("Invalid feed ID")
 
-    def increment_view_count(self, feed_id):
-        """Increment views_count."""
-        feed = Feed.query.get(feed_id)
-        if not feed:
+        columns = UserComment.__table__.columns.keys()
+        comments = {}
+        roots = []
+        for row in rows:
+            comment = {column: row[column] for column in columns}
+            comment["reply_count"] = row["reply_count"]
+            comment["replies"] = []
+            comment["replies_cursor"] = None
+            comments[comment["id"]] = comment
+            if row["depth"] == 1:
+                roots.append(comment)
+            else:
+                comments[comment["parent_id"]]["replies"].append(comment)
+
+        for comment in comments.values():
+            shown = comment["replies"]
+            if shown and len(shown) < comment["reply_count"]:
+                comment["replies_cursor"] = encode_cursor(
+                    shown[-1]["created_at"], shown[-1]["id"]
+                )
+
+        next_cursor = None
+        if rows and rows[0]["has_more"]:
+            next_cursor = encode_cursor(roots[-1]["created_at"], roots[-1]["id"])
+        return {"comments": roots, "next_cursor": next_cursor}
+
+    def feed_exists(self, feed_id):
+        """Return whether the feed post exists, with a primary key EXISTS query."""
+        return db.session.query(
+            db.session.query(Feed.id).filter(Feed.id == feed_id).exists()
+        ).scalar()
+
+    def increment_view_count(self, feed_id, count=1):
+        """Atomically add count to views_count and return the updated post."""
+        feed_table = Feed.__table__
+        row = db.session.execute(
+            feed_table.update()
+            .where(feed_table.c.id == feed_id)
+            .values(views_count=db.func.coalesce(feed_table.c.views_count, 0) + count)
+            .returning(*feed_table.c)
+        ).first()
+        if row is None:
+            db.session.rollback()
             raise Exception("Invalid feed ID")
 
-        feed.views_count += 1
+        db.session.commit()
+        return self._with_likers([dict(row)])[0]
+
+    def flush_view_counts(self, view_counts):
+        """
+        Apply buffered view counts in batched UPDATE statements.
 
+        :param view_counts: number of new views keyed by feed id
+        :type view_counts: dict[int, int]
+        """
+        items = list(view_counts.items())
+        for start in range(0, len(items), VIEW_FLUSH_BATCH_SIZE):
+            batch = items[start : start + VIEW_FLUSH_BATCH_SIZE]
+            params = {}
+            values = []
+            for i, (feed_id, count) in enumerate(batch):
+                params["id_{i}".format(i=i)] = int(feed_id)
+                params["n_{i}".format(i=i)] = int(count)
+                values.append("(:id_{i}, :n_{i})".format(i=i))
+
+            db.session.execute(
+                db.text(
+                    "UPDATE feed SET views_count = COALESCE(feed.views_count, 0) + v.n "
+                    "FROM (VALUES {values}) AS v(id, n) "
+                    "WHERE feed.id = v.id".format(values=", ".join(values))
+                ),
+                params,
+            )
         db.session.commit()
-        return feed.to_dict()
-    
+
     def remove_like(self, feed_id, user_id):
         """Remove a like from a feed post."""
-        feed = Feed.query.get(feed_id)
-        if not feed:
-            raise Exception("Invalid feed ID")
-        
-        # Ensure users_who_have_liked is a list
-        if not isinstance(feed.users_who_have_liked, list):
-            feed.users_who_have_liked = []
-        
-        # Check if the user has liked the post
-        if user_id not in feed.users_who_have_liked:
+        feed_likes = FeedLike.__table__
+        deleted = db.session.execute(
+            feed_likes.delete()
+            .where(
+                db.and_(
+                    feed_likes.c.feed_id == feed_id, feed_likes.c.user_id == user_id
+                )
+            )
+            .returning(feed_likes.c.id)
+        ).first()
+
+        if deleted is None:
+            db.session.rollback()
+            if Feed.query.get(feed_id) is None:
+                raise Exception("Invalid feed ID")
             raise Exception("User has not liked this post")
-        
-        # Filter out the user and decrement likes_count
-        feed.users_who_have_liked = [uid for uid in feed.users_who_have_liked if uid != user_id]
-        feed.likes_count = max(0, feed.likes_count - 1)
-        
+
+        updated_feed = self._adjust_count(feed_id, "likes_count", -1)
         db.session.commit()
-        return feed.to_dict()
 
+        return self._with_likers([updated_feed])[0]
 
     def delete_comment(self, feed_id, comment_id):
         """
         Delete the comment with the given ID that belongs to feed_id.
         No user logic here—any 'User' or 'Admin' can delete.
         """
-        # Check that the comment belongs to feed_id
-        comment = UserComment.query.filter_by(id=comment_id, feed_id=feed_id).first()
-        if not comment:
+        user_comments = UserComment.__table__
+        try:
+            # only deletes the comment if it belongs to feed_id
+            deleted = db.session.execute(
+                user_comments.delete()
+                .where(
+                    db.and_(
+                        user_comments.c.id == comment_id,
+                        user_comments.c.feed_id == feed_id,
+                    )
+                )
+                .returning(user_comments.c.id)
+            ).first()
+        except IntegrityError:
+            # replies still reference the comment
+            db.session.rollback()
+            raise Exception("Cannot delete a comment that has replies")
+
+        if deleted is None:
+            db.session.rollback()
             raise Exception("Invalid comment ID or feed mismatch")
 
-        # Optionally decrement the feed's comment count
-        feed = Feed.query.get(feed_id)
-        if feed:
-            feed.comments_count = max(0, feed.comments_count - 1)
-
-        db.session.delete(comment)
+        self._adjust_count(feed_id, "comments_count", -1)
         db.session.commit()
 
         return comment_id
 
+    def reconcile_counters(self):
+        """
+        Recompute likes_count and comments_count from feed_likes and
+        user_comments, locking and updating only the posts whose counters
+        drifted.
+
+        :return: number of posts corrected
+        :rtype: int
+        """
+        try:
+            ids = [
+                row.id for row in db.session.execute(db.text(LOCK_DRIFTED_COUNTERS_SQL))
+            ]
+            if not ids:
+                db.session.commit()
+                return 0
+            result = db.session.execute(
+                db.text(RECONCILE_COUNTERS_SQL).bindparams(
+                    db.bindparam("ids", expanding=True)
+                ),
+                {"ids": ids},
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        if result.rowcount:
+            counters_reconciled.inc(result.rowcount)
+            self.logger.warning(
+                "Corrected drifted like or comment counts of {count} feed posts".format(
+                    count=result.rowcount
+                )
+            )
+        return result.rowcount
+
+    def _adjust_count(self, feed_id, column, delta):
+        """
+        Atomically add delta to a counter column, likes_count or
+        comments_count, (never going below zero) and return the updated post
+        as a dict, without a separate SELECT.
+        """
+        feed_table = Feed.__table__
+        row = db.session.execute(
+            feed_table.update()
+            .where(feed_table.c.id == feed_id)
+            .values(
+                {
+                    column: db.func.greatest(
+                        db.func.coalesce(feed_table.c[column], 0) + delta, 0
+                    )
+                }
+            )
+            .returning(*feed_table.c)
+        ).first()
+        return dict(row)
+
+    def _serialize_feeds(self, query, sparse_fields):
+        """
+        Serialize the feed posts matched by query, projecting only
+        sparse_fields when given; full posts also list their likers.
+        """
+        if sparse_fields:
+            rows = Feed.project(query, sparse_fields).all()
+            return Feed.serialize_rows(rows, sparse_fields)
+        return self._with_likers(Feed.serialize_many(query.all()))
+
+    def _with_likers(self, feeds):
+        """
+        Attach users_who_have_liked to serialized feed posts using a single
+        grouped query over feed_likes.
+
+        :param feeds: feed posts as returned by Feed.to_dict
+        :type feeds: list[dict]
+        :rtype: list[dict]
+        """
+        if not feeds:
+            return feeds
+
+        likers = dict(
+            db.session.query(FeedLike.feed_id, db.func.array_agg(FeedLike.user_id))
+            .filter(FeedLike.feed_id.in_([feed["id"] for feed in feeds]))
+            .group_by(FeedLike.feed_id)
+            .all()
+        )
+        for feed in feeds:
+            feed["users_who_have_liked"] = likers.get(feed["id"], [])
+        return feeds
@@ -0,0 +1,259 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from ..interfaces.leaderboard_service import ILeaderboardService
+from ...models import db
+from ...models.progress_daily import ProgressDaily
+from ...models.user import User
+from ...utilities.metrics import registry
+from ...utilities.periodic import PeriodicTask
+from ...utilities.ranked_set import RankedSet
+
+BOARDS = ("global", "centre", "week")
+
+reconcile_seconds = registry.histogram(
+    "leaderboard_reconcile_seconds", "Time to rebuild the leaderboards from SQL"
+)
+
+
+def iso_week(day):
+    """
+    Return the ISO week of a date or datetime, e.g. "2024-W05"
+    """
+    year, week, _ = day.isocalendar()
+    return "{year:04d}-W{week:02d}".format(year=year, week=week)
+
+
+def week_start(week):
+    """
+    Return the Monday of an ISO week such as "2024-W05"
+
+    :raises ValueError: if week is not a valid ISO week
+    """
+    return datetime.strptime(week + "-1", "%G-W%V-%u").date()
+
+
+class LeaderboardService(ILeaderboardService):
+    """
+    Ranks users by points on a global board, one board per centre
+    (User.location) and one board per ISO week
+
+    Boards are RankedSets held in memory, loaded from the progress_daily
+    rollup on first use. record_points keeps them current as progress is
+    recorded by this process, and every reconcile_interval seconds they are
+    rebuilt from SQL, which picks up points recorded by other processes,
+    location changes and anything missed while a rebuild was running.
+
+    Weekly boards are kept for the most recent weeks_kept weeks; older weeks
+    are loaded from SQL when requested and dropped at the next rebuild.
+    """
+
+    def __init__(self, logger, app=None, reconcile_interval=60, weeks_kept=4):
+        """
+        Create an instance of LeaderboardService
+
+        :param logger: application's logger instance
+        :type logger: logger
+        :param app: the Flask application, periodic rebuilds run in its app
+        context; without it boards are only rebuilt by calling reconcile
+        :type app: Flask
+        :param reconcile_interval: seconds between rebuilds from SQL
+        :type reconcile_interval: float
+        :param weeks_kept: number of recent weekly boards kept in memory
+        :type weeks_kept: int
+        """
+        self.logger = logger
+        self.weeks_kept = weeks_kept
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._boards = None
+        self._locations = {}
+        self._task = (
+            PeriodicTask(
+                app,
+                logger,
+                "leaderboard-reconcile",
+                reconcile_interval,
+                self.reconcile,
+                run_on_stop=False,
+            )
+            if app is not None
+            else None
+        )
+
+    def board_key(self, board="global", location=None, week=None):
+        if board == "global":
+            return "global"
+        if board == "centre":
+            if not location:
+                raise ValueError("location is required for the centre leaderboard")
+            return "centre:" + location
+        if board == "week":
+            week = week or iso_week(date.today())
+            try:
+                week_start(week)
+            except ValueError:
+                raise ValueError("week must be an ISO week such as 2024-W05")
+            return "week:" + week
+        raise ValueError(
+            "board must be one of {boards}".format(boards=", ".join(BOARDS))
+        )
+
+    def get_top(self, board_key, limit=10, offset=0):
+        board = self._get_board(board_key)
+        with self._lock:
+            entries = board.top(limit, offset)
+            size = len(board)
+
+        names = self._get_user_names([user_id for user_id, _, _ in entries])
+        return {
+            "board": board_key,
+            "size": size,
+            "entries": [
+                {
+                    "rank": rank,
+                    "user_id": user_id,
+                    "points": points,
+                    "first_name": names.get(user_id, (None, None))[0],
+                    "last_name": names.get(user_id, (None, None))[1],
+                }
+                for user_id, points, rank in entries
+            ],
+        }
+
+    def get_rank(self, board_key, user_id):
+        board = self._get_board(board_key)
+        with self._lock:
+            if user_id not in board:
+                return None
+            return {
+                "board": board_key,
+                "size": len(board),
+                "user_id": user_id,
+                "rank": board.rank(user_id),
+                "points": board.score(user_id),
+            }
+
+    def record_points(self, user_id, points, when):
+        if self._boards is None:
+            # nothing is loaded yet, the first read will include these points
+            return
+
+        location = self._locations.get(user_id)
+        if user_id not in self._locations:
+            location = (
+                db.session.query(User.location).filter(User.id == user_id).scalar()
+            )
+
+        week_key = "week:" + iso_week(when)
+        with self._lock:
+            self._locations[user_id] = location
+            self._boards.setdefault("global", RankedSet()).increment(user_id, points)
+            if location:
+                self._boards.setdefault("centre:" + location, RankedSet()).increment(
+                    user_id, points
+                )
+            # weeks that are not loaded are read from SQL when requested
+            if week_key in self._boards or week_key in self._recent_weeks():
+                self._boards.setdefault(week_key, RankedSet()).increment(
+                    user_id, points
+                )
+
+    def remove_user(self, user_id):
+        if self._boards is None:
+            return
+        with self._lock:
+            for board in self._boards.values():
+                if user_id in board:
+                    board.remove(user_id)
+
+    def reconcile(self):
+        start = time.perf_counter()
+        boards = {"global": RankedSet()}
+        locations = {}
+
+        totals = (
+            db.session.query(
+                ProgressDaily.user_id,
+                User.location,
+                db.func.sum(ProgressDaily.points),
+            )
+            .join(User, User.id == ProgressDaily.user_id)
+            .group_by(ProgressDaily.user_id, User.location)
+        )
+        for user_id, location, points in totals:
+            locations[user_id] = location
+            boards["global"].set(user_id, int(points))
+            if location:
+                boards.setdefault("centre:" + location, RankedSet()).set(
+                    user_id, int(points)
+                )
+
+        recent_weeks = self._recent_weeks()
+        for week in recent_weeks:
+            boards["week:" + week] = RankedSet()
+        for user_id, week, points in self._weekly_totals(
+            week_start(recent_weeks[-1]), None
+        ):
+            boards.setdefault("week:" + iso_week(week), RankedSet()).set(
+                user_id, int(points)
+            )
+
+        with self._lock:
+            self._boards = boards
+            self._locations = locations
+        reconcile_seconds.observe(time.perf_counter() - start)
+
+    def _recent_weeks(self):
+        today = date.today()
+        return [iso_week(today - timedelta(weeks=i)) for i in range(self.weeks_kept)]
+
+    def _weekly_totals(self, start_day, end_day):
+        week = db.cast(
+            db.func.date_trunc(db.literal_column("'week'"), ProgressDaily.day),
+            db.Date,
+        ).label("week")
+        query = db.session.query(
+            ProgressDaily.user_id, week, db.func.sum(ProgressDaily.points)
+        ).filter(ProgressDaily.day >= start_day)
+        if end_day is not None:
+            query = query.filter(ProgressDaily.day < end_day)
+        return query.group_by(ProgressDaily.user_id, week).all()
+
+    def _ensure_loaded(self):
+        if self._boards is not None:
+            return
+        with self._load_lock:
+            if self._boards is None:
+                self.reconcile()
+                if self._task is not None:
+                    self._task.start()
+
+    def _get_board(self, board_key):
+        self._ensure_loaded()
+        board = self._boards.get(board_key)
+        if board is not None:
+            return board
+        if not board_key.startswith("week:"):
+            # a centre nobody from has points yet
+            return RankedSet()
+
+        start_day = week_start(board_key[len("week:") :])
+        board = RankedSet()
+        for user_id, _, points in self._weekly_totals(
+            start_day, start_day + timedelta(weeks=1)
+        ):
+            board.set(user_id, int(points))
+        with self._lock:
+            return self._boards.setdefault(board_key, board)
+
+    def _get_user_names(self, user_ids):
+        if not user_ids:
+            return {}
+        rows = db.session.query(User.id, User.first_name, User.last_name).filter(
+            User.id.in_(user_ids)
+        )
+        return {
+            user_id: (first_name, last_name) for user_id, first_name, last_name in rows
+        }
@@ -40,7 +40,7 @@ class QuizCompletionService(IQuizCompletionService):
         """
         try:
             completions = QuizCompletion.query.filter_by(user_id=user_id).all()
-            return [completion.to_dict() for completion in completions]
+            return QuizCompletion.serialize_many(completions)
         except Exception as e:
             self.logger.error(f"Failed to get user quiz completions: {str(e)}")
             raise
@@ -59,6 +59,35 @@ class QuizService(IQuizService):
             db.session.rollback()
             raise
 
+    def get_quizzes_version(self):
+        """
+        Returns a token that changes whenever the quiz listing would.
+
+        :rtype: tuple
+        """
+        return tuple(
+            db.session.query(db.func.count(Quiz.id), db.func.max(Quiz.updated_at)).one()
+        )
+
+    def get_quiz_version(self, quiz_id=None, article_id=None):
+        """
+        Returns a token that changes whenever the quiz would.
+
+        :param quiz_id: ID of the quiz
+        :type quiz_id: int, optional
+        :param article_id: ID of the quiz's article, when looked up by article
+        :type article_id: int, optional
+        :return: the quiz's id and last update time, None if it does not exist
+        :rtype: tuple | None
+        """
+        query = db.session.query(Quiz.id, Quiz.updated_at)
+        if quiz_id is not None:
+            query = query.filter(Quiz.id == quiz_id)
+        if article_id is not None:
+            query = query.filter(Quiz.article_id == article_id)
+        row = query.order_by(Quiz.id).first()
+        return tuple(row) if row is not None else None
+
     def get_quiz_by_id(self, quiz_id):
         """
         Retrieves a quiz by ID.
@@ -87,7 +116,7 @@ class QuizService(IQuizService):
         :rtype: Quiz | None
         """
         try:
-            quiz = Quiz.query.filter_by(article_id=article_id).first()
+            quiz = Quiz.query.filter_by(article_id=article_id).order_by(Quiz.id).first()
             if not quiz:
                 return None
             return quiz.to_dict()
@@ -95,16 +124,23 @@ class QuizService(IQuizService):
             self.logger.error(f"Failed to retrieve quiz by article ID: {str(e)}")
             raise
 
-    def get_all_quizzes(self):
+    def get_all_quizzes(self, fields=None):
         """
         Retrieves all quizzes.
 
+        :param fields: comma separated list of Quiz.sparse_fields to return
+        :type fields: str, optional
         :return: A list of dictionaries representing Quiz objects.
         :rtype: list[dict]
+        :raises ValueError: if fields names a column outside the whitelist
         """
+        sparse_fields = Quiz.parse_fields(fields)
         try:
+            if sparse_fields:
+                rows = Quiz.project(Quiz.query, sparse_fields).all()
+                return Quiz.serialize_rows(rows, sparse_fields)
             quizzes = Quiz.query.all()
-            return [quiz.to_dict() for quiz in quizzes]
+            return Quiz.serialize_many(quizzes)
         except Exception as e:
             self.logger.error(f"Failed to retrieve quizzes: {str(e)}")
             raise
@@ -1,34 +1,90 @@
 import os
+import threading
+import time
 import requests
 import json
 from ...models import db 
+from ...models.ai_response_cache import AIResponseCacheEntry
 from ...models.reflection import Reflection
 from ..interfaces.reflection_service import IReflectionService
+from ...utilities.request_timing import outbound
+from ...utilities.response_cache import (
+    AIResponseCache,
+    DatabaseResponseStore,
+    cache_key,
+    normalize_message,
+)
+
+AI_RESPONSE_PENDING = "pending"
+AI_RESPONSE_COMPLETED = "completed"
+AI_RESPONSE_FAILED = "failed"
+
+# seconds between database checks while waiting for a response generated in
+# another process, responses generated in this process wake waiters right away
+AI_RESPONSE_POLL_INTERVAL = 0.5
+
+_ai_response_ready = threading.Condition()
+
+# shared by every ReflectionService instance, AI_RESPONSE_CACHE_PERSISTENT=true
+# adds the ai_response_cache table as a second tier shared across processes
+ai_response_cache = AIResponseCache(
+    max_size=int(os.getenv("AI_RESPONSE_CACHE_SIZE", 512)),
+    ttl=float(os.getenv("AI_RESPONSE_CACHE_TTL", 86400)),
+    store=DatabaseResponseStore(db, AIResponseCacheEntry)
+    if os.getenv("AI_RESPONSE_CACHE_PERSISTENT", "false").lower() == "true"
+    else None,
+)
 
 class ReflectionService(IReflectionService):
     def __init__(self, logger):
         super().__init__(logger)
         self.cohere_api_key = os.getenv("COHERE_API_KEY")
-        self.cohere_api_url = "https://api.cohere.ai/v1/chat"
+        self.cohere_api_url = os.getenv("COHERE_API_URL", "https://api.cohere.ai/v1/chat")
 
-    def get_all_reflections(self, user_id):
-        """Get all reflections for a specific user."""
+    def get_all_reflections(self, user_id, fields=None):
+        """Get all reflections for a specific user, optionally only the given fields."""
+        sparse_fields = Reflection.parse_fields(fields)
         try:
-            reflections = Reflection.query.filter_by(user_id=user_id).order_by(Reflection.created_at.desc()).all()
-            return [reflection.to_dict() for reflection in reflections]
+            query = Reflection.query.filter_by(user_id=user_id).order_by(Reflection.created_at.desc())
+            return self._serialize_list(query, sparse_fields)
         except Exception as e:
             self.logger.error(f"Error retrieving reflections: {str(e)}")
             raise
 
-    def get_recent_reflections(self, user_id, limit=5):
-        """Get recent reflections for a specific user."""
+    def get_recent_reflections(self, user_id, limit=5, fields=None):
+        """Get recent reflections for a specific user, optionally only the given fields."""
+        sparse_fields = Reflection.parse_fields(fields)
         try:
-            reflections = Reflection.query.filter_by(user_id=user_id).order_by(Reflection.created_at.desc()).limit(limit).all()
-            return [reflection.to_dict() for reflection in reflections]
+            query = Reflection.query.filter_by(user_id=user_id).order_by(Reflection.created_at.desc()).limit(limit)
+            return self._serialize_list(query, sparse_fields)
         except Exception as e:
             self.logger.error(f"Error retrieving recent reflections: {str(e)}")
             raise
 
+    def _serialize_list(self, query, sparse_fields):
+        if sparse_fields:
+            rows = Reflection.project(query, sparse_fields).all()
+            return Reflection.serialize_rows(rows, sparse_fields)
+        return Reflection.serialize_many(query.all())
+
+    def get_reflections_version(self, user_id):
+        """Return a token that changes whenever the user's reflections would."""
+        return tuple(
+            db.session.query(
+                db.func.count(Reflection.id), db.func.max(Reflection.updated_at)
+            )
+            .filter(Reflection.user_id == user_id)
+            .one()
+        )
+
+    def get_reflection_version(self, reflection_id, user_id=None):
+        """Return a token that changes whenever the reflection would, None if it does not exist."""
+        query = db.session.query(Reflection.updated_at).filter(Reflection.id == reflection_id)
+        if user_id is not None:
+            query = query.filter(Reflection.user_id == user_id)
+        row = query.first()
+        return tuple(row) if row is not None else None
+
     def get_reflection_by_id(self, reflection_id, user_id=None):
         """Get a reflection by ID, optionally filtering by user_id."""
         try:
@@ -46,6 +102,8 @@ class ReflectionService(IReflectionService):
         """Create a new reflection."""
         try:
             reflection = Reflection(**reflection_data)
+            if reflection.ai_response and not reflection.ai_response_status:
+                reflection.ai_response_status = AI_RESPONSE_COMPLETED
             db.session.add(reflection)
             db.session.commit()
             return reflection.to_dict()
@@ -54,6 +112,86 @@ class ReflectionService(IReflectionService):
             self.logger.error(f"Error creating reflection: {str(e)}")
             raise
 
+    def create_pending_reflection(self, reflection_data):
+        """Create a new reflection whose AI response will be generated later by fill_ai_response."""
+        return self.create_reflection(
+            dict(
+                reflection_data,
+                ai_response=None,
+                ai_response_status=AI_RESPONSE_PENDING,
+            )
+        )
+
+    def fill_ai_response(self, reflection_id, use_fallback=False):
+        """
+        Generate and store the AI response of a pending reflection.
+
+        Meant to run on a background worker. The transaction is closed before
+        calling the AI API so no database connection is held during the call.
+        """
+        reflection = Reflection.query.get(reflection_id)
+        if not reflection or reflection.ai_response_status != AI_RESPONSE_PENDING:
+            db.session.rollback()
+            return None
+        user_reflection = reflection.user_reflection
+        reflection_type = reflection.reflection_type
+        db.session.commit()
+
+        try:
+            if use_fallback:
+                ai_response = self._get_mock_ai_response(reflection_type)
+            else:
+                ai_response = self.generate_ai_response(
+                    user_reflection, reflection_type, fallback=False
+                )
+            status = AI_RESPONSE_COMPLETED
+        except Exception as e:
+            self.logger.error(f"Error generating AI response for reflection {reflection_id}: {str(e)}")
+            ai_response = None
+            status = AI_RESPONSE_FAILED
+
+        try:
+            # only fill in a response that is still pending, it may have been edited meanwhile
+            Reflection.query.filter_by(
+                id=reflection_id, ai_response_status=AI_RESPONSE_PENDING
+            ).update(
+                {"ai_response": ai_response, "ai_response_status": status},
+                synchronize_session=False,
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Error storing AI response for reflection {reflection_id}: {str(e)}")
+            raise
+
+        with _ai_response_ready:
+            _ai_response_ready.notify_all()
+        return ai_response
+
+    def wait_for_ai_response(self, reflection_id, user_id=None, timeout=0):
+        """
+        Get a reflection, waiting up to timeout seconds for a pending AI response.
+
+        Returns the reflection as soon as its response is filled in, or as it
+        is once the timeout elapses, None if it does not exist.
+        """
+        deadline = time.monotonic() + timeout
+        query = db.session.query(Reflection.ai_response_status).filter(Reflection.id == reflection_id)
+        if user_id is not None:
+            query = query.filter(Reflection.user_id == user_id)
+
+        while True:
+            status = query.scalar()
+            # end the transaction so the next check sees newly committed responses
+            db.session.rollback()
+            remaining = deadline - time.monotonic()
+            if status != AI_RESPONSE_PENDING or remaining <= 0:
+                break
+            with _ai_response_ready:
+                _ai_response_ready.wait(min(remaining, AI_RESPONSE_POLL_INTERVAL))
+
+        return self.get_reflection_by_id(reflection_id, user_id)
+
     def update_reflection(self, reflection_id, reflection_data, user_id=None):
         """Update an existing reflection."""
         try:
@@ -178,42 +316,131 @@ class ReflectionService(IReflectionService):
         import random
         return random.choice(prompts.get(reflection_type, prompts["gratitude"]))
 
-    def generate_ai_response(self, user_reflection, reflection_type):
-        """Generate an AI response to the user's reflection using Cohere API."""
+    def _build_cohere_request(self, user_reflection, reflection_type):
+        """Return the headers, payload and cache key of a Cohere chat request."""
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.cohere_api_key}",
+            "Accept": "application/json"
+        }
+
+        payload = {
+            "message": user_reflection,
+            "model": "command",
+            "preamble": self._get_preamble_for_reflection(reflection_type),
+            "temperature": 0.7,
+            "stop_sequences": ["\n\n"]
+        }
+
+        key = cache_key(
+            payload["model"],
+            payload["preamble"],
+            payload["temperature"],
+            payload["stop_sequences"],
+            normalize_message(user_reflection),
+        )
+        return headers, payload, key
+
+    def _get_cached_ai_response(self, key, bypass_cache):
+        if bypass_cache:
+            ai_response_cache.record_bypass()
+            return None
+        return ai_response_cache.get(key, self.logger)
+
+    def generate_ai_response(
+        self, user_reflection, reflection_type, bypass_cache=False, fallback=True
+    ):
+        """
+        Generate an AI response to the user's reflection using Cohere API.
+
+        Responses are cached by a hash of the model, preamble, parameters and
+        normalized reflection; bypass_cache forces a fresh response (which then
+        replaces the cached one).
+
+        When the API fails the mock response is returned, unless fallback is
+        False, in which case the error is raised so the caller can record the
+        failure (see fill_ai_response). Without an API key the mock response
+        is always returned.
+        """
         try:
             if not self.cohere_api_key:
                 self.logger.warning("Cohere API key not configured, using mock response")
                 return self._get_mock_ai_response(reflection_type)
-                
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.cohere_api_key}",
-                "Accept": "application/json"
-            }
-            
-            payload = {
-                "message": user_reflection,
-                "model": "command",
-                "preamble": self._get_preamble_for_reflection(reflection_type),
-                "temperature": 0.7,
-                "stop_sequences": ["\n\n"]
-            }
+
+            headers, payload, key = self._build_cohere_request(user_reflection, reflection_type)
+            cached = self._get_cached_ai_response(key, bypass_cache)
+            if cached is not None:
+                return cached
             
-            response = requests.post(self.cohere_api_url, headers=headers, json=payload, timeout=30)
+            with outbound("cohere"):
+                response = requests.post(self.cohere_api_url, headers=headers, json=payload, timeout=30)
             response.raise_for_status()
             
             result = response.json()
             if "text" in result:
-                print(result["text"])
+                ai_response_cache.put(key, result["text"], self.logger)
                 return result["text"]
             else:
-                self.logger.error(f"Unexpected API response format: {result}")
-                return self._get_mock_ai_response(reflection_type)
+                raise Exception(f"Unexpected API response format: {result}")
                 
         except Exception as e:
             self.logger.error(f"Error generating AI response: {str(e)}")
+            if not fallback:
+                raise
             return self._get_mock_ai_response(reflection_type)
-    
+
+    def stream_ai_response(self, user_reflection, reflection_type, bypass_cache=False):
+        """
+        Generate an AI response using Cohere's streaming chat API, yielding the
+        text in chunks as they arrive.
+
+        Cached responses, and the mock response when the API key is missing or
+        the API fails before sending any text, are yielded in word-sized chunks.
+        """
+        if not self.cohere_api_key:
+            self.logger.warning("Cohere API key not configured, using mock response")
+            yield from _chunk_words(self._get_mock_ai_response(reflection_type))
+            return
+
+        headers, payload, key = self._build_cohere_request(user_reflection, reflection_type)
+        cached = self._get_cached_ai_response(key, bypass_cache)
+        if cached is not None:
+            yield from _chunk_words(cached)
+            return
+
+        chunks = []
+        try:
+            # docs: https://docs.cohere.com/v1/reference/chat-stream
+            # the response body is one JSON event per line
+            with outbound("cohere"), requests.post(
+                self.cohere_api_url,
+                headers=headers,
+                json=dict(payload, stream=True),
+                timeout=(5, 30),
+                stream=True,
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    event_type = event.get("event_type")
+                    if event_type == "text-generation":
+                        chunks.append(event["text"])
+                        yield event["text"]
+                    elif event_type == "stream-end":
+                        if event.get("finish_reason") not in (None, "COMPLETE", "MAX_TOKENS"):
+                            raise Exception(f"Stream ended with {event.get('finish_reason')}")
+                        break
+        except Exception as e:
+            self.logger.error(f"Error streaming AI response: {str(e)}")
+            if not chunks:
+                yield from _chunk_words(self._get_mock_ai_response(reflection_type))
+            return
+
+        if chunks:
+            ai_response_cache.put(key, "".join(chunks), self.logger)
+
     def _get_mock_ai_response(self, reflection_type):
         """Provide a mock AI response for when the API is unavailable."""
         responses = {
@@ -225,3 +452,13 @@ class ReflectionService(IReflectionService):
         }
         
         return responses.get(reflection_type, responses["gratitude"])
+
+
+def _chunk_words(text, words_per_chunk=3):
+    """Split text into chunks of a few words, keeping the separating spaces."""
+    words = text.split(" ")
+    for start in range(0, len(words), words_per_chunk):
+        chunk = " ".join(words[start:start + words_per_chunk])
+        if start + words_per_chunk < len(words):
+            chunk += " "
+        yield chunk
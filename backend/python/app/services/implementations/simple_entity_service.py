@@ -10,7 +10,7 @@ class SimpleEntityService(ISimpleEntityService):
     def get_entities(self):
         # SimpleEntity is a SQLAlchemy model, we can use convenient methods provided
         # by SQLAlchemy like query.all() to query the data
-        return [result.to_dict() for result in SimpleEntity.query.all()]
+        return SimpleEntity.serialize_many(SimpleEntity.query.all())
 
     def get_entity(self, id):
         # get queries by the primary key, which is id for the Entity table
@@ -1,12 +1,26 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+import os
+
 import firebase_admin.auth
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 
 from ..interfaces.user_service import IUserService
 from ...models.user import User
 from ...models.progress import Progress
+from ...models.progress_daily import ProgressDaily
 from ...models import db
 from ...resources.user_dto import UserDTO
 from ...resources.progress_dto import ProgressDTO
+from ...utilities.request_timing import outbound
+
+# Firebase's batch lookup accepts at most 100 identifiers per call
+FIREBASE_LOOKUP_BATCH_SIZE = 100
+FIREBASE_LOOKUP_MAX_WORKERS = int(os.getenv("FIREBASE_LOOKUP_MAX_WORKERS", 4))
+
+# periods get_points_summary can group by, passed to Postgres' date_trunc
+POINTS_GRANULARITIES = ("day", "week", "month")
 
 
 class UserService(IUserService):
@@ -14,15 +28,18 @@ class UserService(IUserService):
     UserService implementation with user management methods
     """
 
-    def __init__(self, logger, email_service):
+    def __init__(self, logger, email_service, leaderboard_service=None):
         """
         Create an instance of UserService
 
         :param logger: application's logger instance
         :type logger: logger
+        :param leaderboard_service: kept current as progress is recorded
+        :type leaderboard_service: ILeaderboardService
         """
         self.logger = logger
         self.email_service = email_service
+        self.leaderboard_service = leaderboard_service
 
     def get_user_by_id(self, user_id):
         try:
@@ -31,7 +48,8 @@ class UserService(IUserService):
             if not user:
                 raise Exception("user_id {user_id} not found".format(user_id))
 
-            firebase_user = firebase_admin.auth.get_user(user.auth_id)
+            with outbound("firebase"):
+                firebase_user = firebase_admin.auth.get_user(user.auth_id)
 
             user_dict = UserService.__user_to_dict_and_remove_unused(user)
             user_dict["email"] = firebase_user.email
@@ -47,7 +65,8 @@ class UserService(IUserService):
 
     def get_user_by_email(self, email):
         try:
-            firebase_user = firebase_admin.auth.get_user_by_email(email)
+            with outbound("firebase"):
+                firebase_user = firebase_admin.auth.get_user_by_email(email)
             user = User.query.filter_by(auth_id=firebase_user.uid).first()
 
             if not user:
@@ -114,23 +133,69 @@ class UserService(IUserService):
             raise e
 
     def get_users(self):
+        user_list = User.query.all()
+        emails = self.__get_firebase_emails([user.auth_id for user in user_list])
+
         user_dtos = []
-        user_list = [result for result in User.query.all()]
         for user in user_list:
             user_dict = UserService.__user_to_dict_and_remove_unused(user)
-            try:
-                firebase_user = firebase_admin.auth.get_user(user.auth_id)
-                user_dict["email"] = firebase_user.email
-                user_dtos.append(UserDTO(**user_dict))
-            except Exception as e:
-                self.logger.error(
-                    "User with auth_id {auth_id} could not be fetched from Firebase".format(
-                        auth_id=user.auth_id
+            # fall back to the email stored in Postgres if Firebase has no record
+            user_dict["email"] = emails.get(user.auth_id) or user.email_address
+            user_dtos.append(UserDTO(**user_dict))
+
+        return user_dtos
+
+    def __get_firebase_emails(self, auth_ids):
+        """
+        Look up the Firebase emails of many users with batched get_users calls,
+        run concurrently on a bounded thread pool
+
+        :param auth_ids: the users' auth_ids (Firebase uids)
+        :type auth_ids: list[str]
+        :return: email keyed by auth_id, users that could not be fetched are omitted
+        :rtype: dict
+        """
+        chunks = [
+            auth_ids[i : i + FIREBASE_LOOKUP_BATCH_SIZE]
+            for i in range(0, len(auth_ids), FIREBASE_LOOKUP_BATCH_SIZE)
+        ]
+        if not chunks:
+            return {}
+
+        emails = {}
+        max_workers = min(FIREBASE_LOOKUP_MAX_WORKERS, len(chunks))
+        # timed as a whole here, the lookups run on threads outside the request
+        with outbound("firebase"), ThreadPoolExecutor(
+            max_workers=max_workers
+        ) as executor:
+            for found in executor.map(self.__get_firebase_emails_chunk, chunks):
+                emails.update(found)
+        return emails
+
+    def __get_firebase_emails_chunk(self, auth_ids):
+        try:
+            result = firebase_admin.auth.get_users(
+                [firebase_admin.auth.UidIdentifier(auth_id) for auth_id in auth_ids]
+            )
+        except Exception as e:
+            reason = getattr(e, "message", None)
+            self.logger.error(
+                "Failed to fetch {count} users from Firebase. Reason = {reason}".format(
+                    count=len(auth_ids), reason=(reason if reason else str(e))
+                )
+            )
+            return {}
+
+        if result.not_found:
+            self.logger.error(
+                "Users with auth_ids {auth_ids} could not be fetched from Firebase".format(
+                    auth_ids=", ".join(
+                        identifier.uid for identifier in result.not_found
                     )
                 )
-                raise e
+            )
 
-        return user_dtos
+        return {user.uid: user.email for user in result.users}
 
     def create_user(self, user, auth_id=None, signup_method="PASSWORD"):
         new_user = None
@@ -419,21 +484,17 @@ class UserService(IUserService):
         return user_dict
     
 
-    def email_all_users(self, subject, body):
-        users_with_notifs = User.query.filter_by(allow_notifs=True).all()
-        email_list = [user.email_address for user in users_with_notifs]
-        for email in email_list:
-            try:
-                self.email_service.send_email(email, subject, body)
-            except Exception as e:
-                self.logger.error(
-                    "Failed to send email to user with email {email}".format(
-                        email=email
-                    )
+    def get_users_with_notifs(self):
+        try:
+            return User.query.filter_by(allow_notifs=True).all()
+        except Exception as e:
+            reason = getattr(e, "message", None)
+            self.logger.error(
+                "Failed to retrieve users with notifications enabled. Reason = {reason}".format(
+                    reason=(reason if reason else str(e))
                 )
-                raise e
-
-        return
+            )
+            raise e
 
     def get_users_by_location(self, location):
         """
@@ -456,39 +517,110 @@ class UserService(IUserService):
             )
             raise e
 
-    def email_users_in_location(self, users, subject, body):
-        """
-        Send emails to users in a specified location.
-
-        :param users: List of users to email
-        :type users: list[User]
-        :param subject: Email subject
-        :type subject: str
-        :param body: Email body
-        :type body: str
-        """
-        email_list = [user.email_address for user in users]
-        for email in email_list:
-            try:
-                self.email_service.send_email(email, subject, body)
-            except Exception as e:
-                self.logger.error(
-                    "Failed to send email to user with email {email}".format(email=email)
-                )
-                raise e
-    
     def update_progress(self, progress_item):
         new_progress = None
         try:
             new_progress = Progress(**progress_item)
-            print(new_progress)
             db.session.add(new_progress)
+            # flush to assign the id and date the rollup is computed from
+            db.session.flush()
+            self.__add_to_daily_rollup([new_progress.id])
             db.session.commit()
         except Exception as postgres_error:
+            db.session.rollback()
             raise postgres_error
 
+        self.__record_leaderboard_points(
+            new_progress.user_id, new_progress.points_collected, new_progress.date
+        )
         return ProgressDTO(**new_progress.to_dict())
     
+    def create_progress_batch(self, user_id, progress_items):
+        progress = Progress.__table__
+        rows = {}
+        for item in progress_items:
+            # a key repeated within the batch is a duplicate of its first use
+            rows.setdefault(
+                item["idempotency_key"],
+                {
+                    "user_id": user_id,
+                    "idempotency_key": item["idempotency_key"],
+                    "content_type": item["content_type"],
+                    "points_collected": item["points_collected"],
+                    "date": (
+                        item["date"]
+                        if item.get("date") is not None
+                        else db.func.current_timestamp()
+                    ),
+                },
+            )
+
+        try:
+            statement = (
+                insert(progress)
+                .values(list(rows.values()))
+                .on_conflict_do_nothing(
+                    constraint="uq_progress_user_id_idempotency_key"
+                )
+                .returning(*progress.c)
+            )
+            created = {
+                row.idempotency_key: row for row in db.session.execute(statement)
+            }
+            if created:
+                self.__add_to_daily_rollup([row.id for row in created.values()])
+
+            existing = {}
+            conflicting_keys = [key for key in rows if key not in created]
+            if conflicting_keys:
+                existing = {
+                    row.idempotency_key: row
+                    for row in db.session.execute(
+                        progress.select().where(
+                            db.and_(
+                                progress.c.user_id == user_id,
+                                progress.c.idempotency_key.in_(conflicting_keys),
+                            )
+                        )
+                    )
+                }
+            db.session.commit()
+        except IntegrityError:
+            # user_id is the only foreign key of progress and progress_daily
+            db.session.rollback()
+            raise LookupError("user_id {user_id} not found".format(user_id=user_id))
+        except Exception as postgres_error:
+            db.session.rollback()
+            reason = getattr(postgres_error, "message", None)
+            self.logger.error(
+                "Failed to store progress batch. Reason = {reason}".format(
+                    reason=(reason if reason else str(postgres_error))
+                )
+            )
+            raise postgres_error
+
+        for row in created.values():
+            self.__record_leaderboard_points(
+                row.user_id, row.points_collected, row.date
+            )
+
+        results = []
+        seen = set()
+        for item in progress_items:
+            key = item["idempotency_key"]
+            row = created.get(key)
+            status = "created" if row is not None and key not in seen else "duplicate"
+            row = row if row is not None else existing.get(key)
+            seen.add(key)
+            results.append(
+                {
+                    "idempotency_key": key,
+                    "status": status,
+                    "progress": UserService.__progress_row_to_dict(row),
+                }
+            )
+        return results
+
     def delete_progress(self, user_id):
         try:
             # Verify the user exists
@@ -500,9 +632,15 @@ class UserService(IUserService):
             delete_count = Progress.query.filter_by(user_id=user_id).delete(
                 synchronize_session="fetch"
             )
+            ProgressDaily.query.filter_by(user_id=user_id).delete(
+                synchronize_session=False
+            )
             
             # Commit the transaction
             db.session.commit()
+
+            if self.leaderboard_service is not None:
+                self.leaderboard_service.remove_user(int(user_id))
             
             # Log the deletion
             self.logger.info(
@@ -544,4 +682,116 @@ class UserService(IUserService):
             return []
             
         return progress_records
-    
+
+    def get_points_summary(
+        self,
+        user_id,
+        granularity="day",
+        start_date=None,
+        end_date=None,
+        by_content_type=False,
+    ):
+        if granularity not in POINTS_GRANULARITIES:
+            raise ValueError(
+                "granularity must be one of {granularities}".format(
+                    granularities=", ".join(POINTS_GRANULARITIES)
+                )
+            )
+
+        # a literal rather than a bind parameter, so that Postgres sees the
+        # same expression in SELECT and GROUP BY
+        period = db.cast(
+            db.func.date_trunc(
+                db.literal_column("'{granularity}'".format(granularity=granularity)),
+                ProgressDaily.day,
+            ),
+            db.Date,
+        ).label("period")
+        group_by = [period]
+        if by_content_type:
+            group_by.append(ProgressDaily.content_type)
+
+        query = db.session.query(
+            *group_by, db.func.sum(ProgressDaily.points).label("points")
+        ).filter(ProgressDaily.user_id == user_id)
+        if start_date:
+            query = query.filter(ProgressDaily.day >= start_date)
+        if end_date:
+            query = query.filter(ProgressDaily.day <= end_date)
+        rows = query.group_by(*group_by).order_by(*group_by).all()
+
+        points = []
+        for row in rows:
+            bucket = {"period": row.period.isoformat(), "points": int(row.points)}
+            if by_content_type:
+                bucket["content_type"] = row.content_type
+            points.append(bucket)
+
+        return {
+            "user_id": int(user_id),
+            "granularity": granularity,
+            "total": sum(bucket["points"] for bucket in points),
+            "points": points,
+        }
+
+    def __add_to_daily_rollup(self, progress_ids):
+        """
+        Add the points of the given, just inserted, progress rows to progress_daily
+
+        Runs in the caller's transaction. Rows for the same user, day and
+        content type are summed first, since one INSERT ... ON CONFLICT can
+        update each rollup row only once.
+        """
+        day = db.cast(Progress.date, db.Date)
+        points = (
+            db.select(
+                [
+                    Progress.user_id,
+                    day,
+                    Progress.content_type,
+                    db.func.sum(Progress.points_collected),
+                ]
+            )
+            .where(Progress.id.in_(progress_ids))
+            .group_by(Progress.user_id, day, Progress.content_type)
+        )
+        rollup = ProgressDaily.__table__
+        statement = insert(rollup).from_select(
+            ["user_id", "day", "content_type", "points"], points
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[rollup.c.user_id, rollup.c.day, rollup.c.content_type],
+            set_={"points": rollup.c.points + statement.excluded.points},
+        )
+        db.session.execute(statement)
+
+    def __record_leaderboard_points(self, user_id, points, when):
+        """
+        Add committed points to the in-memory leaderboards
+
+        Failures are logged, not raised: the progress is already saved and the
+        next leaderboard reconcile will include it.
+        """
+        if self.leaderboard_service is None:
+            return
+        try:
+            self.leaderboard_service.record_points(user_id, points, when)
+        except Exception as e:
+            reason = getattr(e, "message", None)
+            self.logger.error(
+                "Failed to update leaderboards. Reason = {reason}".format(
+                    reason=(reason if reason else str(e))
+                )
+            )
+
+    @staticmethod
+    def __progress_row_to_dict(row):
+        if row is None:
+            return None
+        return {
+            "id": row.id,
+            "user_id": row.user_id,
+            "content_type": row.content_type,
+            "points_collected": row.points_collected,
+            "date": row.date.strftime("%Y-%m-%d %H:%M:%S"),
+        }
@@ -7,14 +7,34 @@ class IArticleService(ABC):
     """
 
     @abstractmethod
-    def get_all_articles(self):
-        """Return a list of all articles.
+    def get_all_articles(self, fields=None):
+        """Return a list of all articles with their contents.
 
+        :param fields: "summary" to omit the articles' contents, or a comma
+            separated list of columns to return
         :return: A list of dictionaries from Article objects.
         :rtype: list of dictionaries
         """
         pass
 
+    @abstractmethod
+    def get_articles_version(self):
+        """Return a token that changes whenever the list of articles does.
+
+        :rtype: tuple
+        """
+        pass
+
+    @abstractmethod
+    def get_article_version(self, article_id):
+        """Return a token that changes whenever the article does.
+
+        :param article_id: Article ID
+        :return: The version token, None if the article does not exist.
+        :rtype: tuple
+        """
+        pass
+
     @abstractmethod
     def get_article_by_id(self, article_id):
         """Return a dictionary representation of an Article object based on ID.
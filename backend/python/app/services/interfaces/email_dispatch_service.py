@@ -0,0 +1,49 @@
+from abc import ABC, abstractmethod
+
+
+class IEmailDispatchService(ABC):
+    """
+    EmailDispatchService interface for sending bulk email in the background
+    """
+
+    @abstractmethod
+    def enqueue(self, recipients, subject, body):
+        """
+        Persist a bulk email job and hand it to the background workers
+
+        :param recipients: recipients' emails
+        :type recipients: list[str]
+        :param subject: email subject
+        :type subject: str
+        :param body: email body as html
+        :type body: str
+        :return: the created job with its id and counts
+        :rtype: dict
+        """
+        pass
+
+    @abstractmethod
+    def get_job(self, job_id):
+        """
+        Get the status of a bulk email job
+
+        :param job_id: id of the job returned by enqueue
+        :type job_id: int
+        :return: the job's status with sent, failed and pending counts, None if not found
+        :rtype: dict
+        """
+        pass
+
+    @abstractmethod
+    def start(self):
+        """
+        Start the worker threads, resuming any jobs left pending by a restart
+        """
+        pass
+
+    @abstractmethod
+    def stop(self):
+        """
+        Stop the worker threads
+        """
+        pass
@@ -23,3 +23,20 @@ class IEmailService(ABC):
         :raises Exception: if email was not sent successfully
         """
         pass
+
+    @abstractmethod
+    def send_emails_batch(self, recipients, subject, body):
+        """
+        Sends the same email to many recipients in a single batch request
+
+        :param recipients: recipients' emails, at most 100
+        :type recipients: list[str]
+        :param subject: email subject
+        :type subject: str
+        :param body: email body as html
+        :type body: str
+        :return: for each recipient, in order, the exception raised or None if it was sent
+        :rtype: list
+        :raises Exception: if the batch request itself could not be made
+        """
+        pass
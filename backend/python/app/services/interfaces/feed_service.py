@@ -2,13 +2,29 @@ from abc import ABC, abstractmethod
 
 class IFeedService(ABC):
     @abstractmethod
-    def get_entities(self):
+    def get_entities(self, fields=None):
         pass
 
     @abstractmethod
     def get_entity(self, id):
         pass
 
+    @abstractmethod
+    def get_feeds_version(self, location=None):
+        pass
+
+    @abstractmethod
+    def get_feed_version(self, id):
+        pass
+
+    @abstractmethod
+    def get_comments_version(self, feed_id):
+        pass
+
+    @abstractmethod
+    def get_feeds_page(self, location=None, limit=None, cursor=None, fields=None):
+        pass
+
     @abstractmethod
     def create_feed_post(self, entity):
         pass
@@ -30,9 +46,27 @@ class IFeedService(ABC):
         pass
 
     @abstractmethod
-    def increment_view_count(self, feed_id):
+    def get_comment_tree(
+        self, feed_id, parent_id=None, limit=None, cursor=None, depth=None, replies=None
+    ):
+        pass
+
+    @abstractmethod
+    def feed_exists(self, feed_id):
+        pass
+
+    @abstractmethod
+    def increment_view_count(self, feed_id, count=1):
+        pass
+
+    @abstractmethod
+    def flush_view_counts(self, view_counts):
         pass
 
     @abstractmethod
     def remove_like(self, feed_id, user_id):
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def reconcile_counters(self):
+        pass
@@ -0,0 +1,87 @@
+from abc import ABC, abstractmethod
+
+
+class ILeaderboardService(ABC):
+    """
+    LeaderboardService interface for ranking users by progress points
+    """
+
+    @abstractmethod
+    def board_key(self, board="global", location=None, week=None):
+        """
+        Return the key of a leaderboard
+
+        :param board: "global", "centre" or "week"
+        :type board: str
+        :param location: the centre, required for the centre board
+        :type location: str, optional
+        :param week: ISO week such as "2024-W05" for the week board, defaults to
+        the current week
+        :type week: str, optional
+        :rtype: str
+        :raises ValueError: if the board, location or week is invalid
+        """
+        pass
+
+    @abstractmethod
+    def get_top(self, board_key, limit=10, offset=0):
+        """
+        Get the highest ranked users of a leaderboard
+
+        :param board_key: key returned by board_key
+        :type board_key: str
+        :param limit: maximum number of entries
+        :type limit: int
+        :param offset: number of entries to skip
+        :type offset: int
+        :return: dict with the board, its size and the entries in rank order, each
+        with rank, user_id, points, first_name and last_name
+        :rtype: dict
+        """
+        pass
+
+    @abstractmethod
+    def get_rank(self, board_key, user_id):
+        """
+        Get a user's rank on a leaderboard
+
+        :param board_key: key returned by board_key
+        :type board_key: str
+        :param user_id: the user's id
+        :type user_id: int
+        :return: dict with the board, its size, and the user's rank and points,
+        None if the user has no points on the board
+        :rtype: dict
+        """
+        pass
+
+    @abstractmethod
+    def record_points(self, user_id, points, when):
+        """
+        Add points a user just collected to every board they count towards
+
+        :param user_id: the user's id
+        :type user_id: int
+        :param points: points collected
+        :type points: int
+        :param when: when the points were collected
+        :type when: datetime
+        """
+        pass
+
+    @abstractmethod
+    def remove_user(self, user_id):
+        """
+        Remove a user from every leaderboard, e.g. after their progress is deleted
+
+        :param user_id: the user's id
+        :type user_id: int
+        """
+        pass
+
+    @abstractmethod
+    def reconcile(self):
+        """
+        Rebuild every leaderboard from the progress_daily table
+        """
+        pass
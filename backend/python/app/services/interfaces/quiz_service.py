@@ -42,15 +42,40 @@ class IQuizService(ABC):
         pass
 
     @abstractmethod
-    def get_all_quizzes(self):
+    def get_all_quizzes(self, fields=None):
         """
         Retrieves all quizzes.
 
+        :param fields: comma separated list of columns to return
+        :type fields: str, optional
         :return: A list of dictionaries representing Quiz objects.
         :rtype: list[dict]
         """
         pass
 
+    @abstractmethod
+    def get_quizzes_version(self):
+        """
+        Returns a token that changes whenever the quiz listing would.
+
+        :rtype: tuple
+        """
+        pass
+
+    @abstractmethod
+    def get_quiz_version(self, quiz_id=None, article_id=None):
+        """
+        Returns a token that changes whenever the quiz would.
+
+        :param quiz_id: ID of the quiz
+        :type quiz_id: int, optional
+        :param article_id: ID of the quiz's article, when looked up by article
+        :type article_id: int, optional
+        :return: version token, None if the quiz does not exist
+        :rtype: tuple | None
+        """
+        pass
+
     @abstractmethod
     def update_quiz(self, quiz_id, quiz_data):
         """
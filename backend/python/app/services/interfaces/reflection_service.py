@@ -9,7 +9,7 @@ class IReflectionService(ABC):
         self.logger = logger 
         
     @abstractmethod
-    def get_all_reflections(self, user_id):
+    def get_all_reflections(self, user_id, fields=None):
         """Return a list of all articles.
 
         :return: A list of dictionaries from Article objects.
@@ -18,7 +18,7 @@ class IReflectionService(ABC):
         pass
 
     @abstractmethod
-    def get_recent_reflections(self, user_id, limit=5):
+    def get_recent_reflections(self, user_id, limit=5, fields=None):
         """Return a dictionary representation of an Article object based on ID.
 
         :param article_id: Article ID
@@ -28,6 +28,26 @@ class IReflectionService(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_reflections_version(self, user_id):
+        """Return a token that changes whenever the user's reflections do.
+
+        :param user_id: User ID
+        :rtype: tuple
+        """
+        pass
+
+    @abstractmethod
+    def get_reflection_version(self, reflection_id, user_id=None):
+        """Return a token that changes whenever the reflection does.
+
+        :param reflection_id: Reflection ID
+        :param user_id: User ID the reflection must belong to
+        :return: The version token, None if the reflection does not exist.
+        :rtype: tuple
+        """
+        pass
+
     @abstractmethod
     def get_reflection_by_id(self, reflection_id, user_id=None):
         """Create a new Article object.
@@ -51,6 +71,40 @@ class IReflectionService(ABC):
         """
         pass
 
+    @abstractmethod
+    def create_pending_reflection(self, reflection_data):
+        """Create a new reflection whose AI response is generated later.
+
+        :param reflection_data: Dictionary containing reflection fields.
+        :return: Dictionary representation of the reflection, with a pending ai_response_status.
+        :rtype: dictionary
+        """
+        pass
+
+    @abstractmethod
+    def fill_ai_response(self, reflection_id, use_fallback=False):
+        """Generate and store the AI response of a pending reflection.
+
+        :param reflection_id: Reflection ID
+        :param use_fallback: store the canned response instead of calling the AI API
+        :return: The generated response, None if the reflection is not pending
+            or the AI API failed, in which case its status is "failed".
+        :rtype: str
+        """
+        pass
+
+    @abstractmethod
+    def wait_for_ai_response(self, reflection_id, user_id=None, timeout=0):
+        """Return a reflection once its pending AI response is filled in.
+
+        :param reflection_id: Reflection ID
+        :param user_id: User ID the reflection must belong to
+        :param timeout: Maximum number of seconds to wait.
+        :return: Dictionary representation of the reflection, None if not found.
+        :rtype: dictionary
+        """
+        pass
+
     @abstractmethod
     def update_reflection(self, reflection_id, reflection_data, user_id=None):
         """Delete an existing article.
@@ -78,8 +132,24 @@ class IReflectionService(ABC):
         pass
 
     @abstractmethod
-    def generate_ai_response(self, user_reflection, reflection_type):
-        """Generate an AI response to the user's reflection."""
+    def generate_ai_response(
+        self, user_reflection, reflection_type, bypass_cache=False, fallback=True
+    ):
+        """Generate an AI response to the user's reflection.
+
+        :param bypass_cache: skip cached responses and store a fresh one
+        :param fallback: return the canned response when the AI API fails,
+            otherwise raise
+        """
+        pass
+
+    @abstractmethod
+    def stream_ai_response(self, user_reflection, reflection_type, bypass_cache=False):
+        """Generate an AI response to the user's reflection, yielding it in chunks.
+
+        :param bypass_cache: skip cached responses and store a fresh one
+        :rtype: generator of str
+        """
         pass
 
     @abstractmethod
@@ -138,15 +138,12 @@ class IUserService(ABC):
         pass
 
     @abstractmethod
-    def email_all_users(self, subject, body):
+    def get_users_with_notifs(self):
         """
-        Email all users of the platform who have email notifications enabled
+        Get all users who have email notifications enabled
 
-        :param str subject: subject of email
-        :type subject: str
-        :param str body: HTML body of email
-        :type body: str
-        :raises Exception: if user deletion fails
+        :rtype: list[User]
+        :raises Exception: if user retrieval fails
         """
         pass
 
@@ -163,6 +160,27 @@ class IUserService(ABC):
         """
         pass
 
+    @abstractmethod
+    def create_progress_batch(self, user_id, progress_items):
+        """
+        Add several progress items for a user in one statement
+
+        Items whose idempotency_key the user already stored, or that repeat
+        an earlier key of the batch, are not inserted again.
+
+        :param user_id: id of the user the progress belongs to
+        :type user_id: int
+        :param progress_items: dicts with idempotency_key, content_type,
+        points_collected and date (None for the current time)
+        :type progress_items: list of dict
+        :return: per item, in order, {"idempotency_key", "status", "progress"}
+        where status is "created" or "duplicate" and progress is the stored row
+        :rtype: list of dict
+        :raises LookupError: if the user does not exist
+        :raises Exception: if the batch cannot be stored
+        """
+        pass
+
     @abstractmethod
     def get_points_by_date(self, user_id, start_date=None, end_date=None):
         """
@@ -178,6 +196,34 @@ class IUserService(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_points_summary(
+        self,
+        user_id,
+        granularity="day",
+        start_date=None,
+        end_date=None,
+        by_content_type=False,
+    ):
+        """
+        Sum a user's progress points per day, week or month
+
+        :param user_id: the ID of the user to summarize
+        :type user_id: int or str
+        :param granularity: one of "day", "week" (starting Monday) or "month"
+        :type granularity: str
+        :param start_date: first day to include
+        :type start_date: date, optional
+        :param end_date: last day to include
+        :type end_date: date, optional
+        :param by_content_type: also group by content_type
+        :type by_content_type: bool
+        :return: dict with the total and the points per period, in date order
+        :rtype: dict
+        :raises ValueError: if granularity is not supported
+        """
+        pass
+
     @abstractmethod
     def delete_progress(self, user_id):
         """
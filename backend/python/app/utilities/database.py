@@ -0,0 +1,95 @@
+"""
+Connection pool instrumentation and per-request statement timeouts
+
+TimedQueuePool is a drop-in QueuePool (select it with the poolclass engine
+option) that reports pool utilisation:
+* db_pool_checked_out, db_pool_overflow and db_pool_size gauges
+* db_pool_checkout_wait_seconds, the time spent waiting for a connection,
+  including opening a new one
+* db_pool_checkout_timeouts_total, checkouts that gave up after pool_timeout
+
+register_statement_timeouts sets a Postgres statement_timeout at the start of
+every transaction, with separate limits for read requests (GET, HEAD,
+OPTIONS) and everything else, so a stuck query cannot hold a connection
+indefinitely.
+"""
+
+import time
+
+from flask import has_request_context, request
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+from .metrics import registry
+
+READ_METHODS = frozenset(["GET", "HEAD", "OPTIONS"])
+
+pool_checked_out = registry.gauge(
+    "db_pool_checked_out", "Database connections currently checked out of the pool"
+)
+pool_overflow = registry.gauge(
+    "db_pool_overflow", "Database connections open beyond pool_size"
+)
+pool_size = registry.gauge("db_pool_size", "Configured database pool size")
+pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a database connection from the pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+pool_checkout_timeouts = registry.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that timed out waiting for a database connection",
+)
+
+
+class TimedQueuePool(QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # engine.dispose() recreates the pool, the gauges follow the latest one
+        pool_checked_out.set_function(self.checkedout)
+        pool_overflow.set_function(lambda: max(self.overflow(), 0))
+        pool_size.set_function(self.size)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_checkout_timeouts.inc()
+            raise
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - start)
+
+
+def register_statement_timeouts(session, read_timeout_ms, write_timeout_ms):
+    """
+    Apply statement_timeout to every transaction begun by session
+
+    Transactions outside of a request (background workers, CLI commands)
+    use the write timeout. A timeout of 0 disables the limit.
+
+    :param session: the scoped session, e.g. db.session
+    :param read_timeout_ms: limit for GET, HEAD and OPTIONS requests
+    :type read_timeout_ms: int
+    :param write_timeout_ms: limit for other requests and background work
+    :type write_timeout_ms: int
+    """
+
+    @event.listens_for(session, "after_begin")
+    def set_statement_timeout(session, transaction, connection):
+        if connection.dialect.name != "postgresql":
+            return
+        if has_request_context() and request.method in READ_METHODS:
+            timeout_ms = read_timeout_ms
+        else:
+            timeout_ms = write_timeout_ms
+        if not timeout_ms:
+            return
+        # SET does not accept bind parameters, the value is always an int
+        connection.execute(
+            "SET LOCAL statement_timeout = {timeout_ms:d}".format(
+                timeout_ms=int(timeout_ms)
+            )
+        )
+
+    return set_statement_timeout
@@ -1,26 +1,122 @@
 import os
+import threading
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from ..resources.token import Token
+from .metrics import registry
+from .request_timing import record_outbound
 
-FIREBASE_SIGN_IN_URL = (
-    "https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword"
+# base URLs may be pointed at a stub server (e.g. the Firebase Auth emulator
+# or a test double) through the environment
+FIREBASE_AUTH_BASE_URL = os.getenv(
+    "FIREBASE_AUTH_BASE_URL", "https://identitytoolkit.googleapis.com/v1"
 )
-FIREBASE_REFRESH_TOKEN_URL = "https://securetoken.googleapis.com/v1/token"
-FIREBASE_OAUTH_SIGN_IN_URL = (
-    "https://identitytoolkit.googleapis.com/v1/accounts:signInWithIdp"
+FIREBASE_TOKEN_BASE_URL = os.getenv(
+    "FIREBASE_TOKEN_BASE_URL", "https://securetoken.googleapis.com/v1"
 )
 
+FIREBASE_HTTP_POOL_SIZE = int(os.getenv("FIREBASE_HTTP_POOL_SIZE", 10))
+FIREBASE_HTTP_MAX_RETRIES = int(os.getenv("FIREBASE_HTTP_MAX_RETRIES", 2))
+FIREBASE_HTTP_CONNECT_TIMEOUT = float(os.getenv("FIREBASE_HTTP_CONNECT_TIMEOUT", 3.05))
+FIREBASE_HTTP_READ_TIMEOUT = float(os.getenv("FIREBASE_HTTP_READ_TIMEOUT", 10))
+
+RETRY_STATUSES = (500, 502, 503, 504)
+
+request_latency = registry.histogram(
+    "firebase_rest_request_seconds",
+    "Latency of Firebase Auth REST API calls",
+    ["endpoint"],
+)
+request_results = registry.counter(
+    "firebase_rest_requests_total",
+    "Firebase Auth REST API calls by HTTP status, or error if no response arrived",
+    ["endpoint", "status"],
+)
+
+
+def create_session(
+    pool_size=FIREBASE_HTTP_POOL_SIZE, max_retries=FIREBASE_HTTP_MAX_RETRIES
+):
+    """
+    Create a requests.Session with a keep-alive connection pool
+
+    Connection errors and 5xx responses are retried with backoff. POST is
+    included because sign-in and token refresh have no side effects, so
+    repeating them is safe.
+
+    :param pool_size: connections kept open per host
+    :type pool_size: int
+    :param max_retries: retries after the first attempt
+    :type max_retries: int
+    :rtype: requests.Session
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=0.2,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "POST"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session():
+    """
+    Return the session shared by every FirebaseRestClient in this process
+    """
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = create_session()
+    return _shared_session
+
 
 class FirebaseRestClient:
-    def __init__(self, logger):
+    def __init__(
+        self,
+        logger,
+        session=None,
+        auth_base_url=None,
+        token_base_url=None,
+        timeout=None,
+    ):
         """
         Create an instance of FirebaseRestClient
 
         :param logger: the application's logger instance
         :type logger: logger
+        :param session: HTTP session, defaults to the process-wide pooled session
+        :type session: requests.Session
+        :param auth_base_url: identitytoolkit base URL, defaults to FIREBASE_AUTH_BASE_URL
+        :type auth_base_url: str
+        :param token_base_url: securetoken base URL, defaults to FIREBASE_TOKEN_BASE_URL
+        :type token_base_url: str
+        :param timeout: (connect, read) timeouts in seconds
+        :type timeout: tuple
         """
         self.logger = logger
+        self.session = session if session is not None else get_shared_session()
+        self.auth_base_url = auth_base_url or FIREBASE_AUTH_BASE_URL
+        self.token_base_url = token_base_url or FIREBASE_TOKEN_BASE_URL
+        self.timeout = timeout or (
+            FIREBASE_HTTP_CONNECT_TIMEOUT,
+            FIREBASE_HTTP_READ_TIMEOUT,
+        )
 
     # docs: https://firebase.google.com/docs/reference/rest/auth/#section-sign-in-email-password
     def sign_in_with_password(self, email, password):
@@ -40,27 +136,16 @@ class FirebaseRestClient:
 
         # IMPORTANT: must convert data to string as otherwise the payload will get URL-encoded
         # e.g. "@" in the email address will get converted to "%40" which is incorrect
-        response = requests.post(
-            "{base_url}?key={api_key}".format(
-                base_url=FIREBASE_SIGN_IN_URL, api_key=os.getenv("FIREBASE_WEB_API_KEY")
+        response_json = self.__post(
+            "sign_in_with_password",
+            "{base_url}/accounts:signInWithPassword".format(
+                base_url=self.auth_base_url
             ),
-            headers=headers,
-            data=str(data),
+            headers,
+            str(data),
+            "Failed to sign-in via Firebase REST API",
         )
 
-        response_json = response.json()
-
-        if response.status_code != 200:
-            error_message = [
-                "Failed to sign-in via Firebase REST API, status code =",
-                str(response.status_code),
-                "error message =",
-                response_json["error"]["message"],
-            ]
-            self.logger.error(" ".join(error_message))
-
-            raise Exception("Failed to sign-in via Firebase REST API")
-
         return Token(response_json["idToken"], response_json["refreshToken"])
 
     # docs: https://firebase.google.com/docs/reference/rest/auth/#section-sign-in-with-oauth-credential
@@ -83,27 +168,14 @@ class FirebaseRestClient:
             "returnSecureToken": "true",
         }
 
-        response = requests.post(
-            "{base_url}?key={api_key}".format(
-                base_url=FIREBASE_OAUTH_SIGN_IN_URL,
-                api_key=os.getenv("FIREBASE_WEB_API_KEY"),
-            ),
-            headers=headers,
-            data=str(data),
+        response_json = self.__post(
+            "sign_in_with_google",
+            "{base_url}/accounts:signInWithIdp".format(base_url=self.auth_base_url),
+            headers,
+            str(data),
+            "Failed to sign-in via Firebase REST API with OAuth",
         )
 
-        response_json = response.json()
-
-        if response.status_code != 200:
-            error_message = [
-                "Failed to sign-in via Firebase REST API with OAuth, status code =",
-                str(response.status_code),
-                "error message =",
-                response_json["error"]["message"],
-            ]
-            self.logger.error(" ".join(error_message))
-
-            raise Exception("Failed to sign-in via Firebase REST API with OAuth")
         return response_json
 
     # docs: https://firebase.google.com/docs/reference/rest/auth/#section-refresh-token
@@ -122,26 +194,62 @@ class FirebaseRestClient:
             refresh_token=ref_token
         )
 
-        response = requests.post(
-            "{base_url}?key={api_key}".format(
-                base_url=FIREBASE_REFRESH_TOKEN_URL,
-                api_key=os.getenv("FIREBASE_WEB_API_KEY"),
-            ),
-            headers=headers,
-            data=data,
+        response_json = self.__post(
+            "refresh_token",
+            "{base_url}/token".format(base_url=self.token_base_url),
+            headers,
+            data,
+            "Failed to refresh token via Firebase REST API",
         )
 
-        response_json = response.json()
+        return Token(response_json["id_token"], response_json["refresh_token"])
+
+    def __post(self, endpoint, url, headers, data, failure_message):
+        """
+        POST to a Firebase REST endpoint, recording its latency
+
+        :return: the decoded JSON body of the response
+        :rtype: dict
+        :raises Exception: with failure_message if no 200 response is received
+        """
+        start = time.perf_counter()
+        try:
+            response = self.session.post(
+                url,
+                params={"key": os.getenv("FIREBASE_WEB_API_KEY")},
+                headers=headers,
+                data=data,
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            request_results.labels(endpoint=endpoint, status="error").inc()
+            self.logger.error(
+                "{failure_message}, reason = {reason}".format(
+                    failure_message=failure_message, reason=str(e)
+                )
+            )
+            raise Exception(failure_message)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_latency.labels(endpoint=endpoint).observe(elapsed)
+            record_outbound("firebase", elapsed)
+
+        request_results.labels(endpoint=endpoint, status=response.status_code).inc()
+
+        try:
+            response_json = response.json()
+        except ValueError:
+            response_json = {}
 
         if response.status_code != 200:
             error_message = [
-                "Failed to refresh token via Firebase REST API, status code =",
+                failure_message + ", status code =",
                 str(response.status_code),
                 "error message =",
-                response_json["error"]["message"],
+                str(response_json.get("error", {}).get("message", response.text)),
             ]
             self.logger.error(" ".join(error_message))
 
-            raise Exception("Failed to refresh token via Firebase REST API")
+            raise Exception(failure_message)
 
-        return Token(response_json["id_token"], response_json["refresh_token"])
+        return response_json
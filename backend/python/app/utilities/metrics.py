@@ -0,0 +1,258 @@
+"""
+Minimal in-process metrics registry
+
+Counters, gauges and histograms are registered by name on the module level
+`registry` and may be split by labels, e.g.
+
+    requests = registry.counter("http_requests_total", "Requests served", ["route"])
+    requests.labels(route="/feeds").inc()
+
+Values live in the memory of the current process only; registry.render()
+formats them in the Prometheus text exposition format.
+"""
+
+import bisect
+import threading
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _CounterValue:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeValue:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+        self._function = None
+
+    def set(self, value):
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set_function(self, function):
+        """
+        Compute the gauge lazily from function whenever it is read
+        """
+        self._function = function
+
+    @property
+    def value(self):
+        if self._function is not None:
+            return self._function()
+        return self._value
+
+
+class _HistogramValue:
+    def __init__(self, buckets):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if index < len(self.buckets):
+                self.bucket_counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def cumulative_counts(self):
+        """
+        Return the number of observations <= each bucket bound
+        """
+        with self._lock:
+            counts = list(self.bucket_counts)
+        total = 0
+        cumulative = []
+        for count in counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+
+class Metric:
+    """
+    A named metric, optionally split into children by label values
+    """
+
+    def __init__(self, kind, name, documentation, labelnames, value_factory):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._value_factory = value_factory
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                "Metric {name} expects labels {labelnames}".format(
+                    name=self.name, labelnames=self.labelnames
+                )
+            )
+        key = tuple(str(labels[labelname]) for labelname in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._value_factory())
+        return child
+
+    def samples(self):
+        """
+        Return a list of (label dict, value object) pairs
+        """
+        with self._lock:
+            children = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in children]
+
+    def __getattr__(self, attr):
+        # unlabelled metrics proxy inc/set/observe/value to their single child
+        if attr.startswith("_") or self.__dict__.get("labelnames", ()):
+            raise AttributeError(attr)
+        return getattr(self.labels(), attr)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _register(self, kind, name, documentation, labelnames, value_factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = Metric(kind, name, documentation, labelnames, value_factory)
+                self._metrics[name] = metric
+            elif metric.kind != kind or metric.labelnames != tuple(labelnames):
+                raise ValueError(
+                    "Metric {name} is already registered differently".format(name=name)
+                )
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register("counter", name, documentation, labelnames, _CounterValue)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register("gauge", name, documentation, labelnames, _GaugeValue)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        buckets = tuple(sorted(buckets))
+        return self._register(
+            "histogram",
+            name,
+            documentation,
+            labelnames,
+            lambda: _HistogramValue(buckets),
+        )
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def collect(self):
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format
+
+        :rtype: str
+        """
+        lines = []
+        for metric in self.collect():
+            lines.append(
+                "# HELP {name} {documentation}".format(
+                    name=metric.name,
+                    documentation=metric.documentation.replace("\\", "\\\\").replace(
+                        "\n", "\\n"
+                    ),
+                )
+            )
+            lines.append(
+                "# TYPE {name} {kind}".format(name=metric.name, kind=metric.kind)
+            )
+            for labels, value in metric.samples():
+                if metric.kind != "histogram":
+                    lines.append(_format_sample(metric.name, labels, value.value))
+                    continue
+                for bound, count in zip(value.buckets, value.cumulative_counts()):
+                    lines.append(
+                        _format_sample(
+                            metric.name + "_bucket",
+                            dict(labels, le=_format_number(bound)),
+                            count,
+                        )
+                    )
+                lines.append(
+                    _format_sample(
+                        metric.name + "_bucket", dict(labels, le="+Inf"), value.count
+                    )
+                )
+                lines.append(_format_sample(metric.name + "_sum", labels, value.sum))
+                lines.append(
+                    _format_sample(metric.name + "_count", labels, value.count)
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _format_number(value):
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        return str(value)
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _format_sample(name, labels, value):
+    if not labels:
+        return "{name} {value}".format(name=name, value=_format_number(value))
+    label_pairs = ",".join(
+        '{label}="{value}"'.format(
+            label=label,
+            value=str(label_value)
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n"),
+        )
+        for label, label_value in labels.items()
+    )
+    return "{name}{{{labels}}} {value}".format(
+        name=name, labels=label_pairs, value=_format_number(value)
+    )
+
+
+registry = MetricsRegistry()
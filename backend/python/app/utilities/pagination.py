@@ -0,0 +1,90 @@
+"""
+Helpers for keyset (cursor) pagination
+
+A cursor is an opaque, URL-safe token that encodes the sort key of the last
+row of a page. The next page is fetched with a WHERE clause on that key
+instead of an OFFSET, so the cost of a page does not grow with its depth.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+CURSOR_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+class InvalidCursorError(ValueError):
+    """
+    Raised when a client supplies a cursor that cannot be decoded
+    """
+
+    pass
+
+
+def encode_cursor(created_at, id):
+    """
+    Encode a (created_at, id) sort key into an opaque cursor
+
+    :param created_at: creation timestamp of the last row on the page
+    :type created_at: datetime
+    :param id: id of the last row on the page
+    :type id: int
+    :return: URL-safe cursor string
+    :rtype: str
+    """
+    payload = json.dumps(
+        {"created_at": created_at.strftime(CURSOR_DATETIME_FORMAT), "id": id},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor
+
+    :param cursor: cursor string supplied by the client
+    :type cursor: str
+    :return: the (created_at, id) sort key
+    :rtype: tuple(datetime, int)
+    :raises InvalidCursorError: if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        created_at = datetime.strptime(payload["created_at"], CURSOR_DATETIME_FORMAT)
+        id = payload["id"]
+    except Exception:
+        raise InvalidCursorError("Invalid cursor")
+
+    if type(id) is not int:
+        raise InvalidCursorError("Invalid cursor")
+
+    return created_at, id
+
+
+def parse_page_size(limit, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Validate a client supplied page size
+
+    :param limit: raw limit query parameter, may be None
+    :type limit: str
+    :return: page size clamped to [1, maximum]
+    :rtype: int
+    :raises ValueError: if limit is not a positive integer
+    """
+    if limit is None:
+        return default
+
+    try:
+        page_size = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be a positive integer")
+
+    if page_size < 1:
+        raise ValueError("limit must be a positive integer")
+
+    return min(page_size, maximum)
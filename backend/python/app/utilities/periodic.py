@@ -0,0 +1,84 @@
+import atexit
+import threading
+
+
+class PeriodicTask:
+    """
+    Run a function on a daemon thread every `interval` seconds
+
+    The function runs inside an application context so it can use the
+    database session. stop() runs the function one final time, unless
+    run_on_stop is False, and is also registered with atexit so buffered
+    work is not lost on shutdown.
+    """
+
+    def __init__(self, app, logger, name, interval, function, run_on_stop=True):
+        """
+        Create an instance of PeriodicTask
+
+        :param app: the Flask application to push a context for
+        :type app: Flask
+        :param logger: application's logger instance
+        :type logger: logger
+        :param name: name of the task, used for the thread name and logging
+        :type name: str
+        :param interval: seconds between runs
+        :type interval: float
+        :param function: zero-argument callable to run
+        :type function: callable
+        :param run_on_stop: run the function once more when stopped
+        :type run_on_stop: bool
+        """
+        self.app = app
+        self.logger = logger
+        self.name = name
+        self.interval = interval
+        self.function = function
+        self.run_on_stop = run_on_stop
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def stop(self, run_final=None):
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._stopped.set()
+            thread.join(timeout=self.interval + 5)
+            atexit.unregister(self.stop)
+        if run_final is None:
+            run_final = self.run_on_stop
+        if run_final:
+            self.run_once()
+
+    def run_once(self):
+        try:
+            with self.app.app_context():
+                self.function()
+        except Exception as e:
+            reason = getattr(e, "message", None)
+            self.logger.error(
+                "Periodic task {name} failed. Reason = {reason}".format(
+                    name=self.name, reason=(reason if reason else str(e))
+                )
+            )
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.run_once()
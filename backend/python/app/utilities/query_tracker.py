@@ -0,0 +1,151 @@
+"""
+Detection of repeated SQL statements (N+1 queries)
+
+Statements are grouped by their shape: literals, bind parameters and IN
+lists are replaced by placeholders, so
+
+    SELECT * FROM users WHERE users.id = %(id_1)s    -- executed 20 times
+
+counts as one statement executed 20 times, which usually means a query is
+run once per row of an earlier result instead of once for all of them.
+
+QueryTracker collects the statements executed by the current thread while it
+is active, either around a request (middlewares/query_detector.py) or around
+any block of code:
+
+    with track_queries() as tracker:
+        client.get("/feeds")
+    assert tracker.count <= 3, tracker.report()
+"""
+
+import re
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# statements run by the app's own plumbing, not by the code under test
+IGNORED_PREFIXES = (
+    "SET ",
+    "SAVEPOINT ",
+    "RELEASE SAVEPOINT ",
+    "ROLLBACK TO SAVEPOINT ",
+)
+
+_string_literal = re.compile(r"'(?:[^']|'')*'")
+_bind_parameter = re.compile(r"%\([^)]+\)s|%s|\?|(?<![:\w]):\w+")
+_number = re.compile(r"\b\d+(?:\.\d+)?\b")
+_placeholder_list = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_values_list = re.compile(r"(?:VALUES|values)\s*\(\?\)(?:\s*,\s*\(\?\))*")
+_whitespace = re.compile(r"\s+")
+
+
+class RepeatedQueryError(Exception):
+    """
+    Raised in raise mode when a statement shape repeats too often
+    """
+
+
+def normalize_sql(statement):
+    """
+    Reduce a statement to its shape, without literals or parameter values
+
+    :rtype: str
+    """
+    statement = _string_literal.sub("?", statement)
+    statement = _bind_parameter.sub("?", statement)
+    statement = _number.sub("?", statement)
+    # IN (?, ?, ?) and multi-row VALUES have the same shape whatever their length
+    statement = _placeholder_list.sub("(?)", statement)
+    statement = _values_list.sub("VALUES (?)", statement)
+    return _whitespace.sub(" ", statement).strip()
+
+
+class QueryTracker:
+    def __init__(self):
+        self.shapes = Counter()
+        self.examples = OrderedDict()
+
+    @property
+    def count(self):
+        return sum(self.shapes.values())
+
+    def add(self, statement):
+        if statement.lstrip().upper().startswith(IGNORED_PREFIXES):
+            return
+        shape = normalize_sql(statement)
+        self.shapes[shape] += 1
+        self.examples.setdefault(shape, statement)
+
+    def repeated(self, threshold):
+        """
+        Return (shape, count) for each shape executed more than threshold times
+        """
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count > threshold
+        ]
+
+    def report(self):
+        lines = ["{count} statements:".format(count=self.count)]
+        for shape, count in self.shapes.most_common():
+            lines.append("  {count:>4} x {shape}".format(count=count, shape=shape))
+        return "\n".join(lines)
+
+
+_local = threading.local()
+_listener_lock = threading.Lock()
+_listener_registered = False
+
+
+def _active_trackers():
+    trackers = getattr(_local, "trackers", None)
+    if trackers is None:
+        trackers = _local.trackers = []
+    return trackers
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    for tracker in getattr(_local, "trackers", ()):
+        tracker.add(statement)
+
+
+def register_listener():
+    """
+    Listen to the statements of every engine, once per process
+    """
+    global _listener_registered
+    with _listener_lock:
+        if not _listener_registered:
+            event.listen(Engine, "before_cursor_execute", _record_statement)
+            _listener_registered = True
+
+
+def start_tracking():
+    register_listener()
+    tracker = QueryTracker()
+    _active_trackers().append(tracker)
+    return tracker
+
+
+def stop_tracking(tracker):
+    trackers = _active_trackers()
+    if tracker in trackers:
+        trackers.remove(tracker)
+
+
+@contextmanager
+def track_queries():
+    """
+    Collect the statements executed by this thread inside the block
+
+    :rtype: QueryTracker
+    """
+    tracker = start_tracking()
+    try:
+        yield tracker
+    finally:
+        stop_tracking(tracker)
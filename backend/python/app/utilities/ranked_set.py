@@ -0,0 +1,220 @@
+"""
+Scores kept in rank order, for leaderboards
+
+RankedSet maps members to scores and orders them by score, highest first,
+with ties broken by member. It is backed by an indexable skip list (a skip
+list whose links also store how many elements they skip), so updating a
+score, finding a member's rank and finding the element at a given rank all
+take O(log n) expected time. Reading the top n elements after an offset is
+O(log n + n).
+
+RankedSet is not thread-safe; callers serialize access with their own lock.
+"""
+
+import random
+
+
+class _Last:
+    """
+    Key of the tail sentinel, greater than every other key
+    """
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+
+class _Node:
+    __slots__ = ("key", "value", "next", "width")
+
+    def __init__(self, key, value, levels):
+        self.key = key
+        self.value = value
+        self.next = [None] * levels
+        # width[level] is the number of bottom-level links next[level] skips
+        self.width = [1] * levels
+
+
+class IndexableSkipList:
+    """
+    Sorted sequence of unique keys with O(log n) insert, remove, rank and select
+    """
+
+    def __init__(self, max_levels=24, rng=None):
+        """
+        Create an instance of IndexableSkipList
+
+        :param max_levels: levels of links, enough for about 2 ** max_levels keys
+        :type max_levels: int
+        :param rng: random.Random used to pick node heights, overridable for tests
+        """
+        self.max_levels = max_levels
+        self._random = rng if rng is not None else random.Random()
+        self._tail = _Node(_Last(), None, 0)
+        self._head = _Node(None, None, max_levels)
+        self._head.next = [self._tail] * max_levels
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _random_level(self):
+        level = 1
+        while level < self.max_levels and self._random.random() < 0.5:
+            level += 1
+        return level
+
+    def _find_chain(self, key):
+        """
+        Return the last node before key on every level, and the number of
+        elements each of them is preceded by
+        """
+        chain = [None] * self.max_levels
+        positions = [0] * self.max_levels
+        node = self._head
+        position = 0
+        for level in reversed(range(self.max_levels)):
+            while node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+            positions[level] = position
+        return chain, positions
+
+    def insert(self, key, value=None):
+        """
+        Insert key, which must not be present yet
+        """
+        chain, positions = self._find_chain(key)
+        levels = self._random_level()
+        node = _Node(key, value, levels)
+        # the new node is preceded by positions[0] elements
+        position = positions[0]
+        for level in range(levels):
+            previous = chain[level]
+            node.next[level] = previous.next[level]
+            previous.next[level] = node
+            skipped = position - positions[level]
+            node.width[level] = previous.width[level] - skipped
+            previous.width[level] = skipped + 1
+        for level in range(levels, self.max_levels):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key):
+        """
+        Remove key
+
+        :raises KeyError: if key is not present
+        """
+        chain, _ = self._find_chain(key)
+        node = chain[0].next[0]
+        if node is self._tail or node.key != key:
+            raise KeyError(key)
+        for level in range(len(node.next)):
+            previous = chain[level]
+            previous.width[level] += node.width[level] - 1
+            previous.next[level] = node.next[level]
+        for level in range(len(node.next), self.max_levels):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def count_less(self, key):
+        """
+        Return the number of keys less than key, whether or not key is present
+        """
+        node = self._head
+        count = 0
+        for level in reversed(range(self.max_levels)):
+            while node.next[level].key < key:
+                count += node.width[level]
+                node = node.next[level]
+        return count
+
+    def slice(self, start, count):
+        """
+        Return up to count (key, value) pairs starting at index start
+        """
+        if start < 0 or start >= self._size or count <= 0:
+            return []
+        node = self._head
+        remaining = start + 1
+        for level in reversed(range(self.max_levels)):
+            while node.width[level] <= remaining and node.next[level] is not self._tail:
+                remaining -= node.width[level]
+                node = node.next[level]
+        items = []
+        while node is not self._tail and len(items) < count:
+            items.append((node.key, node.value))
+            node = node.next[0]
+        return items
+
+
+class RankedSet:
+    def __init__(self, max_levels=24, rng=None):
+        self._scores = {}
+        self._keys = IndexableSkipList(max_levels=max_levels, rng=rng)
+
+    def __len__(self):
+        return len(self._scores)
+
+    def __contains__(self, member):
+        return member in self._scores
+
+    def score(self, member):
+        """
+        Return the score of member, or None if it is not in the set
+        """
+        return self._scores.get(member)
+
+    def set(self, member, score):
+        current = self._scores.get(member)
+        if current == score and member in self._scores:
+            return
+        if member in self._scores:
+            self._keys.remove((-current, member))
+        self._keys.insert((-score, member))
+        self._scores[member] = score
+
+    def increment(self, member, amount):
+        """
+        Add amount to the score of member, which starts at 0
+
+        :return: the new score
+        """
+        score = self._scores.get(member, 0) + amount
+        self.set(member, score)
+        return score
+
+    def remove(self, member):
+        score = self._scores.pop(member)
+        self._keys.remove((-score, member))
+
+    def rank(self, member):
+        """
+        Return the 1-based rank of member, members with equal scores share a rank
+
+        :raises KeyError: if member is not in the set
+        """
+        score = self._scores[member]
+        # (-score,) sorts before every (-score, member) key
+        return self._keys.count_less((-score,)) + 1
+
+    def top(self, count, offset=0):
+        """
+        Return up to count (member, score, rank) tuples, highest score first
+        """
+        entries = []
+        rank = None
+        previous_score = None
+        for index, (key, _) in enumerate(self._keys.slice(offset, count)):
+            score = -key[0]
+            if rank is None:
+                rank = self._keys.count_less((key[0],)) + 1
+            elif score != previous_score:
+                rank = offset + index + 1
+            entries.append((key[1], score, rank))
+            previous_score = score
+        return entries
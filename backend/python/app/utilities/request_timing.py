@@ -0,0 +1,102 @@
+"""
+Per-request breakdown of where time is spent
+
+The instrumentation middleware stores a RequestTiming on flask.g for every
+request. SQL statements and calls to external services made while handling
+the request add their time to it, and the totals are reported in the
+response's Server-Timing header and in per-route metrics.
+
+Calls to an external service are timed with the outbound context manager:
+
+    with outbound("cohere"):
+        response = requests.post(...)
+
+Outside of a request (background workers, CLI commands) only the
+outbound_http_seconds histogram is updated.
+"""
+
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from flask import g, has_request_context
+
+from .metrics import registry
+
+outbound_http_seconds = registry.histogram(
+    "outbound_http_seconds",
+    "Latency of calls to external services (firebase, cohere, gmail)",
+    ["service"],
+)
+
+
+class RequestTiming:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.start = clock()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.outbound_calls = OrderedDict()
+        self.outbound_seconds = OrderedDict()
+
+    def add_sql(self, seconds):
+        self.sql_count += 1
+        self.sql_seconds += seconds
+
+    def add_outbound(self, service, seconds):
+        self.outbound_calls[service] = self.outbound_calls.get(service, 0) + 1
+        self.outbound_seconds[service] = self.outbound_seconds.get(service, 0) + seconds
+
+    def elapsed(self):
+        return self.clock() - self.start
+
+    def server_timing(self, total=None):
+        """
+        Format the timings as a Server-Timing header value, in milliseconds
+
+        :rtype: str
+        """
+        total = self.elapsed() if total is None else total
+        metrics = [
+            'db;dur={ms:.1f};desc="{count} queries"'.format(
+                ms=self.sql_seconds * 1000, count=self.sql_count
+            )
+        ]
+        for service, seconds in self.outbound_seconds.items():
+            metrics.append(
+                '{service};dur={ms:.1f};desc="{count} calls"'.format(
+                    service=service,
+                    ms=seconds * 1000,
+                    count=self.outbound_calls[service],
+                )
+            )
+        metrics.append("total;dur={ms:.1f}".format(ms=total * 1000))
+        return ", ".join(metrics)
+
+
+def current_timing():
+    """
+    Return the RequestTiming of the request being handled, or None
+    """
+    if has_request_context():
+        return g.get("request_timing")
+    return None
+
+
+def record_outbound(service, seconds):
+    outbound_http_seconds.labels(service=service).observe(seconds)
+    timing = current_timing()
+    if timing is not None:
+        timing.add_outbound(service, seconds)
+
+
+@contextmanager
+def outbound(service):
+    """
+    Time a call to an external service, whether or not it succeeds
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_outbound(service, time.perf_counter() - start)
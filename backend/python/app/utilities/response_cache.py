@@ -0,0 +1,203 @@
+"""
+Content-addressed cache of AI generated responses
+
+Responses are keyed by a SHA-256 hash of everything that determines them
+(model, preamble, parameters and the normalized user message), so repeated
+or near-identical submissions are answered without calling the AI API.
+
+Lookups go to a size-bounded in-memory LRU first and then, if configured, to
+a persistent store shared by every process (see DatabaseResponseStore).
+Entries expire after a TTL in both tiers.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from .metrics import registry
+
+cache_lookups = registry.counter(
+    "ai_response_cache_lookups_total",
+    "AI response cache lookups by result (memory_hit, store_hit, miss or bypass)",
+    ["result"],
+)
+cache_hit_ratio = registry.gauge(
+    "ai_response_cache_hit_ratio",
+    "Share of AI response cache lookups answered from either tier",
+)
+
+_whitespace = re.compile(r"\s+")
+
+
+def normalize_message(message):
+    """
+    Normalize a message so that differences in case and spacing share a key
+    """
+    return _whitespace.sub(" ", (message or "").strip()).casefold()
+
+
+def cache_key(*parts):
+    """
+    Hash the parts of a request into a cache key
+
+    :param parts: JSON serializable values, e.g. model, preamble, message
+    :rtype: str
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class DatabaseResponseStore:
+    """
+    Persistent tier backed by a table with key, response and expires_at columns
+
+    Statements run on their own connection so that caching never commits or
+    rolls back the caller's session.
+    """
+
+    def __init__(self, db, model):
+        """
+        Create an instance of DatabaseResponseStore
+
+        :param db: the application's SQLAlchemy instance
+        :param model: model mapped to the cache table
+        """
+        self.db = db
+        self.table = model.__table__
+
+    def get(self, key):
+        with self.db.engine.connect() as connection:
+            return connection.execute(
+                self.db.select([self.table.c.response]).where(
+                    self.db.and_(
+                        self.table.c.key == key,
+                        self.table.c.expires_at > datetime.utcnow(),
+                    )
+                )
+            ).scalar()
+
+    def put(self, key, response, ttl):
+        from sqlalchemy.dialects.postgresql import insert
+
+        now = datetime.utcnow()
+        values = {
+            "response": response,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=ttl),
+        }
+        statement = insert(self.table).values(key=key, **values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[self.table.c.key], set_=values
+        )
+        with self.db.engine.begin() as connection:
+            connection.execute(statement)
+            # writes only follow AI API calls, so dropping expired rows here is cheap
+            connection.execute(
+                self.table.delete().where(self.table.c.expires_at <= now)
+            )
+
+
+class AIResponseCache:
+    def __init__(self, max_size=512, ttl=86400, store=None, clock=time.time):
+        """
+        Create an instance of AIResponseCache
+
+        :param max_size: maximum number of responses kept in memory
+        :type max_size: int
+        :param ttl: seconds a response may be reused
+        :type ttl: float
+        :param store: optional persistent tier with get(key) and put(key, response, ttl)
+        :param clock: returns the current unix time, overridable for tests
+        :type clock: callable
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.store = store
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        cache_hit_ratio.set_function(self.hit_ratio)
+
+    def get(self, key, logger=None):
+        """
+        Return the cached response for key, or None
+
+        Failures of the persistent tier are logged and treated as misses.
+
+        :rtype: str
+        """
+        now = self.clock()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                cache_lookups.labels(result="memory_hit").inc()
+                return item[1]
+            if item is not None:
+                del self._entries[key]
+
+        response = None
+        if self.store is not None:
+            try:
+                response = self.store.get(key)
+            except Exception as e:
+                if logger is not None:
+                    logger.warning(
+                        "AI response cache store lookup failed. Reason = {reason}".format(
+                            reason=str(e)
+                        )
+                    )
+
+        with self._lock:
+            if response is None:
+                self.misses += 1
+                cache_lookups.labels(result="miss").inc()
+                return None
+            self.hits += 1
+            cache_lookups.labels(result="store_hit").inc()
+        self._remember(key, response)
+        return response
+
+    def put(self, key, response, logger=None):
+        """
+        Cache response under key in both tiers
+        """
+        self._remember(key, response)
+        if self.store is not None:
+            try:
+                self.store.put(key, response, self.ttl)
+            except Exception as e:
+                if logger is not None:
+                    logger.warning(
+                        "AI response cache store write failed. Reason = {reason}".format(
+                            reason=str(e)
+                        )
+                    )
+
+    def record_bypass(self):
+        cache_lookups.labels(result="bypass").inc()
+
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, key, response):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self.clock() + self.ttl, response)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
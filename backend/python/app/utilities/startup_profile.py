@@ -0,0 +1,324 @@
+"""
+Startup profiling of create_app
+
+create_app records the wall time of each of its phases (Firebase Admin
+initialisation, models.init_app, the import and registration of every
+blueprint, ...) in a StartupTimer kept in app.extensions["startup_timer"],
+and exports them as the app_startup_phase_seconds gauge.
+
+The `flask startup-profile` command measures a cold start: it creates the
+app in a fresh interpreter run with `python -X importtime`, then reports the
+phase timings, the slowest module imports and, with --warm, the time to
+construct each shared service. For example, from backend/python:
+
+    flask startup-profile --top 15
+    flask startup-profile --json --runs 5 --history startup_history.jsonl
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+import click
+
+from .metrics import registry
+
+startup_phase_seconds = registry.gauge(
+    "app_startup_phase_seconds",
+    "Wall time of each phase of create_app in this process",
+    ["phase"],
+)
+
+# runs in the child interpreter; `import app` is timed too
+_CHILD_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import app
+from app.utilities.startup_profile import profile_child
+profile_child(start, *sys.argv[1:])
+"""
+
+
+class StartupTimer:
+    """
+    Records the wall time of nested, named phases in the order they start
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started = clock()
+        self.finished = None
+        self.records = []
+        self._stack = []
+
+    @contextmanager
+    def phase(self, name):
+        path = "/".join(self._stack + [name])
+        record = {"name": name, "path": path, "depth": len(self._stack)}
+        self.records.append(record)
+        self._stack.append(name)
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            record["seconds"] = self.clock() - start
+            startup_phase_seconds.labels(phase=path).set(record["seconds"])
+
+    def finish(self):
+        self.finished = self.clock()
+
+    @property
+    def total(self):
+        return (self.finished or self.clock()) - self.started
+
+    def as_dict(self):
+        return {"total": self.total, "phases": self.records}
+
+
+def parse_importtime(output):
+    """
+    Parse the stderr of `python -X importtime` into one entry per module
+
+    :param output: lines such as "import time:       512 |       2048 |   flask"
+    :type output: str
+    :return: dicts with module, self and cumulative seconds and nesting depth
+    :rtype: list
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header row
+        name = fields[2].rstrip()
+        modules.append(
+            {
+                "module": name.strip(),
+                "self": int(fields[0]) / 1e6,
+                "cumulative": int(fields[1]) / 1e6,
+                # the name is indented by two spaces per level of nesting
+                "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            }
+        )
+    return modules
+
+
+def summarize_imports(modules, top):
+    """
+    Return the top modules by cumulative import time and per package totals
+    """
+    slowest = sorted(modules, key=lambda m: m["cumulative"], reverse=True)[:top]
+    packages = defaultdict(float)
+    for module in modules:
+        packages[module["module"].split(".")[0]] += module["self"]
+    by_package = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "total": sum(m["cumulative"] for m in modules if m["depth"] == 0),
+        "count": len(modules),
+        "slowest": slowest,
+        "packages": [{"package": p, "self": s} for p, s in by_package[:top]],
+    }
+
+
+def profile_child(start, config_name, warm, report_path):
+    """
+    Create the app and write its startup timings to report_path as JSON
+
+    Called in the interpreter started by run_profile, after `import app`.
+    """
+    from .. import create_app
+
+    import_seconds = time.perf_counter() - start
+    app = create_app(config_name)
+    timer = app.extensions["startup_timer"]
+
+    services = {}
+    if warm == "1":
+        from ..services.container import services as container
+
+        with app.app_context():
+            for name in container.names():
+                container.get(name)
+        services = dict(container.timings)
+
+    with open(report_path, "w") as f:
+        json.dump(
+            {
+                "import_app": import_seconds,
+                "create_app": timer.as_dict(),
+                "services": services,
+                "total": time.perf_counter() - start,
+            },
+            f,
+        )
+
+
+def run_profile(config_name, warm=False, top=20, cwd=None):
+    """
+    Profile a cold start of the app in a new interpreter
+
+    :param config_name: configuration passed to create_app
+    :type config_name: str
+    :param warm: also construct every shared service
+    :type warm: bool
+    :param top: number of modules and packages to report
+    :type top: int
+    :rtype: dict
+    :raises RuntimeError: if the app fails to start
+    """
+    if cwd is None:
+        # the directory containing the app package
+        cwd = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+    report_file = tempfile.NamedTemporaryFile(suffix=".json", delete=False)
+    report_file.close()
+    try:
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                _CHILD_SCRIPT,
+                config_name,
+                "1" if warm else "0",
+                report_file.name,
+            ],
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        if result.returncode != 0:
+            errors = [
+                line
+                for line in result.stderr.splitlines()
+                if not line.startswith("import time:")
+            ]
+            raise RuntimeError(
+                "create_app failed:\n{errors}".format(errors="\n".join(errors[-20:]))
+            )
+        with open(report_file.name) as f:
+            report = json.load(f)
+    finally:
+        os.unlink(report_file.name)
+
+    report["config"] = config_name
+    report["imports"] = summarize_imports(parse_importtime(result.stderr), top)
+    return report
+
+
+def format_report(report, previous=None):
+    lines = [
+        "Cold start ({config}): {total:.3f}s, import app {import_app:.3f}s, "
+        "create_app {create_app:.3f}s".format(
+            config=report["config"],
+            total=report["total"],
+            import_app=report["import_app"],
+            create_app=report["create_app"]["total"],
+        )
+    ]
+    if previous is not None:
+        lines.append(
+            "Previous run: {total:.3f}s ({delta:+.3f}s)".format(
+                total=previous["total"], delta=report["total"] - previous["total"]
+            )
+        )
+
+    lines += ["", "create_app phases:"]
+    for phase in report["create_app"]["phases"]:
+        lines.append(
+            "  {indent}{name:<{width}} {seconds:8.3f}s".format(
+                indent="  " * phase["depth"],
+                name=phase["name"],
+                width=40 - 2 * phase["depth"],
+                seconds=phase["seconds"],
+            )
+        )
+
+    if report["services"]:
+        lines += ["", "Shared services (excluding dependencies):"]
+        for name, seconds in report["services"].items():
+            lines.append(
+                "  {name:<40} {seconds:8.3f}s".format(name=name, seconds=seconds)
+            )
+
+    imports = report["imports"]
+    lines += [
+        "",
+        "Imports: {count} modules, {total:.3f}s".format(
+            count=imports["count"], total=imports["total"]
+        ),
+        "  {:<56} {:>9} {:>9}".format("slowest modules", "self", "cumul."),
+    ]
+    for module in imports["slowest"]:
+        lines.append("  {module:<56} {self:8.3f}s {cumulative:8.3f}s".format(**module))
+    lines.append("  {:<56} {:>9}".format("packages", "self"))
+    for package in imports["packages"]:
+        lines.append("  {package:<56} {self:8.3f}s".format(**package))
+    return "\n".join(lines)
+
+
+def _read_last_entry(history_path):
+    if not os.path.exists(history_path):
+        return None
+    last = None
+    with open(history_path) as f:
+        for line in f:
+            if line.strip():
+                last = json.loads(line)
+    return last
+
+
+@click.command("startup-profile")
+@click.option(
+    "--config",
+    "config_name",
+    default=lambda: os.getenv("FLASK_CONFIG") or "development",
+    help="Configuration to create the app with (default: $FLASK_CONFIG or development).",
+)
+@click.option("--warm", is_flag=True, help="Also construct every shared service.")
+@click.option("--top", default=20, show_default=True, help="Modules to list.")
+@click.option(
+    "--runs",
+    default=1,
+    show_default=True,
+    help="Cold starts to measure, the run with the median total is reported.",
+)
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON.")
+@click.option(
+    "--history",
+    type=click.Path(dir_okay=False),
+    help="Append the report to this JSON lines file and compare with its last entry.",
+)
+def startup_profile_command(config_name, warm, top, runs, as_json, history):
+    """
+    Report the cold start cost of create_app
+    """
+    try:
+        reports = [run_profile(config_name, warm=warm, top=top) for _ in range(runs)]
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    median_total = statistics.median_low([r["total"] for r in reports])
+    report = next(r for r in reports if r["total"] == median_total)
+    report["runs"] = [r["total"] for r in reports]
+    report["recorded_at"] = datetime.utcnow().isoformat() + "Z"
+
+    previous = _read_last_entry(history) if history else None
+    if history:
+        with open(history, "a") as f:
+            f.write(json.dumps(report) + "\n")
+
+    if as_json:
+        click.echo(json.dumps(report, indent=2))
+    else:
+        click.echo(format_report(report, previous))
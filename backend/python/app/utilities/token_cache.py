@@ -0,0 +1,133 @@
+"""
+TTL + LRU cache of verified Firebase ID tokens
+
+Verifying a token with check_revoked=True, fetching the Firebase user and
+looking up the Postgres user costs two network round trips per request. Once
+a token has been verified its result is cached, keyed by a SHA-256 hash of
+the token, until the earlier of the token's own expiry (the `exp` claim) and
+AUTH_TOKEN_CACHE_TTL seconds.
+
+Revoking a user's tokens through AuthService.revoke_tokens invalidates the
+user's entries in this process. Other worker processes keep serving the
+cached result for at most AUTH_TOKEN_CACHE_TTL seconds.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .metrics import registry
+
+token_cache_lookups = registry.counter(
+    "auth_token_cache_lookups_total",
+    "Verified ID token cache lookups by result",
+    ["result"],
+)
+
+
+class VerifiedTokenCache:
+    def __init__(self, max_size=1024, ttl=300, clock=time.time):
+        """
+        Create an instance of VerifiedTokenCache
+
+        :param max_size: maximum number of tokens held, least recently used are evicted
+        :type max_size: int
+        :param ttl: maximum number of seconds an entry is trusted
+        :type ttl: float
+        :param clock: returns the current unix time, overridable for tests
+        :type clock: callable
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._keys_by_auth_id = {}
+
+    @staticmethod
+    def key_for(access_token):
+        return hashlib.sha256(access_token.encode()).hexdigest()
+
+    def get(self, access_token):
+        """
+        Return the cached verification result for access_token, or None
+
+        :rtype: dict
+        """
+        key = VerifiedTokenCache.key_for(access_token)
+        now = self.clock()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] <= now:
+                self._remove(key)
+                item = None
+
+            if item is None:
+                self.misses += 1
+                token_cache_lookups.labels(result="miss").inc()
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            token_cache_lookups.labels(result="hit").inc()
+            return item[1]
+
+    def put(self, access_token, entry):
+        """
+        Cache the verification result of access_token
+
+        :param entry: must contain the decoded "claims" and the user's "auth_id"
+        :type entry: dict
+        """
+        expires_at = self.clock() + self.ttl
+        token_expiry = entry["claims"].get("exp")
+        if token_expiry is not None:
+            expires_at = min(expires_at, token_expiry)
+        if expires_at <= self.clock():
+            return
+
+        key = VerifiedTokenCache.key_for(access_token)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expires_at, entry)
+            self._keys_by_auth_id.setdefault(entry["auth_id"], set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, auth_id):
+        """
+        Drop every cached token issued to auth_id
+        """
+        with self._lock:
+            for key in list(self._keys_by_auth_id.get(auth_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_auth_id.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        auth_id = item[1]["auth_id"]
+        keys = self._keys_by_auth_id.get(auth_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_auth_id[auth_id]
+
+
+# shared by every AuthService instance so that revocation reaches all of them
+verified_token_cache = VerifiedTokenCache(
+    max_size=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 1024)),
+    ttl=float(os.getenv("AUTH_TOKEN_CACHE_TTL", 300)),
+)
@@ -0,0 +1,160 @@
+"""
+Write-behind buffer for feed view counts
+
+Views are aggregated in a counter store and periodically flushed to the
+database in one batched UPDATE, instead of a read-modify-write transaction on
+the feed row for every view.
+
+Two stores are provided:
+* InMemoryCounterStore keeps counts in the current process (the default)
+* RedisCounterStore keeps counts in a Redis hash so that every worker process
+  shares one buffer; it accepts any client exposing the redis-py hash and
+  pipeline methods
+"""
+
+import threading
+
+from .metrics import registry
+from .periodic import PeriodicTask
+
+views_buffered = registry.gauge(
+    "feed_views_buffered", "Feed views recorded but not yet flushed to the database"
+)
+views_flushed = registry.counter(
+    "feed_views_flushed_total", "Feed views flushed to the database"
+)
+view_flush_failures = registry.counter(
+    "feed_view_flush_failures_total", "Failed attempts to flush buffered feed views"
+)
+
+
+class InMemoryCounterStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + amount
+
+    def drain(self):
+        """
+        Atomically remove and return every buffered count
+
+        :rtype: dict
+        """
+        with self._lock:
+            counts = self._counts
+            self._counts = {}
+        return counts
+
+    def get(self, key):
+        with self._lock:
+            return self._counts.get(key, 0)
+
+    def pending(self):
+        with self._lock:
+            return sum(self._counts.values())
+
+
+class RedisCounterStore:
+    def __init__(self, client, hash_key="feed:views:pending"):
+        """
+        Create an instance of RedisCounterStore
+
+        :param client: a redis-py compatible client
+        :param hash_key: name of the Redis hash holding the counts
+        :type hash_key: str
+        """
+        self.client = client
+        self.hash_key = hash_key
+
+    def incr(self, key, amount=1):
+        self.client.hincrby(self.hash_key, key, amount)
+
+    def drain(self):
+        # MULTI/EXEC so no increment lands between the read and the delete
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.hgetall(self.hash_key)
+        pipeline.delete(self.hash_key)
+        counts, _ = pipeline.execute()
+        return {int(key): int(value) for key, value in counts.items()}
+
+    def get(self, key):
+        value = self.client.hget(self.hash_key, key)
+        return int(value) if value is not None else 0
+
+    def pending(self):
+        return sum(int(value) for value in self.client.hvals(self.hash_key))
+
+
+class ViewCounterBuffer:
+    """
+    Aggregates view increments and flushes them on an interval
+    """
+
+    def __init__(self, app, logger, flush_function, store=None, flush_interval=5.0):
+        """
+        Create an instance of ViewCounterBuffer
+
+        :param app: the Flask application, flushes run in its app context
+        :type app: Flask
+        :param logger: application's logger instance
+        :type logger: logger
+        :param flush_function: persists a {feed_id: views} dict
+        :type flush_function: callable
+        :param store: counter store, defaults to an InMemoryCounterStore
+        :param flush_interval: seconds between flushes
+        :type flush_interval: float
+        """
+        self.logger = logger
+        self.flush_function = flush_function
+        self.store = store if store is not None else InMemoryCounterStore()
+        self._task = PeriodicTask(
+            app, logger, "view-counter-flush", flush_interval, self.flush
+        )
+        views_buffered.set_function(self.pending)
+
+    def record(self, feed_id, count=1):
+        """
+        Buffer count views of feed_id, starting the flush thread if needed
+        """
+        self.store.incr(feed_id, count)
+        if not self._task.running:
+            self._task.start()
+
+    def pending(self):
+        return self.store.pending()
+
+    def pending_for(self, feed_id):
+        return self.store.get(feed_id)
+
+    def flush(self):
+        """
+        Write every buffered count to the database
+
+        :return: number of views flushed
+        :rtype: int
+        """
+        counts = self.store.drain()
+        if not counts:
+            return 0
+
+        try:
+            self.flush_function(counts)
+        except Exception:
+            # put the counts back so they are retried on the next flush
+            for feed_id, count in counts.items():
+                self.store.incr(feed_id, count)
+            view_flush_failures.inc()
+            raise
+
+        flushed = sum(counts.values())
+        views_flushed.inc(flushed)
+        return flushed
+
+    def stop(self):
+        """
+        Stop the flush thread and flush whatever is still buffered
+        """
+        self._task.stop()
@@ -0,0 +1,112 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import registry
+
+queue_depth = registry.gauge(
+    "worker_pool_queue_depth",
+    "Tasks submitted to a worker pool that have not started yet",
+    ["pool"],
+)
+active_tasks = registry.gauge(
+    "worker_pool_active_tasks", "Tasks currently running in a worker pool", ["pool"]
+)
+task_results = registry.counter(
+    "worker_pool_tasks_total",
+    "Worker pool tasks by outcome (completed, failed or rejected)",
+    ["pool", "outcome"],
+)
+
+
+class WorkerPoolFullError(Exception):
+    """
+    Raised by WorkerPool.submit when max_queue tasks are already waiting
+    """
+
+
+class WorkerPool:
+    """
+    Bounded thread pool running tasks inside an application context
+
+    At most max_workers tasks run at once, and at most max_queue more may
+    wait for a free worker; further submissions are rejected so that a slow
+    downstream service cannot grow the backlog without bound.
+    """
+
+    def __init__(self, app, logger, name, max_workers=4, max_queue=100):
+        """
+        Create an instance of WorkerPool
+
+        :param app: the Flask application to push a context for
+        :type app: Flask
+        :param logger: application's logger instance
+        :type logger: logger
+        :param name: name of the pool, used for thread names, logs and metrics
+        :type name: str
+        :param max_workers: maximum number of tasks running concurrently
+        :type max_workers: int
+        :param max_queue: maximum number of tasks waiting for a worker
+        :type max_queue: int
+        """
+        self.app = app
+        self.logger = logger
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._queue_depth = queue_depth.labels(pool=name)
+        self._active = active_tasks.labels(pool=name)
+
+    @property
+    def queued(self):
+        return self._queued
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Run function(*args, **kwargs) on a worker thread
+
+        :return: a Future for the function's result
+        :rtype: concurrent.futures.Future
+        :raises WorkerPoolFullError: if max_queue tasks are already waiting
+        """
+        with self._lock:
+            if self._queued >= self.max_queue:
+                task_results.labels(pool=self.name, outcome="rejected").inc()
+                raise WorkerPoolFullError(
+                    "Worker pool {name} has {queued} tasks waiting".format(
+                        name=self.name, queued=self._queued
+                    )
+                )
+            self._queued += 1
+            self._queue_depth.inc()
+
+        return self._executor.submit(self._run, function, args, kwargs)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, function, args, kwargs):
+        with self._lock:
+            self._queued -= 1
+            self._queue_depth.dec()
+        self._active.inc()
+        try:
+            with self.app.app_context():
+                result = function(*args, **kwargs)
+            task_results.labels(pool=self.name, outcome="completed").inc()
+            return result
+        except Exception as e:
+            task_results.labels(pool=self.name, outcome="failed").inc()
+            reason = getattr(e, "message", None)
+            self.logger.error(
+                "Task in worker pool {name} failed. Reason = {reason}".format(
+                    name=self.name, reason=(reason if reason else str(e))
+                )
+            )
+            raise
+        finally:
+            self._active.dec()
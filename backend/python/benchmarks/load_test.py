@@ -0,0 +1,136 @@
+"""
+Closed-loop HTTP load test of the feed and article endpoints
+
+Each of --concurrency client threads sends requests back to back for
+--duration seconds, cycling through the endpoints, and the throughput and
+latency percentiles are reported per endpoint. Run it against both servers
+to compare them, e.g. from backend/python:
+
+    python server.py                                  # development server
+    gunicorn -c gunicorn.conf.py wsgi:app             # production server
+
+    LOAD_TEST_TOKEN=<firebase id token> python -m benchmarks.load_test \
+        --base-url http://localhost:8080 --concurrency 32 --duration 30
+"""
+
+import argparse
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+import requests
+
+DEFAULT_ENDPOINTS = (
+    "/feeds",
+    "/feeds?limit=20",
+    "/articles",
+    "/articles?fields=summary",
+)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LoadTest:
+    def __init__(self, base_url, endpoints, concurrency, duration, token=None):
+        self.base_url = base_url.rstrip("/")
+        self.endpoints = endpoints
+        self.concurrency = concurrency
+        self.duration = duration
+        self.headers = {"Authorization": "Bearer " + token} if token else {}
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def _client(self, offset, deadline):
+        # one keep-alive connection per client thread, like a browser or app
+        session = requests.Session()
+        count = offset
+        while time.monotonic() < deadline:
+            endpoint = self.endpoints[count % len(self.endpoints)]
+            count += 1
+            start = time.perf_counter()
+            try:
+                response = session.get(
+                    self.base_url + endpoint, headers=self.headers, timeout=30
+                )
+                status = response.status_code
+            except requests.RequestException as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.latencies[endpoint].append(elapsed)
+                self.statuses[endpoint][status] += 1
+
+    def run(self):
+        deadline = time.monotonic() + self.duration
+        threads = [
+            threading.Thread(target=self._client, args=(i, deadline), daemon=True)
+            for i in range(self.concurrency)
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.monotonic() - started
+
+    def report(self, elapsed):
+        lines = [
+            "{url}: {concurrency} clients for {elapsed:.1f}s".format(
+                url=self.base_url, concurrency=self.concurrency, elapsed=elapsed
+            ),
+            "{:<28} {:>8} {:>9} {:>9} {:>9} {:>9}  {}".format(
+                "endpoint", "req/s", "p50 ms", "p95 ms", "p99 ms", "max ms", "statuses"
+            ),
+        ]
+        total = 0
+        for endpoint in self.endpoints:
+            latencies = sorted(self.latencies[endpoint])
+            total += len(latencies)
+            lines.append(
+                "{:<28} {:>8.1f} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f}  {}".format(
+                    endpoint,
+                    len(latencies) / elapsed,
+                    percentile(latencies, 0.50) * 1000,
+                    percentile(latencies, 0.95) * 1000,
+                    percentile(latencies, 0.99) * 1000,
+                    (latencies[-1] if latencies else 0) * 1000,
+                    dict(self.statuses[endpoint]),
+                )
+            )
+        lines.append("total {:.1f} req/s".format(total / elapsed))
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8080")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument(
+        "--endpoint",
+        action="append",
+        dest="endpoints",
+        help="path to request, may be repeated (default: feed and article listings)",
+    )
+    args = parser.parse_args()
+
+    load_test = LoadTest(
+        args.base_url,
+        args.endpoints or DEFAULT_ENDPOINTS,
+        args.concurrency,
+        args.duration,
+        token=os.getenv("LOAD_TEST_TOKEN"),
+    )
+    elapsed = load_test.run()
+    print(load_test.report(elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+gunicorn settings for the production server, every value can be overridden
+through the environment:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Each worker process runs GUNICORN_THREADS requests at once, so it gets a
+database pool of that many connections (DB_POOL_SIZE), unless set explicitly.
+The total number of connections to plan for on the Postgres side is roughly
+workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+"""
+
+import multiprocessing
+import os
+
+bind = "0.0.0.0:{port}".format(port=os.getenv("PORT", 8080))
+
+workers = int(
+    os.getenv("GUNICORN_WORKERS")
+    or os.getenv("WEB_CONCURRENCY")
+    or multiprocessing.cpu_count() * 2 + 1
+)
+# gthread keeps long-polls and event streams from blocking a whole process,
+# gevent may be used instead if it is installed
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+
+# import the app once in the master so workers fork with it already loaded
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+# SIGHUP / SIGTERM let in-flight requests finish for this long
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# recycle workers periodically to bound memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+
+# read by app/config.py when create_app runs
+os.environ.setdefault("DB_POOL_SIZE", str(threads))
+
+
+def post_fork(server, worker):
+    # the master may have opened connections while preloading the app, they
+    # must not be shared between processes
+    from app.models import db
+
+    with worker.app.wsgi().app_context():
+        db.engine.dispose()
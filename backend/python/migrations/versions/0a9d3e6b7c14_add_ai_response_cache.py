@@ -0,0 +1,32 @@
+"""add ai response cache table
+
+Revision ID: 0a9d3e6b7c14
+Revises: f2a86c4d0b35
+Create Date: 2026-10-18 13:10:44.602915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a9d3e6b7c14'
+down_revision = 'f2a86c4d0b35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ai_response_cache',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('response', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_ai_response_cache_expires_at'), 'ai_response_cache', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_ai_response_cache_expires_at'), table_name='ai_response_cache')
+    op.drop_table('ai_response_cache')
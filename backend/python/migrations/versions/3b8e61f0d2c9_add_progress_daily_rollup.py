@@ -0,0 +1,47 @@
+"""add progress_daily rollup and progress user_id date index
+
+Revision ID: 3b8e61f0d2c9
+Revises: 0a9d3e6b7c14
+Create Date: 2026-10-18 16:24:51.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8e61f0d2c9'
+down_revision = '0a9d3e6b7c14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_progress_user_id_date',
+        'progress',
+        ['user_id', 'date'],
+        unique=False,
+    )
+    op.create_table('progress_daily',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('content_type', sa.String(length=50), nullable=False),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day', 'content_type')
+    )
+    # backfill from the existing progress rows
+    op.execute(
+        """
+        INSERT INTO progress_daily (user_id, day, content_type, points)
+        SELECT user_id, CAST(date AS DATE), content_type, SUM(points_collected)
+        FROM progress
+        GROUP BY user_id, CAST(date AS DATE), content_type
+        """
+    )
+
+
+def downgrade():
+    op.drop_table('progress_daily')
+    op.drop_index('ix_progress_user_id_date', table_name='progress')
@@ -0,0 +1,34 @@
+"""add feed keyset pagination index
+
+Revision ID: 5b2e8f1c9a47
+Revises: 9290b98eb97d
+Create Date: 2026-10-18 09:12:41.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2e8f1c9a47'
+down_revision = '9290b98eb97d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # posts created through the API were inserted with an explicit NULL created_at,
+    # keyset cursors need every row to have a sort key
+    op.execute(
+        "UPDATE feed SET created_at = COALESCE(updated_at, now()) WHERE created_at IS NULL"
+    )
+    op.create_index(
+        'ix_feed_centre_created_at_id',
+        'feed',
+        ['centre', sa.text('created_at DESC'), 'id'],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_feed_centre_created_at_id', table_name='feed')
@@ -0,0 +1,30 @@
+"""add progress idempotency_key
+
+Revision ID: 6e2c9a4f1d87
+Revises: 3b8e61f0d2c9
+Create Date: 2026-10-18 18:02:37.514208
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e2c9a4f1d87'
+down_revision = '3b8e61f0d2c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('progress', sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+    op.create_unique_constraint(
+        'uq_progress_user_id_idempotency_key',
+        'progress',
+        ['user_id', 'idempotency_key'],
+    )
+
+
+def downgrade():
+    op.drop_constraint('uq_progress_user_id_idempotency_key', 'progress', type_='unique')
+    op.drop_column('progress', 'idempotency_key')
@@ -0,0 +1,51 @@
+"""add email_jobs and email_job_recipients tables
+
+Revision ID: 7d4f0b2a6e13
+Revises: c3a91d7e5f20
+Create Date: 2026-10-18 11:26:53.907415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d4f0b2a6e13'
+down_revision = 'c3a91d7e5f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('email_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('subject', sa.Text(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total_count', sa.Integer(), nullable=False),
+    sa.Column('sent_count', sa.Integer(), nullable=False),
+    sa.Column('failed_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('email_job_recipients',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['email_jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_email_job_recipients_job_id'), 'email_job_recipients', ['job_id'], unique=False)
+    op.create_index('ix_email_job_recipients_status_next_attempt_at', 'email_job_recipients', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_email_job_recipients_status_next_attempt_at', table_name='email_job_recipients')
+    op.drop_index(op.f('ix_email_job_recipients_job_id'), table_name='email_job_recipients')
+    op.drop_table('email_job_recipients')
+    op.drop_table('email_jobs')
@@ -0,0 +1,33 @@
+"""add user_comments thread index
+
+Revision ID: 8a5d3c7e2b14
+Revises: 6e2c9a4f1d87
+Create Date: 2026-10-18 19:26:08.917342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a5d3c7e2b14'
+down_revision = '6e2c9a4f1d87'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # keyset cursors over comments need every row to have a sort key
+    op.execute(
+        "UPDATE user_comments SET created_at = COALESCE(updated_at, now()) WHERE created_at IS NULL"
+    )
+    op.create_index(
+        'ix_user_comments_feed_id_parent_id_created_at',
+        'user_comments',
+        ['feed_id', 'parent_id', 'created_at', 'id'],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_user_comments_feed_id_parent_id_created_at', table_name='user_comments')
@@ -0,0 +1,65 @@
+"""add feed_likes table
+
+Revision ID: c3a91d7e5f20
+Revises: 5b2e8f1c9a47
+Create Date: 2026-10-18 10:04:27.331958
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a91d7e5f20'
+down_revision = '5b2e8f1c9a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('feed_likes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('feed_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['feed_id'], ['feed.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('feed_id', 'user_id', name='uq_feed_likes_feed_id_user_id')
+    )
+
+    # backfill from the denormalized array, skipping ids of users that no longer exist
+    op.execute(
+        """
+        INSERT INTO feed_likes (feed_id, user_id, created_at)
+        SELECT DISTINCT feed.id, liked.user_id, now()
+        FROM feed
+        CROSS JOIN LATERAL unnest(feed.users_who_have_liked) AS liked(user_id)
+        JOIN users ON users.id = liked.user_id
+        ON CONFLICT ON CONSTRAINT uq_feed_likes_feed_id_user_id DO NOTHING
+        """
+    )
+    op.execute(
+        """
+        UPDATE feed
+        SET likes_count = (
+            SELECT count(*) FROM feed_likes WHERE feed_likes.feed_id = feed.id
+        )
+        """
+    )
+
+    op.drop_column('feed', 'users_who_have_liked')
+
+
+def downgrade():
+    op.add_column('feed', sa.Column('users_who_have_liked', sa.ARRAY(sa.Integer()), nullable=True))
+    op.execute(
+        """
+        UPDATE feed
+        SET users_who_have_liked = COALESCE(
+            (SELECT array_agg(user_id) FROM feed_likes WHERE feed_likes.feed_id = feed.id),
+            '{}'
+        )
+        """
+    )
+    op.drop_table('feed_likes')
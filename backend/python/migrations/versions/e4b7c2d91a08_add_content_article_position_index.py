@@ -0,0 +1,29 @@
+"""add content article_id position index
+
+Revision ID: e4b7c2d91a08
+Revises: 7d4f0b2a6e13
+Create Date: 2026-10-18 11:02:17.940316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b7c2d91a08'
+down_revision = '7d4f0b2a6e13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_content_article_id_position',
+        'content',
+        ['article_id', 'position'],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_content_article_id_position', table_name='content')
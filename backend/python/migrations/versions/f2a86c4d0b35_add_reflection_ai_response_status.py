@@ -0,0 +1,27 @@
+"""add reflection ai_response_status
+
+Revision ID: f2a86c4d0b35
+Revises: e4b7c2d91a08
+Create Date: 2026-10-18 12:31:05.118274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a86c4d0b35'
+down_revision = 'e4b7c2d91a08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('reflection', sa.Column('ai_response_status', sa.String(length=20), nullable=True))
+    op.execute(
+        "UPDATE reflection SET ai_response_status = 'completed' WHERE ai_response IS NOT NULL"
+    )
+
+
+def downgrade():
+    op.drop_column('reflection', 'ai_response_status')
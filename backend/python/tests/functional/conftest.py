@@ -1,9 +1,37 @@
+from contextlib import contextmanager
+
 import pytest
 
 from app import create_app
+from app.utilities.query_tracker import track_queries
 
 
 @pytest.fixture(scope="session", autouse=True)
 def client():
     test_client = create_app("testing").test_client()
     yield test_client
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Assert the number of SQL statements executed inside a block, e.g.
+
+        with query_budget(max_queries=3, max_repeats=1):
+            client.get("/feeds")
+
+    max_queries bounds the total, max_repeats the executions of any one
+    statement shape (see app/utilities/query_tracker.py).
+    """
+
+    @contextmanager
+    def budget(max_queries=None, max_repeats=None):
+        with track_queries() as tracker:
+            yield tracker
+        report = tracker.report()
+        if max_queries is not None:
+            assert tracker.count <= max_queries, report
+        if max_repeats is not None:
+            assert not tracker.repeated(max_repeats), report
+
+    return budget
@@ -0,0 +1,184 @@
+from datetime import timedelta
+
+from flask import current_app
+import pytest
+
+from app.models import db
+from app.models.email_job import EmailJob, EmailJobRecipient
+from app.services.implementations.email_dispatch_service import (
+    EmailDispatchService,
+)
+
+
+class FakeEmailService:
+    """
+    Records sent batches and fails the recipients listed in failing
+    """
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.batches = []
+        self.statuses_while_sending = []
+
+    def send_emails_batch(self, recipients, subject, body):
+        self.batches.append(list(recipients))
+        self.statuses_while_sending.append(
+            [
+                status
+                for (status,) in db.session.query(EmailJobRecipient.status).filter(
+                    EmailJobRecipient.email.in_(recipients)
+                )
+            ]
+        )
+        return [
+            Exception("rejected") if email in self.failing else None
+            for email in recipients
+        ]
+
+
+def make_service(email_service, max_attempts=3):
+    # no worker threads, the tests drive _process_batch directly
+    return EmailDispatchService(
+        current_app.logger,
+        email_service,
+        current_app._get_current_object(),
+        num_workers=0,
+        max_attempts=max_attempts,
+        retry_base_seconds=60,
+    )
+
+
+@pytest.fixture(autouse=True)
+def cleanup():
+    yield
+    EmailJobRecipient.query.delete()
+    EmailJob.query.delete()
+    db.session.commit()
+
+
+def get_recipient(email):
+    return EmailJobRecipient.query.filter_by(email=email).one()
+
+
+def make_due(email):
+    EmailJobRecipient.query.filter_by(email=email).update(
+        {EmailJobRecipient.next_attempt_at: db.func.now() - timedelta(minutes=1)},
+        synchronize_session=False,
+    )
+    db.session.commit()
+
+
+RECIPIENTS = ["a@test.com", "b@test.com", "c@test.com"]
+
+
+def test_claimed_recipients_are_committed_as_sending_before_send():
+    email_service = FakeEmailService()
+    service = make_service(email_service)
+    job = service.enqueue(RECIPIENTS, "Subject", "Body")
+
+    assert service._process_batch() == 3
+    assert email_service.batches == [RECIPIENTS]
+    assert email_service.statuses_while_sending == [["sending"] * 3]
+
+    job = service.get_job(job["id"])
+    assert job["status"] == "completed"
+    assert job["sent_count"] == 3
+    assert job["pending_count"] == 0
+    assert all(get_recipient(email).status == "sent" for email in RECIPIENTS)
+    # nothing left to claim
+    assert service._process_batch() == 0
+
+
+def test_failed_recipient_is_retried_later():
+    email_service = FakeEmailService(failing={"b@test.com"})
+    service = make_service(email_service)
+    job = service.enqueue(RECIPIENTS, "Subject", "Body")
+
+    service._process_batch()
+    recipient = get_recipient("b@test.com")
+    assert recipient.status == "pending"
+    assert recipient.attempts == 1
+    assert recipient.last_error == "rejected"
+    job = service.get_job(job["id"])
+    assert (job["status"], job["sent_count"], job["failed_count"]) == (
+        "running",
+        2,
+        0,
+    )
+
+    # not due yet
+    assert service._process_batch() == 0
+
+    email_service.failing.clear()
+    make_due("b@test.com")
+    assert service._process_batch() == 1
+    assert get_recipient("b@test.com").attempts == 2
+    job = service.get_job(job["id"])
+    assert (job["status"], job["sent_count"], job["failed_count"]) == (
+        "completed",
+        3,
+        0,
+    )
+
+
+def test_recipient_fails_after_max_attempts():
+    email_service = FakeEmailService(failing={"c@test.com"})
+    service = make_service(email_service, max_attempts=2)
+    job = service.enqueue(RECIPIENTS, "Subject", "Body")
+
+    service._process_batch()
+    make_due("c@test.com")
+    service._process_batch()
+
+    recipient = get_recipient("c@test.com")
+    assert recipient.status == "failed"
+    assert recipient.attempts == 2
+    job = service.get_job(job["id"])
+    assert (job["status"], job["sent_count"], job["failed_count"]) == (
+        "completed",
+        2,
+        1,
+    )
+    assert job["pending_count"] == 0
+
+
+def test_expired_lease_is_claimed_again():
+    email_service = FakeEmailService()
+    service = make_service(email_service)
+    job = service.enqueue(RECIPIENTS[:1], "Subject", "Body")
+
+    # a worker claimed the recipient and died before recording the outcome
+    recipient = get_recipient(RECIPIENTS[0])
+    recipient.status = "sending"
+    recipient.attempts = 1
+    db.session.commit()
+    make_due(RECIPIENTS[0])
+
+    assert service._process_batch() == 1
+    assert get_recipient(RECIPIENTS[0]).attempts == 2
+    assert service.get_job(job["id"])["status"] == "completed"
+
+
+def test_expired_lease_without_attempts_left_is_failed():
+    email_service = FakeEmailService()
+    service = make_service(email_service, max_attempts=2)
+    job = service.enqueue(RECIPIENTS[:2], "Subject", "Body")
+
+    # a worker died while sending the last allowed attempt
+    recipient = get_recipient(RECIPIENTS[0])
+    recipient.status = "sending"
+    recipient.attempts = 2
+    db.session.commit()
+    make_due(RECIPIENTS[0])
+
+    assert service._process_batch() == 1
+    assert email_service.batches == [RECIPIENTS[1:2]]
+    recipient = get_recipient(RECIPIENTS[0])
+    assert recipient.status == "failed"
+    assert recipient.attempts == 2
+    job = service.get_job(job["id"])
+    assert (job["status"], job["sent_count"], job["failed_count"]) == (
+        "completed",
+        1,
+        1,
+    )
@@ -0,0 +1,136 @@
+from datetime import datetime
+
+from flask import current_app
+import pytest
+
+from app.models import db
+from app.models.feed import Feed
+from app.models.user import User
+from app.models.user_comment import UserComment
+from app.services.implementations.feed_service import FeedService
+
+
+@pytest.fixture
+def feed_service():
+    feed_service = FeedService(current_app.logger)
+    yield feed_service
+    UserComment.query.delete()
+    Feed.query.delete()
+    User.query.delete()
+    db.session.commit()
+
+
+def insert_thread():
+    """
+    Insert a post with comments 1-3 at the top level, 4-6 replying to 1 and
+    7 replying to 4, created in id order
+    """
+    user = User(
+        auth_id="A",
+        first_name="Jane",
+        last_name="Doe",
+        role="User",
+        email_address="test@test.com",
+    )
+    db.session.add(user)
+    db.session.flush()
+    feed = Feed(title="Post", content="Content", author_id=user.id)
+    db.session.add(feed)
+    db.session.flush()
+
+    comments = {}
+    for number, parent in (
+        (1, None),
+        (2, None),
+        (3, None),
+        (4, 1),
+        (5, 1),
+        (6, 1),
+        (7, 4),
+    ):
+        comment = UserComment(
+            feed_id=feed.id,
+            user_id=user.id,
+            content=str(number),
+            parent_id=comments[parent].id if parent else None,
+            created_at=datetime(2024, 1, 1, 0, 0, number),
+        )
+        db.session.add(comment)
+        db.session.flush()
+        comments[number] = comment
+    db.session.commit()
+    return feed.id, comments
+
+
+def test_comment_tree_is_nested_and_paged(feed_service):
+    feed_id, comments = insert_thread()
+
+    page = feed_service.get_comment_tree(feed_id, limit=2, depth=2, replies=2)
+    assert [comment["content"] for comment in page["comments"]] == ["1", "2"]
+    first = page["comments"][0]
+    assert first["reply_count"] == 3
+    assert [reply["content"] for reply in first["replies"]] == ["4", "5"]
+    # 7 is beyond the depth limit
+    assert first["replies"][0]["reply_count"] == 1
+    assert first["replies"][0]["replies"] == []
+
+    rest = feed_service.get_comment_tree(
+        feed_id, parent_id=comments[1].id, cursor=first["replies_cursor"]
+    )
+    assert [comment["content"] for comment in rest["comments"]] == ["6"]
+
+    last = feed_service.get_comment_tree(feed_id, limit=2, cursor=page["next_cursor"])
+    assert [comment["content"] for comment in last["comments"]] == ["3"]
+    assert last["next_cursor"] is None
+
+    with pytest.raises(ValueError):
+        feed_service.get_comment_tree(feed_id, depth=0)
+
+
+def test_comment_counts_are_kept_and_reconciled(feed_service):
+    feed_id, comments = insert_thread()
+    user_id = comments[1].user_id
+
+    feed = feed_service.add_comment(feed_id, user_id, "8", comments[2].id)
+    assert feed["comments_count"] == 1
+    feed_service.delete_comment(feed_id, comments[3].id)
+    with pytest.raises(Exception):
+        feed_service.delete_comment(feed_id, comments[3].id)
+
+    # insert_thread bypassed the counter, 7 + 1 - 1 comments remain
+    assert feed_service.reconcile_counters() == 1
+    assert Feed.query.get(feed_id).comments_count == 7
+    assert feed_service.reconcile_counters() == 0
+
+
+def test_likes_keep_count_in_sync(feed_service):
+    feed_id, comments = insert_thread()
+    user_id = comments[1].user_id
+
+    feed = feed_service.add_like(feed_id, user_id)
+    assert feed["likes_count"] == 1
+    assert feed["users_who_have_liked"] == [user_id]
+
+    with pytest.raises(Exception, match="already liked"):
+        feed_service.add_like(feed_id, user_id)
+    assert Feed.query.get(feed_id).likes_count == 1
+
+    feed = feed_service.remove_like(feed_id, user_id)
+    assert feed["likes_count"] == 0
+    assert feed["users_who_have_liked"] == []
+
+    with pytest.raises(Exception, match="has not liked"):
+        feed_service.remove_like(feed_id, user_id)
+    assert Feed.query.get(feed_id).likes_count == 0
+
+
+def test_like_reports_missing_feed_or_user(feed_service):
+    feed_id, comments = insert_thread()
+    user_id = comments[1].user_id
+
+    with pytest.raises(Exception, match="Invalid feed ID"):
+        feed_service.add_like(feed_id + 1, user_id)
+    with pytest.raises(Exception, match="Invalid user ID"):
+        feed_service.add_like(feed_id, user_id + 1)
+    with pytest.raises(Exception, match="Invalid feed ID"):
+        feed_service.remove_like(feed_id + 1, user_id)
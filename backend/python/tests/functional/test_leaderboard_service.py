@@ -0,0 +1,130 @@
+from datetime import datetime
+
+from flask import current_app
+import pytest
+
+from app.models import db
+from app.models.progress import Progress
+from app.models.progress_daily import ProgressDaily
+from app.models.user import User
+from app.services.implementations.leaderboard_service import (
+    LeaderboardService,
+    iso_week,
+)
+from app.services.implementations.user_service import UserService
+
+USERS = (
+    ("A", "Ann", "X"),
+    ("B", "Ben", "Y"),
+    ("C", "Cat", "X"),
+)
+
+
+@pytest.fixture
+def services():
+    # without an app no reconcile thread is started, tests call reconcile
+    leaderboard = LeaderboardService(current_app.logger)
+    user_service = UserService(
+        current_app.logger, None, leaderboard_service=leaderboard
+    )
+    yield leaderboard, user_service
+    ProgressDaily.query.delete()
+    Progress.query.delete()
+    User.query.delete()
+    db.session.commit()
+
+
+def insert_users():
+    users = {}
+    for auth_id, first_name, location in USERS:
+        user = User(
+            auth_id=auth_id,
+            first_name=first_name,
+            last_name="Doe",
+            role="User",
+            email_address="test@test.com",
+            location=location,
+        )
+        db.session.add(user)
+        users[first_name] = user
+    db.session.commit()
+    return {name: user.id for name, user in users.items()}
+
+
+def add_points(user_service, user_id, points, when=None):
+    progress = {
+        "user_id": user_id,
+        "content_type": "article",
+        "points_collected": points,
+    }
+    if when is not None:
+        progress["date"] = when
+    user_service.update_progress(progress)
+
+
+def top(leaderboard, board_key):
+    return [
+        (entry["first_name"], entry["points"], entry["rank"])
+        for entry in leaderboard.get_top(board_key)["entries"]
+    ]
+
+
+def test_boards_load_from_sql_and_update_incrementally(services):
+    leaderboard, user_service = services
+    ids = insert_users()
+    add_points(user_service, ids["Ann"], 5)
+    add_points(user_service, ids["Ben"], 8)
+    add_points(user_service, ids["Cat"], 5)
+
+    # the first read loads the boards from progress_daily
+    assert top(leaderboard, "global") == [("Ben", 8, 1), ("Ann", 5, 2), ("Cat", 5, 2)]
+
+    # later progress is recorded without another rebuild
+    add_points(user_service, ids["Cat"], 4)
+    assert top(leaderboard, "global") == [("Cat", 9, 1), ("Ben", 8, 2), ("Ann", 5, 3)]
+    rank = leaderboard.get_rank("global", ids["Ann"])
+    assert (rank["rank"], rank["points"], rank["size"]) == (3, 5, 3)
+
+    centre = leaderboard.board_key("centre", location="X")
+    assert top(leaderboard, centre) == [("Cat", 9, 1), ("Ann", 5, 2)]
+    assert leaderboard.get_rank(centre, ids["Ben"]) is None
+
+    this_week = leaderboard.board_key("week")
+    assert top(leaderboard, this_week)[0] == ("Cat", 9, 1)
+
+
+def test_reconcile_picks_up_points_recorded_elsewhere(services):
+    leaderboard, user_service = services
+    ids = insert_users()
+    add_points(user_service, ids["Ann"], 5)
+    assert top(leaderboard, "global") == [("Ann", 5, 1)]
+
+    # e.g. another worker process, whose points this one did not see
+    other_worker = UserService(current_app.logger, None)
+    add_points(other_worker, ids["Ben"], 7)
+    User.query.filter_by(id=ids["Ann"]).update({"location": "Y"})
+    db.session.commit()
+    assert top(leaderboard, "global") == [("Ann", 5, 1)]
+
+    leaderboard.reconcile()
+    assert top(leaderboard, "global") == [("Ben", 7, 1), ("Ann", 5, 2)]
+    centre = leaderboard.board_key("centre", location="Y")
+    assert top(leaderboard, centre) == [("Ben", 7, 1), ("Ann", 5, 2)]
+
+
+def test_old_week_is_loaded_on_request(services):
+    leaderboard, user_service = services
+    ids = insert_users()
+    old_week = datetime(2024, 1, 3, 12)
+    add_points(user_service, ids["Ann"], 3, when=old_week)
+    add_points(user_service, ids["Ben"], 6, when=old_week)
+    add_points(user_service, ids["Ben"], 1, when=datetime(2024, 1, 10, 12))
+
+    board_key = leaderboard.board_key("week", week=iso_week(old_week))
+    assert board_key == "week:2024-W01"
+    leaderboard.reconcile()
+    # only recent weeks are loaded by a rebuild
+    assert board_key not in leaderboard._boards
+    assert top(leaderboard, board_key) == [("Ben", 6, 1), ("Ann", 3, 2)]
+    # kept until the next rebuild
+    assert board_key in leaderboard._boards
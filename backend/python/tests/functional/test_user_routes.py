@@ -18,12 +18,14 @@ TEST_USERS = [
         "first_name": "Jane",
         "last_name": "Doe",
         "role": "Admin",
+        "email_address": "test@test.com",
     },
     {
         "auth_id": "B",
         "first_name": "Hello",
         "last_name": "World",
         "role": "User",
+        "email_address": "test@test.com",
     },
 ]
 
@@ -60,3 +62,19 @@ def setup(module_mocker):
     )
     module_mocker.patch("firebase_admin.auth.get_user", return_value=FirebaseUser())
 
+
+def test_get_users_query_budget(client, query_budget, mocker):
+    # Firebase is unavailable, emails fall back to the ones stored in Postgres
+    mocker.patch("firebase_admin.auth.get_users", side_effect=Exception("offline"))
+    with client.application.app_context():
+        insert_users()
+
+    try:
+        with query_budget(max_queries=1, max_repeats=1):
+            response = client.get("/users")
+        assert response.status_code == 200
+        assert len(response.json) == len(TEST_USERS)
+    finally:
+        with client.application.app_context():
+            User.query.delete()
+            db.session.commit()
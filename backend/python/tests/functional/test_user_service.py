@@ -1,3 +1,5 @@
+from datetime import date, datetime
+
 from flask import current_app
 import pytest
 
@@ -76,3 +78,83 @@ def assert_returned_users(users, expected):
     for expected_user, actual_user in zip(expected, users):
         for key in expected[0].keys():
             assert expected_user[key] == actual_user[key]
+
+
+def test_points_summary_uses_daily_rollup(user_service):
+    insert_users()
+    user = User.query.filter_by(auth_id="B").first()
+    for when, content_type, points in (
+        (datetime(2024, 1, 1, 9), "article", 5),
+        (datetime(2024, 1, 1, 18), "article", 3),
+        (datetime(2024, 1, 2, 9), "quiz", 10),
+        (datetime(2024, 1, 15, 9), "article", 1),
+    ):
+        user_service.update_progress(
+            {
+                "user_id": user.id,
+                "content_type": content_type,
+                "points_collected": points,
+                "date": when,
+            }
+        )
+
+    daily = user_service.get_points_summary(user.id, end_date=date(2024, 1, 14))
+    assert daily["total"] == 18
+    assert daily["points"] == [
+        {"period": "2024-01-01", "points": 8},
+        {"period": "2024-01-02", "points": 10},
+    ]
+
+    weekly = user_service.get_points_summary(
+        user.id, granularity="week", by_content_type=True
+    )
+    assert weekly["points"] == [
+        {"period": "2024-01-01", "points": 8, "content_type": "article"},
+        {"period": "2024-01-01", "points": 10, "content_type": "quiz"},
+        {"period": "2024-01-15", "points": 1, "content_type": "article"},
+    ]
+
+    with pytest.raises(ValueError):
+        user_service.get_points_summary(user.id, granularity="year")
+
+    user_service.delete_progress(user.id)
+    assert user_service.get_points_summary(user.id)["points"] == []
+
+
+def test_progress_batch_is_idempotent(user_service):
+    insert_users()
+    user = User.query.filter_by(auth_id="B").first()
+    events = [
+        {
+            "idempotency_key": "a",
+            "content_type": "article",
+            "points_collected": 5,
+            "date": datetime(2024, 1, 1, 9),
+        },
+        {
+            "idempotency_key": "b",
+            "content_type": "quiz",
+            "points_collected": 10,
+            "date": None,
+        },
+        {
+            "idempotency_key": "a",
+            "content_type": "article",
+            "points_collected": 5,
+            "date": datetime(2024, 1, 1, 9),
+        },
+    ]
+
+    first = user_service.create_progress_batch(user.id, events)
+    assert [result["status"] for result in first] == ["created", "created", "duplicate"]
+    assert first[2]["progress"] == first[0]["progress"]
+
+    again = user_service.create_progress_batch(user.id, events[:1])
+    assert again[0]["status"] == "duplicate"
+    assert again[0]["progress"]["id"] == first[0]["progress"]["id"]
+    assert user_service.get_points_summary(user.id)["total"] == 15
+
+    with pytest.raises(LookupError):
+        user_service.create_progress_batch(user.id + 100, events[:1])
+
+    user_service.delete_progress(user.id)
@@ -0,0 +1,62 @@
+"""
+Test Cases for the conditional GET middleware
+"""
+
+import pytest
+from flask import Flask, jsonify
+
+from app.middlewares.conditional import conditional_get
+
+
+@pytest.fixture
+def versioned_app():
+    app = Flask(__name__)
+    state = {"version": 1, "calls": 0}
+
+    @app.route("/items/<int:item_id>")
+    @conditional_get(lambda item_id: (state["version"],) if item_id == 1 else None)
+    def get_item(item_id):
+        state["calls"] += 1
+        return jsonify({"id": item_id}), 200
+
+    return app, state
+
+
+def test_sets_etag_and_cache_control(versioned_app):
+    app, _ = versioned_app
+    response = app.test_client().get("/items/1")
+    assert response.status_code == 200
+    assert response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+
+def test_matching_etag_returns_304_without_running_route(versioned_app):
+    app, state = versioned_app
+    client = app.test_client()
+    etag = client.get("/items/1").headers["ETag"]
+
+    response = client.get("/items/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+    assert state["calls"] == 1
+
+
+def test_etag_changes_with_version_and_query(versioned_app):
+    app, state = versioned_app
+    client = app.test_client()
+    etag = client.get("/items/1").headers["ETag"]
+
+    assert (
+        client.get("/items/1?fields=id", headers={"If-None-Match": etag}).status_code
+        == 200
+    )
+    state["version"] = 2
+    assert client.get("/items/1", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_no_version_skips_etag(versioned_app):
+    app, _ = versioned_app
+    response = app.test_client().get("/items/2")
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
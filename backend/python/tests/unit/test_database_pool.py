@@ -0,0 +1,53 @@
+"""
+Test Cases for the instrumented connection pool
+"""
+
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.utilities.database import (
+    TimedQueuePool,
+    pool_checked_out,
+    pool_checkout_timeouts,
+    pool_checkout_wait,
+    pool_overflow,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        "sqlite:///{path}".format(path=tmp_path / "pool.db"),
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_reports_checked_out_and_overflow(engine):
+    waits_before = pool_checkout_wait.count
+
+    first = engine.connect()
+    second = engine.connect()
+    assert pool_checked_out.value == 2
+    assert pool_overflow.value == 1
+    assert pool_checkout_wait.count == waits_before + 2
+
+    first.close()
+    second.close()
+    assert pool_checked_out.value == 0
+
+
+def test_counts_checkout_timeouts(engine):
+    timeouts_before = pool_checkout_timeouts.value
+    connections = [engine.connect(), engine.connect()]
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    assert pool_checkout_timeouts.value == timeouts_before + 1
+
+    for connection in connections:
+        connection.close()
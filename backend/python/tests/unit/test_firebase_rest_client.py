@@ -0,0 +1,92 @@
+"""
+Test Cases for FirebaseRestClient against a local stub server
+"""
+
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.utilities.firebase_rest_client import FirebaseRestClient, create_session
+
+
+class StubFirebaseHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections open between requests
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server.requests.append((self.path, self.client_address))
+
+        if server.failures_left > 0:
+            server.failures_left -= 1
+            self._reply(503, {"error": {"message": "UNAVAILABLE"}})
+        elif self.path.startswith("/v1/accounts:signInWithPassword"):
+            self._reply(200, {"idToken": "access", "refreshToken": "refresh"})
+        elif self.path.startswith("/v1/token"):
+            self._reply(200, {"id_token": "access2", "refresh_token": "refresh2"})
+        else:
+            self._reply(400, {"error": {"message": "INVALID_ID_TOKEN"}})
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubFirebaseHandler)
+    server.requests = []
+    server.failures_left = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(stub_server):
+    base_url = "http://127.0.0.1:{port}/v1".format(port=stub_server.server_port)
+    session = create_session(pool_size=2, max_retries=2)
+    return FirebaseRestClient(
+        logging.getLogger("test"),
+        session=session,
+        auth_base_url=base_url,
+        token_base_url=base_url,
+        timeout=(1, 2),
+    )
+
+
+def test_sign_in_and_refresh_reuse_connection(client, stub_server):
+    token = client.sign_in_with_password("test@test.com", "password")
+    assert (token.access_token, token.refresh_token) == ("access", "refresh")
+
+    token = client.refresh_token("refresh")
+    assert (token.access_token, token.refresh_token) == ("access2", "refresh2")
+
+    client_addresses = {address for _, address in stub_server.requests}
+    assert len(client_addresses) == 1
+
+
+def test_retries_5xx(client, stub_server):
+    stub_server.failures_left = 2
+    token = client.sign_in_with_password("test@test.com", "password")
+    assert token.access_token == "access"
+    assert len(stub_server.requests) == 3
+
+
+def test_failure_raises(client, stub_server):
+    with pytest.raises(Exception, match="with OAuth"):
+        client.sign_in_with_google("bad-token")
+    assert len(stub_server.requests) == 1
@@ -0,0 +1,134 @@
+"""
+Test Cases for the request instrumentation middleware and /metrics endpoint
+"""
+
+import pytest
+from flask import Flask, Response, jsonify
+from sqlalchemy import create_engine
+
+from app.middlewares import instrumentation
+from app.rest import metrics_routes
+from app.utilities.metrics import MetricsRegistry
+from app.utilities.request_timing import outbound
+
+
+@pytest.fixture
+def client():
+    engine = create_engine("sqlite://")
+    app = Flask(__name__)
+    instrumentation.init_app(app)
+    app.register_blueprint(metrics_routes.blueprint)
+
+    @app.route("/widgets/<int:widget_id>")
+    def get_widget(widget_id):
+        with engine.connect() as connection:
+            connection.execute("SELECT 1").scalar()
+            connection.execute("SELECT 2").scalar()
+        with outbound("cohere"):
+            pass
+        return jsonify({"id": widget_id})
+
+    @app.route("/broken")
+    def broken():
+        with engine.connect() as connection:
+            connection.execute("SELECT * FROM missing_table")
+
+    @app.route("/stream")
+    def stream():
+        return Response(iter(["a", "b"]))
+
+    return app.test_client()
+
+
+def test_server_timing_header(client):
+    response = client.get("/widgets/7")
+    assert response.status_code == 200
+
+    metrics = dict(
+        part.split(";", 1) for part in response.headers["Server-Timing"].split(", ")
+    )
+    assert list(metrics) == ["db", "cohere", "total"]
+    assert metrics["db"].endswith('desc="2 queries"')
+    assert metrics["cohere"].endswith('desc="1 calls"')
+
+
+def test_route_metrics(client):
+    before = instrumentation.request_sql_queries.labels(
+        route="/widgets/<int:widget_id>"
+    ).count
+    client.get("/widgets/1")
+    client.get("/widgets/2")
+
+    # routes are labelled by their rule, not by the requested path
+    sql_queries = instrumentation.request_sql_queries.labels(
+        route="/widgets/<int:widget_id>"
+    )
+    assert sql_queries.count == before + 2
+    assert (
+        instrumentation.requests_total.labels(
+            method="GET", route="/widgets/<int:widget_id>", status=200
+        ).value
+        >= 2
+    )
+    assert (
+        instrumentation.response_size.labels(route="/widgets/<int:widget_id>").count
+        >= 2
+    )
+
+
+def test_failed_statements_are_counted(client):
+    response = client.get("/broken")
+    assert response.status_code == 500
+    assert 'desc="1 queries"' in response.headers["Server-Timing"]
+
+
+def test_streamed_responses_are_not_sized(client):
+    before = instrumentation.response_size.labels(route="/stream").count
+    assert client.get("/stream").data == b"ab"
+    assert instrumentation.response_size.labels(route="/stream").count == before
+
+
+def test_metrics_endpoint(client):
+    client.get("/widgets/3")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert (
+        'http_request_duration_seconds_bucket{method="GET",'
+        'route="/widgets/<int:widget_id>",le="+Inf"}' in body
+    )
+
+
+def test_metrics_endpoint_token(client, monkeypatch):
+    monkeypatch.setattr(metrics_routes, "METRICS_TOKEN", "secret")
+    assert client.get("/metrics").status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+
+
+def test_render_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs run", ["queue"]).labels(queue='a"b').inc(3)
+    registry.gauge("temperature", "Current\ntemperature").set(21.5)
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    assert registry.render() == (
+        "# HELP jobs_total Jobs run\n"
+        "# TYPE jobs_total counter\n"
+        'jobs_total{queue="a\\"b"} 3\n'
+        "# HELP temperature Current\\ntemperature\n"
+        "# TYPE temperature gauge\n"
+        "temperature 21.5\n"
+        "# HELP latency_seconds Latency\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{le="0.1"} 1\n'
+        'latency_seconds_bucket{le="1"} 2\n'
+        'latency_seconds_bucket{le="+Inf"} 3\n'
+        "latency_seconds_sum 5.55\n"
+        "latency_seconds_count 3\n"
+    )
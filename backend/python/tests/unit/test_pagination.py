@@ -0,0 +1,44 @@
+"""
+Test Cases for keyset pagination cursors
+"""
+
+import base64
+from datetime import datetime
+
+import pytest
+
+from app.utilities.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    parse_page_size,
+)
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 2, 2, 1, 38, 11, 782116)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+def test_invalid_cursor():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor")
+
+
+def test_cursor_with_non_integer_id():
+    payload = '{"created_at":"2025-01-01T00:00:00.000000","id":"1"}'
+    cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_parse_page_size():
+    assert parse_page_size(None) == 20
+    assert parse_page_size("5") == 5
+    assert parse_page_size("1000") == 100
+    with pytest.raises(ValueError):
+        parse_page_size("0")
+    with pytest.raises(ValueError):
+        parse_page_size("abc")
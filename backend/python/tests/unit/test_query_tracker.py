@@ -0,0 +1,92 @@
+"""
+Test Cases for the N+1 query detector
+"""
+
+import pytest
+from flask import Flask, jsonify
+from sqlalchemy import create_engine
+
+from app.middlewares import query_detector
+from app.utilities.query_tracker import (
+    RepeatedQueryError,
+    normalize_sql,
+    track_queries,
+)
+
+
+def test_normalize_sql():
+    assert (
+        normalize_sql(
+            "SELECT users.id FROM users\n  WHERE users.id = %(id_1)s AND users.role = 'Admin'"
+        )
+        == "SELECT users.id FROM users WHERE users.id = ? AND users.role = ?"
+    )
+    assert normalize_sql(
+        "SELECT * FROM content WHERE content.article_id IN (%(id_1)s, %(id_2)s, %(id_3)s)"
+    ) == normalize_sql("SELECT * FROM content WHERE content.article_id IN (%(id_1)s)")
+    assert normalize_sql("SELECT * FROM feeds LIMIT 20 OFFSET 40") == (
+        "SELECT * FROM feeds LIMIT ? OFFSET ?"
+    )
+    assert normalize_sql("INSERT INTO t (a, b) VALUES (?, ?), (?, ?)") == (
+        "INSERT INTO t (a, b) VALUES (?)"
+    )
+    # casts and identifiers containing digits are kept
+    assert normalize_sql("SELECT col_1::text FROM t2") == "SELECT col_1::text FROM t2"
+
+
+def test_track_queries_groups_statement_shapes():
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        with track_queries() as tracker:
+            for i in range(3):
+                connection.execute("SELECT ?", i)
+            connection.execute("SELECT 'a', 'b'")
+        connection.execute("SELECT 1")
+
+    assert tracker.count == 4
+    assert tracker.repeated(2) == [("SELECT ?", 3)]
+    assert tracker.repeated(3) == []
+    assert "3 x SELECT ?" in tracker.report()
+
+
+def create_app(mode, threshold=2):
+    engine = create_engine("sqlite://")
+    app = Flask(__name__)
+    app.config.update(QUERY_DETECTOR=mode, QUERY_DETECTOR_THRESHOLD=threshold)
+    query_detector.init_app(app)
+
+    @app.route("/items")
+    def get_items():
+        with engine.connect() as connection:
+            # one query per item instead of one for all of them
+            items = [connection.execute("SELECT ?", i).scalar() for i in range(3)]
+        return jsonify(items)
+
+    return app
+
+
+def test_log_mode_reports_repeated_statements(caplog):
+    app = create_app("log")
+    response = app.test_client().get("/items")
+    assert response.status_code == 200
+    assert "Possible N+1 queries in GET /items" in caplog.text
+    assert "3 x SELECT ?" in caplog.text
+    assert query_detector.repeated_queries.labels(route="/items").value >= 1
+
+
+def test_raise_mode_fails_the_request():
+    app = create_app("raise")
+    app.testing = True
+    with pytest.raises(RepeatedQueryError):
+        app.test_client().get("/items")
+
+
+def test_threshold():
+    app = create_app("raise", threshold=3)
+    app.testing = True
+    assert app.test_client().get("/items").status_code == 200
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        create_app("sometimes")
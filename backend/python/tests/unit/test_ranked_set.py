@@ -0,0 +1,75 @@
+"""
+Test Cases for RankedSet, the ordered scores behind the leaderboards
+"""
+
+import random
+
+import pytest
+
+from app.utilities.ranked_set import IndexableSkipList, RankedSet
+
+
+def expected_rank(scores, score):
+    return 1 + sum(1 for other in scores.values() if other > score)
+
+
+def test_ranks_ties_share_a_rank():
+    board = RankedSet()
+    for member, score in (("a", 5), ("b", 9), ("c", 5), ("d", 1)):
+        board.set(member, score)
+
+    assert [board.rank(member) for member in "abcd"] == [2, 1, 2, 4]
+    assert board.top(10) == [("b", 9, 1), ("a", 5, 2), ("c", 5, 2), ("d", 1, 4)]
+    assert board.top(2, offset=2) == [("c", 5, 2), ("d", 1, 4)]
+
+
+def test_increment_and_remove():
+    board = RankedSet()
+    assert board.increment("a", 3) == 3
+    assert board.increment("a", 4) == 7
+    board.increment("b", 10)
+    assert board.rank("a") == 2
+
+    board.remove("b")
+    assert "b" not in board
+    assert board.rank("a") == 1
+    with pytest.raises(KeyError):
+        board.rank("b")
+
+
+def test_skip_list_remove_missing_key():
+    keys = IndexableSkipList()
+    keys.insert(1)
+    with pytest.raises(KeyError):
+        keys.remove(2)
+
+
+def test_matches_sorting_under_random_updates():
+    rng = random.Random(1)
+    for trial in range(20):
+        board = RankedSet(max_levels=8, rng=random.Random(trial))
+        scores = {}
+        for _ in range(300):
+            member = rng.randrange(60)
+            action = rng.random()
+            if action < 0.5:
+                scores[member] = rng.randrange(20)
+                board.set(member, scores[member])
+            elif action < 0.8:
+                amount = rng.randrange(-3, 5)
+                scores[member] = scores.get(member, 0) + amount
+                board.increment(member, amount)
+            elif member in scores:
+                del scores[member]
+                board.remove(member)
+
+            assert len(board) == len(scores)
+            for other, score in scores.items():
+                assert board.rank(other) == expected_rank(scores, score)
+
+            ordered = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            offset, count = rng.randrange(len(scores) + 2), rng.randrange(10)
+            assert board.top(count, offset) == [
+                (member, score, expected_rank(scores, score))
+                for member, score in ordered[offset : offset + count]
+            ]
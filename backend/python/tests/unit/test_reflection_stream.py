@@ -0,0 +1,109 @@
+"""
+Test Cases for streaming AI responses against a local fake Cohere server
+"""
+
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.implementations.reflection_service import ReflectionService
+
+EVENTS = [
+    {"event_type": "stream-start", "is_finished": False},
+    {"event_type": "text-generation", "text": "Thank you", "is_finished": False},
+    {"event_type": "text-generation", "text": " for sharing.", "is_finished": False},
+    {"event_type": "stream-end", "finish_reason": "COMPLETE", "is_finished": True},
+]
+
+
+class FakeCohereHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.payloads.append(payload)
+
+        if self.server.fail:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/stream+json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for event in EVENTS:
+            line = (json.dumps(event) + "\n").encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_cohere():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeCohereHandler)
+    server.payloads = []
+    server.fail = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def service(fake_cohere):
+    service = ReflectionService(logging.getLogger("test"))
+    service.cohere_api_key = "test-key"
+    service.cohere_api_url = "http://127.0.0.1:{port}/v1/chat".format(
+        port=fake_cohere.server_port
+    )
+    return service
+
+
+def test_streams_text_generation_events(service, fake_cohere):
+    chunks = list(
+        service.stream_ai_response(
+            "A streamed reflection", "gratitude", bypass_cache=True
+        )
+    )
+    assert chunks == ["Thank you", " for sharing."]
+    assert fake_cohere.payloads[0]["stream"] is True
+
+    # the completed response is cached for the next identical reflection
+    cached = "".join(service.stream_ai_response("a  streamed reflection", "gratitude"))
+    assert cached == "Thank you for sharing."
+    assert len(fake_cohere.payloads) == 1
+
+
+def test_falls_back_to_mock_response(service, fake_cohere):
+    fake_cohere.fail = True
+    mock = service._get_mock_ai_response("stress")
+    chunks = list(service.stream_ai_response("Failing", "stress", bypass_cache=True))
+    assert len(chunks) > 1
+    assert "".join(chunks) == mock
+
+
+def test_streams_mock_response_without_api_key(service, fake_cohere):
+    service.cohere_api_key = None
+    chunks = list(service.stream_ai_response("No key", "goals"))
+    assert "".join(chunks) == service._get_mock_ai_response("goals")
+    assert fake_cohere.payloads == []
+
+
+def test_generate_raises_without_fallback(service, fake_cohere):
+    fake_cohere.fail = True
+    mock = service._get_mock_ai_response("stress")
+    assert service.generate_ai_response("Failing", "stress", bypass_cache=True) == mock
+    # fill_ai_response relies on this to mark the reflection as failed
+    with pytest.raises(Exception):
+        service.generate_ai_response(
+            "Failing", "stress", bypass_cache=True, fallback=False
+        )
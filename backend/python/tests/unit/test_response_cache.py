@@ -0,0 +1,57 @@
+"""
+Test Cases for the AI response cache
+"""
+
+from app.utilities.response_cache import AIResponseCache, cache_key, normalize_message
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeStore:
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, response, ttl):
+        self.entries[key] = response
+
+
+def test_key_ignores_case_and_spacing():
+    a = cache_key("command", "preamble", normalize_message("I am  grateful\n"))
+    b = cache_key("command", "preamble", normalize_message(" i am grateful"))
+    c = cache_key("command", "other preamble", normalize_message("i am grateful"))
+    assert a == b
+    assert a != c
+
+
+def test_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = AIResponseCache(max_size=2, ttl=60, clock=clock)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")  # evicts b, the least recently used
+    assert cache.get("b") is None
+
+    clock.now += 61
+    assert cache.get("a") is None
+    assert cache.hits == 1
+    assert cache.misses == 2
+    assert cache.hit_ratio() == 1 / 3
+
+
+def test_store_tier_is_shared():
+    store = FakeStore()
+    AIResponseCache(store=store).put("key", "response")
+
+    other_process = AIResponseCache(store=store)
+    assert other_process.get("key") == "response"
+    assert len(other_process) == 1
@@ -0,0 +1,120 @@
+"""
+Test Cases for the lazily constructed shared services
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.services.container import ServiceContainer, service_init_seconds
+
+
+class Service:
+    def __init__(self, name, dependency=None):
+        self.name = name
+        self.dependency = dependency
+
+    def describe(self):
+        return self.name
+
+
+@pytest.fixture
+def container():
+    return ServiceContainer()
+
+
+def test_services_are_built_on_first_use(container):
+    built = []
+
+    def factory(container):
+        built.append("email")
+        return Service("email")
+
+    container.register("email", factory)
+    email_service = container.lazy("email")
+    assert built == []
+    assert not container.is_built("email")
+
+    assert email_service.describe() == "email"
+    assert email_service.name == "email"
+    assert built == ["email"]
+    assert container.get("email") is container.get("email")
+
+
+def test_dependencies_are_shared(container):
+    container.register("email", lambda c: Service("email"))
+    container.register("user", lambda c: Service("user", c.get("email")))
+    container.register("auth", lambda c: Service("auth", c.get("user")))
+
+    auth_service = container.get("auth")
+    assert auth_service.dependency is container.get("user")
+    assert auth_service.dependency.dependency is container.get("email")
+
+
+def test_concurrent_first_use_builds_once(container):
+    built = []
+
+    def factory(container):
+        built.append(1)
+        time.sleep(0.05)
+        return Service("user")
+
+    container.register("user", factory)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(container.get("user")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_timings_exclude_dependencies(container):
+    def slow_email(container):
+        time.sleep(0.05)
+        return Service("email")
+
+    container.register("email", slow_email)
+    container.register("user", lambda c: Service("user", c.get("email")))
+    container.get("user")
+
+    assert list(container.timings) == ["email", "user"]
+    assert container.timings["email"] >= 0.05
+    assert container.timings["user"] < 0.05
+    assert service_init_seconds.labels(service="email").value >= 0.05
+
+
+def test_circular_dependencies_are_reported(container):
+    container.register("a", lambda c: c.get("b"))
+    container.register("b", lambda c: c.get("a"))
+    with pytest.raises(RuntimeError, match="a -> b -> a"):
+        container.get("a")
+
+
+def test_failed_construction_is_retried(container):
+    attempts = []
+
+    def factory(container):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ValueError("Gmail unavailable")
+        return Service("email")
+
+    container.register("email", factory)
+    with pytest.raises(ValueError):
+        container.get("email")
+    assert container.get("email").name == "email"
+
+
+def test_reset_rebuilds_services(container):
+    container.register("email", lambda c: Service("email"))
+    first = container.get("email")
+    container.reset()
+    assert container.timings == {}
+    assert container.get("email") is not first
@@ -0,0 +1,76 @@
+"""
+Test Cases for the create_app startup profiler
+"""
+
+from app.utilities.startup_profile import (
+    StartupTimer,
+    parse_importtime,
+    startup_phase_seconds,
+    summarize_imports,
+)
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       300 |        300 |     _json
+import time:      1200 |       1500 |   json
+import time:       500 |       2000 | app.utilities.metrics
+Traceback lines are ignored
+import time:       100 |        100 | click
+"""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_phases_are_nested_in_start_order():
+    clock = FakeClock()
+    timer = StartupTimer(clock=clock)
+    with timer.phase("rest.init_app"):
+        with timer.phase("import feed_routes"):
+            clock.now += 0.25
+        with timer.phase("register feed_routes"):
+            clock.now += 0.5
+    with timer.phase("models.init_app"):
+        clock.now += 1
+    timer.finish()
+    clock.now += 10
+
+    assert [(r["path"], r["depth"], r["seconds"]) for r in timer.records] == [
+        ("rest.init_app", 0, 0.75),
+        ("rest.init_app/import feed_routes", 1, 0.25),
+        ("rest.init_app/register feed_routes", 1, 0.5),
+        ("models.init_app", 0, 1),
+    ]
+    assert timer.total == 1.75
+    assert startup_phase_seconds.labels(phase="models.init_app").value == 1
+
+
+def test_parse_importtime():
+    modules = parse_importtime(IMPORTTIME_OUTPUT)
+    assert [(m["module"], m["depth"]) for m in modules] == [
+        ("_json", 2),
+        ("json", 1),
+        ("app.utilities.metrics", 0),
+        ("click", 0),
+    ]
+    assert modules[1]["self"] == 0.0012
+    assert modules[1]["cumulative"] == 0.0015
+
+
+def test_summarize_imports():
+    summary = summarize_imports(parse_importtime(IMPORTTIME_OUTPUT), top=2)
+    assert summary["count"] == 4
+    assert summary["total"] == 0.0021
+    assert [m["module"] for m in summary["slowest"]] == [
+        "app.utilities.metrics",
+        "json",
+    ]
+    assert summary["packages"] == [
+        {"package": "json", "self": 0.0012},
+        {"package": "app", "self": 0.0005},
+    ]
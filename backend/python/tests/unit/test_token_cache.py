@@ -0,0 +1,76 @@
+"""
+Test Cases for the verified ID token cache
+"""
+
+from app.utilities.token_cache import VerifiedTokenCache
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_entry(auth_id, exp=None):
+    claims = {"uid": auth_id, "email": "{}@test.com".format(auth_id)}
+    if exp is not None:
+        claims["exp"] = exp
+    return {
+        "claims": claims,
+        "auth_id": auth_id,
+        "user_id": "1",
+        "role": "User",
+        "email_verified": True,
+    }
+
+
+def test_hit_and_miss_counters():
+    cache = VerifiedTokenCache(clock=FakeClock())
+    assert cache.get("token") is None
+    cache.put("token", make_entry("A"))
+    assert cache.get("token")["auth_id"] == "A"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entry_expires_after_ttl():
+    clock = FakeClock()
+    cache = VerifiedTokenCache(ttl=60, clock=clock)
+    cache.put("token", make_entry("A"))
+    clock.now += 61
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+
+def test_entry_bounded_by_token_exp():
+    clock = FakeClock()
+    cache = VerifiedTokenCache(ttl=300, clock=clock)
+    cache.put("token", make_entry("A", exp=clock.now + 10))
+    clock.now += 11
+    assert cache.get("token") is None
+
+    cache.put("expired", make_entry("A", exp=clock.now - 1))
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = VerifiedTokenCache(max_size=2, clock=FakeClock())
+    cache.put("first", make_entry("A"))
+    cache.put("second", make_entry("B"))
+    cache.get("first")
+    cache.put("third", make_entry("C"))
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
+
+
+def test_invalidate_user():
+    cache = VerifiedTokenCache(clock=FakeClock())
+    cache.put("token-1", make_entry("A"))
+    cache.put("token-2", make_entry("A"))
+    cache.put("token-3", make_entry("B"))
+    cache.invalidate_user("A")
+    assert cache.get("token-1") is None
+    assert cache.get("token-2") is None
+    assert cache.get("token-3") is not None
@@ -0,0 +1,115 @@
+"""
+Test Cases for the feed view counter buffer
+"""
+
+import logging
+from contextlib import contextmanager
+
+import pytest
+
+from app.utilities.view_counter import (
+    InMemoryCounterStore,
+    RedisCounterStore,
+    ViewCounterBuffer,
+)
+
+
+class FakeApp:
+    """
+    Stand-in for the Flask app, flushes only need an app context
+    """
+
+    @contextmanager
+    def app_context(self):
+        yield
+
+
+class FakeRedisPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def hgetall(self, key):
+        self.commands.append(lambda: self.client.hgetall(key))
+
+    def delete(self, key):
+        self.commands.append(lambda: self.client.delete(key))
+
+    def execute(self):
+        return [command() for command in self.commands]
+
+
+class FakeRedis:
+    """
+    Local fake for the subset of redis-py used by RedisCounterStore
+    """
+
+    def __init__(self):
+        self.hashes = {}
+
+    def hincrby(self, key, field, amount):
+        fields = self.hashes.setdefault(key, {})
+        field = str(field).encode()
+        fields[field] = str(int(fields.get(field, b"0")) + amount).encode()
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(str(field).encode())
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hvals(self, key):
+        return list(self.hashes.get(key, {}).values())
+
+    def delete(self, key):
+        return 1 if self.hashes.pop(key, None) is not None else 0
+
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request):
+    if request.param == "memory":
+        return InMemoryCounterStore()
+    return RedisCounterStore(FakeRedis())
+
+
+def make_buffer(store, flush_function):
+    return ViewCounterBuffer(
+        FakeApp(),
+        logging.getLogger(__name__),
+        flush_function,
+        store=store,
+        flush_interval=3600,
+    )
+
+
+def test_views_are_aggregated_and_flushed(store):
+    flushed = []
+    buffer = make_buffer(store, flushed.append)
+
+    for feed_id in (1, 1, 2, 1, 2):
+        buffer.record(feed_id)
+
+    assert buffer.pending() == 5
+    assert buffer.pending_for(1) == 3
+    assert buffer.flush() == 5
+    assert flushed == [{1: 3, 2: 2}]
+    assert buffer.pending() == 0
+
+    buffer.stop()
+    assert flushed == [{1: 3, 2: 2}]
+
+
+def test_failed_flush_keeps_views_buffered(store):
+    def failing_flush(view_counts):
+        raise Exception("database unavailable")
+
+    buffer = make_buffer(store, failing_flush)
+    buffer.store.incr(7, 4)
+
+    with pytest.raises(Exception):
+        buffer.flush()
+
+    assert buffer.pending_for(7) == 4
@@ -0,0 +1,69 @@
+"""
+Test Cases for the bounded background worker pool
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from app.utilities.worker_pool import WorkerPool, WorkerPoolFullError, queue_depth
+
+
+class FakeApp:
+    """
+    Stand-in for the Flask app, tasks only need an app context
+    """
+
+    def __init__(self):
+        self.contexts = 0
+
+    @contextmanager
+    def app_context(self):
+        self.contexts += 1
+        yield
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(
+        FakeApp(), logging.getLogger("test"), "test-pool", max_workers=1, max_queue=1
+    )
+    yield pool
+    pool.shutdown()
+
+
+def test_runs_task_in_app_context(pool):
+    assert pool.submit(lambda x: x * 2, 21).result(timeout=5) == 42
+    assert pool.app.contexts == 1
+
+
+def test_rejects_when_queue_is_full(pool):
+    release = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    running = pool.submit(block)
+    started.wait(5)
+    waiting = pool.submit(lambda: "done")
+    assert queue_depth.labels(pool="test-pool").value == 1
+
+    with pytest.raises(WorkerPoolFullError):
+        pool.submit(lambda: "rejected")
+
+    release.set()
+    running.result(timeout=5)
+    assert waiting.result(timeout=5) == "done"
+    assert pool.queued == 0
+
+
+def test_failed_task_surfaces_exception(pool):
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        pool.submit(fail).result(timeout=5)
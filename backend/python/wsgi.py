@@ -0,0 +1,11 @@
+import os
+from dotenv import load_dotenv
+
+# note: VS Code's Python extension might falsely report an unresolved import
+from app import create_app
+
+# production entry point, served by gunicorn (see gunicorn.conf.py):
+#   gunicorn -c gunicorn.conf.py wsgi:app
+load_dotenv()
+
+app = create_app(os.getenv("FLASK_CONFIG") or "production")